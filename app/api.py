@@ -1,9 +1,22 @@
+import os
+
 from fastapi import FastAPI, APIRouter
 
+from app.middlewares.compression import add_compression
 from app.middlewares.cors import add_cors
-from app.routes import auth, products, comparisons, products_types, admin
+from app.middlewares.query_count import add_query_counter
+from app.routes import products_types, admin
 from prometheus_fastapi_instrumentator import Instrumentator
 
+# "async" serves the auth, product and comparison routes from an AsyncSession
+# (see app.database.init_async_db); "sync" uses the threadpool-backed Session.
+DB_MODE = os.getenv("DB_MODE", "sync")
+
+if DB_MODE == "async":
+    from app.routes.aio import auth, products, comparisons
+else:
+    from app.routes import auth, products, comparisons
+
 # Initialize FastAPI
 app = FastAPI(
     title="Comparathor",
@@ -15,11 +28,13 @@ app = FastAPI(
     "and metadata.",
 )
 
-# Enable Prometheus metrics
+# Enable Prometheus metrics, including the database pool metrics from app.metrics
 Instrumentator().instrument(app).expose(app)
 
 
+add_query_counter(app)
 add_cors(app)
+add_compression(app)  # Outermost, so it compresses the final headers and body
 
 # Create API Router
 api_router = APIRouter(
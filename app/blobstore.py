@@ -0,0 +1,173 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+_DATA_URI = re.compile(r"^data:([\w.+-]+/[\w.+-]+)?(;[^,]*)?;base64,")
+
+blob_store = None
+
+
+class BlobStore:
+    """
+    Content-addressed, write-once storage of binary blobs on disk.
+
+    Each blob is stored once under its SHA-256 digest, fanned out over two
+    directory levels (``ab/cd/abcd...``) to keep directories small. Writing the
+    same bytes twice is a no-op.
+
+    Parameters
+    ----------
+    root : str or Path
+        Directory holding the blobs. It is created on first write.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        """
+        Return the on-disk location of a blob.
+
+        Parameters
+        ----------
+        digest : str
+            The SHA-256 hex digest of the blob.
+
+        Returns
+        -------
+        Path
+            The blob's path, whether or not it exists.
+        """
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob unless identical bytes are already stored.
+
+        The blob is written to a temporary file and renamed into place, so readers
+        never observe a partially written blob.
+
+        Parameters
+        ----------
+        data : bytes
+            The blob content.
+
+        Returns
+        -------
+        str
+            The SHA-256 hex digest addressing the blob.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.is_file():
+            _write_atomically(path, data)
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        return self.path(digest).read_bytes()
+
+    def variant_path(self, digest: str, variant: str) -> Path:
+        """
+        Return the on-disk location of a variant derived from a blob, e.g. a thumbnail.
+
+        Variants are addressed by the digest of their source and the variant name,
+        under ``variants/<variant>/``, so they can be looked up without recording
+        them anywhere.
+
+        Parameters
+        ----------
+        digest : str
+            The SHA-256 hex digest of the source blob.
+        variant : str
+            The name of the variant.
+
+        Returns
+        -------
+        Path
+            The variant's path, whether or not it exists.
+        """
+        return self.root / "variants" / variant / digest[:2] / digest[2:4] / digest
+
+    def put_variant(self, digest: str, variant: str, data: bytes):
+        """
+        Store a variant of a blob, replacing any previous one atomically.
+        """
+        _write_atomically(self.variant_path(digest, variant), data)
+
+
+def _write_atomically(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def init_blob_store(root=None) -> BlobStore:
+    """
+    Initialize the blob store used by the application.
+
+    Parameters
+    ----------
+    root : str or Path, optional
+        Directory holding the blobs. Defaults to the ``BLOB_STORE_DIR`` environment
+        variable, or ``./blobs``.
+
+    Returns
+    -------
+    BlobStore
+        The configured blob store.
+    """
+    global blob_store
+    blob_store = BlobStore(root or os.getenv("BLOB_STORE_DIR", "./blobs"))
+    return blob_store
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Return the application blob store, initializing it from the environment on first
+    use.
+    """
+    return blob_store or init_blob_store()
+
+
+def decode_base64_image(image_base64: str) -> bytes:
+    """
+    Decode an image sent as a ``data:`` URI or as bare Base64.
+
+    The content type a data URI declares is discarded: it comes from the client, so
+    the type is told from the bytes instead (see `app.images.sniff_image_type`).
+
+    Parameters
+    ----------
+    image_base64 : str
+        The encoded image, e.g. ``data:image/png;base64,iVBOR...``.
+
+    Returns
+    -------
+    bytes
+        The raw image bytes.
+
+    Raises
+    ------
+    ValueError
+        If the payload is not valid Base64.
+    """
+    match = _DATA_URI.match(image_base64)
+    if match:
+        image_base64 = image_base64[match.end():]
+    try:
+        return base64.b64decode(image_base64, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid Base64 image: {e}") from e
@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.metrics import CACHE_EVICTIONS, CACHE_HITS, CACHE_MISSES
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe in-process cache with per-entry expiry.
+
+    Entries expire `ttl` seconds after they are stored, and the least recently used
+    entry is evicted once the cache holds `maxsize` entries. Lookups are counted in
+    ``cache_hits_total`` and ``cache_misses_total``, and dropped entries in
+    ``cache_evictions_total``, under the cache's `name`.
+
+    Parameters
+    ----------
+    name : str
+        Value of the ``cache`` label of the cache metrics.
+    maxsize : int
+        Maximum number of entries.
+    ttl : float
+        Seconds an entry stays valid. A TTL of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the value stored under `key`, or `default` if it is missing or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expires, value = self._entries.get(key, (0.0, _MISSING))
+            if value is not _MISSING and expires <= now:
+                del self._entries[key]
+                CACHE_EVICTIONS.labels(self.name, "ttl").inc()
+                value = _MISSING
+            elif value is not _MISSING:
+                self._entries.move_to_end(key)
+        if value is _MISSING:
+            CACHE_MISSES.labels(self.name).inc()
+            return default
+        CACHE_HITS.labels(self.name).inc()
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store `value` under `key`, evicting the least recently used entry if full.
+        """
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels(self.name, "size").inc()
+
+    def invalidate(self, *keys: Optional[Hashable]):
+        """
+        Drop the entries stored under `keys`. Missing keys are ignored.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Cache kept in a Redis server, shared by every worker process.
+
+    It has the interface of `TTLCache` for ``bytes`` values. Expiry and eviction are
+    left to the server (``maxmemory-policy``), so only hits and misses are counted.
+    A failing server is logged and treated as a miss, never as a failed request.
+
+    Every invalidation also increments a counter kept on the server, so that a value
+    read before an invalidation in any process can be refused by `set_if_generation`.
+
+    Parameters
+    ----------
+    name : str
+        Value of the ``cache`` label of the cache metrics.
+    client : redis.Redis
+        The client, or any object with its ``get``, ``set``, ``delete``, ``incr``,
+        ``eval`` and ``scan_iter`` methods.
+    ttl : float
+        Seconds an entry stays valid. A TTL of 0 disables the cache.
+    prefix : str, optional
+        Prepended to every key, so several caches can share a server.
+    """
+
+    def __init__(self, name: str, client, ttl: float, prefix: str = ""):
+        self.name = name
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    # Sets KEYS[2] only while the counter KEYS[1] still has the value ARGV[1]
+    _SET_IF_GENERATION = """
+    if (redis.call('GET', KEYS[1]) or '0') == ARGV[1] then
+        return redis.call('SET', KEYS[2], ARGV[2], 'PX', ARGV[3])
+    end
+    return nil
+    """
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}{key}"
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self.prefix}__generation__"
+
+    def generation(self) -> Optional[int]:
+        """
+        Return the invalidation counter shared by every process, or None if the
+        server is unavailable.
+        """
+        try:
+            return int(self.client.get(self._generation_key) or 0)
+        except Exception:
+            logger.warning("Cache %s is unavailable", self.name, exc_info=True)
+            return None
+
+    def set_if_generation(self, key: Hashable, value: bytes, token: int):
+        """
+        Store `value` under `key`, like `set`, unless an invalidation happened in any
+        process since `token` was read from `generation`. The check and the write
+        are one atomic round trip.
+        """
+        if self.ttl <= 0:
+            return
+        try:
+            self.client.eval(
+                self._SET_IF_GENERATION,
+                2,
+                self._generation_key,
+                self._key(key),
+                str(token),
+                value,
+                int(self.ttl * 1000),
+            )
+        except Exception:
+            logger.warning("Cache %s is unavailable", self.name, exc_info=True)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the value stored under `key`, or `default` if it is missing.
+        """
+        try:
+            value = self.client.get(self._key(key))
+        except Exception:
+            logger.warning("Cache %s is unavailable", self.name, exc_info=True)
+            value = None
+        if value is None:
+            CACHE_MISSES.labels(self.name).inc()
+            return default
+        CACHE_HITS.labels(self.name).inc()
+        return value
+
+    def set(self, key: Hashable, value: bytes):
+        """
+        Store `value` under `key` for `ttl` seconds.
+        """
+        if self.ttl <= 0:
+            return
+        try:
+            self.client.set(self._key(key), value, px=int(self.ttl * 1000))
+        except Exception:
+            logger.warning("Cache %s is unavailable", self.name, exc_info=True)
+
+    def invalidate(self, *keys: Optional[Hashable]):
+        """
+        Drop the entries stored under `keys`. Missing keys are ignored.
+        """
+        if not keys:
+            return
+        try:
+            # Counted first, so a value read before the change is refused from now on
+            self.client.incr(self._generation_key)
+            self.client.delete(*(self._key(key) for key in keys))
+        except Exception:
+            # The entries will still expire after `ttl` seconds
+            logger.error("Could not invalidate %s in cache %s", keys, self.name, exc_info=True)
+
+    def clear(self):
+        """
+        Drop every entry under the cache's prefix.
+        """
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
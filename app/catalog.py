@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from sqlalchemy.orm import Session
+
+from app import database
+from app.models.product import ProductType
+from app.schemas.product import ProductTypeDTO
+
+_snapshot = None
+# Serializes rebuilds, so a snapshot read before a change cannot replace one read
+# after it. Reentrant: `get_catalog` holds it while calling `refresh_catalog`.
+_refresh_lock = threading.RLock()
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable view of every product type, with its JSON response pre-serialized.
+
+    Attributes
+    ----------
+    product_types : Mapping[int, ProductTypeDTO]
+        The product types by id.
+    body : bytes
+        JSON list of the product types, as served by ``GET /api/product-types/``.
+    etag : str
+        Quoted strong ETag of `body`.
+    built_at : float
+        `time.monotonic` timestamp of the build.
+    engine : Engine
+        The engine the snapshot was read from.
+    """
+
+    product_types: Mapping[int, ProductTypeDTO]
+    body: bytes
+    etag: str
+    built_at: float
+    engine: object
+
+
+def _catalog_ttl() -> float:
+    return float(os.getenv("CATALOG_TTL", "30"))
+
+
+def refresh_catalog(db: Optional[Session] = None) -> CatalogSnapshot:
+    """
+    Rebuild the snapshot from the database and swap it in.
+
+    Call it after committing a change to the product types. Readers keep using the
+    previous snapshot until the new one is complete. Rebuilds run one at a time, so
+    the last snapshot swapped in is always the one read last.
+
+    Parameters
+    ----------
+    db : Session, optional
+        Session to read with. A new one is opened if omitted.
+
+    Returns
+    -------
+    CatalogSnapshot
+        The new snapshot.
+    """
+    global _snapshot
+    with _refresh_lock:
+        session = db or database.SessionLocal()
+        try:
+            rows = session.query(ProductType).order_by(ProductType.id).all()
+            product_types = {row.id: ProductTypeDTO.model_validate(row) for row in rows}
+        finally:
+            if db is None:
+                session.close()
+
+        body = json.dumps(
+            [dto.model_dump() for dto in product_types.values()], separators=(",", ":")
+        ).encode()
+        snapshot = CatalogSnapshot(
+            product_types=MappingProxyType(product_types),
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            built_at=time.monotonic(),
+            engine=database.engine,
+        )
+        _snapshot = snapshot
+        return snapshot
+
+
+def get_catalog() -> CatalogSnapshot:
+    """
+    Return the current snapshot, rebuilding it when it is missing or stale.
+
+    Changes made by this process swap the snapshot at once (see `refresh_catalog`).
+    Changes made by other worker processes are picked up once the snapshot is older
+    than ``CATALOG_TTL`` seconds (default 30).
+
+    Returns
+    -------
+    CatalogSnapshot
+        The current snapshot.
+    """
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.engine is database.engine
+        and time.monotonic() - snapshot.built_at < _catalog_ttl()
+    ):
+        return snapshot
+    with _refresh_lock:
+        # Another thread may have rebuilt it while this one waited
+        if _snapshot is not snapshot:
+            return _snapshot
+        return refresh_catalog()
+
+
+def get_schema(product_type_id: int) -> Optional[dict]:
+    """
+    Return the metadata schema of a product type from the snapshot.
+
+    The returned dict is shared by every caller and must not be modified.
+
+    Parameters
+    ----------
+    product_type_id : int
+        The ID of the product type.
+
+    Returns
+    -------
+    dict or None
+        The metadata schema, or None if the product type does not exist.
+    """
+    product_type = get_catalog().product_types.get(product_type_id)
+    return product_type.metadata_schema if product_type else None
@@ -0,0 +1,88 @@
+import os
+
+import fire
+from dotenv import load_dotenv
+
+from app import database
+from app.database import init_db
+from app.images import backfill_thumbnails, migrate_inline_images
+from app.summaries import SUMMARY_KEY, SUMMARY_VERSION, refresh_summaries
+from app.utils import get_logger
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+def migrate_images(batch_size: int = 500):
+    """
+    Move product images stored inline in the database to the blob store.
+
+    Safe to run repeatedly and to interrupt: only products that still have an inline
+    image and no content hash are processed.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        Number of products migrated per transaction (default is 500).
+    """
+    init_db(os.getenv("DB_URL", "sqlite:///./test.db"))
+    session = database.SessionLocal()
+    try:
+        migrated = migrate_inline_images(session, batch_size=batch_size)
+    finally:
+        session.close()
+    logger.info(f"Migrated {migrated} product images to the blob store.")
+
+
+def rebuild_summaries():
+    """
+    Recompute every comparison summary from the comparisons and their products.
+
+    Needed only after the tables were modified outside the API, which keeps the
+    summaries up to date otherwise.
+    """
+    init_db(os.getenv("DB_URL", "sqlite:///./test.db"))
+    session = database.SessionLocal()
+    try:
+        count = refresh_summaries(session)
+        database.write_bookkeeping(session, {SUMMARY_KEY: SUMMARY_VERSION})
+        session.commit()
+    finally:
+        session.close()
+    logger.info(f"Rebuilt {count} comparison summaries.")
+
+
+def generate_thumbnails(batch_size: int = 500, workers: int = 1):
+    """
+    Generate the missing thumbnails of every product image in the blob store.
+
+    Needed once for images stored before thumbnails existed, e.g. by ``migrate_images``;
+    the API generates the thumbnails of new images itself. Safe to run repeatedly and
+    to interrupt.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        Number of images read per query (default is 500).
+    workers : int, optional
+        Number of images processed in parallel (default is 1).
+    """
+    init_db(os.getenv("DB_URL", "sqlite:///./test.db"))
+    session = database.SessionLocal()
+    try:
+        generated = backfill_thumbnails(session, batch_size=batch_size, workers=workers)
+    finally:
+        session.close()
+    logger.info(f"Generated {generated} thumbnails.")
+
+
+if __name__ == "__main__":
+    fire.Fire(
+        {
+            "migrate_images": migrate_images,
+            "rebuild_summaries": rebuild_summaries,
+            "generate_thumbnails": generate_thumbnails,
+        }
+    )
@@ -0,0 +1,200 @@
+import os
+import threading
+from typing import Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import database
+from app.cache import RedisCache, TTLCache
+from app.models.comparison import ComparisonProduct
+from app.responses import JSON_MEDIA_TYPE, dump_json
+
+PRODUCT = "product"
+COMPARISON = "comparison"
+
+_backend = None
+_engine = None
+_configured = False
+_lock = threading.Lock()
+# Bumped by every invalidation. A response read before an invalidation is not
+# stored, as it may predate the change that was just committed. The Redis backend
+# keeps its own counter on the server, shared by every worker process.
+_generation = 0
+
+
+def _build_backend():
+    """
+    Create the backend selected by ``ENTITY_CACHE``: ``memory`` (default),
+    ``redis`` or ``off``.
+    """
+    kind = os.getenv("ENTITY_CACHE", "memory").lower()
+    ttl = float(os.getenv("ENTITY_CACHE_TTL", "300"))
+    if kind == "off":
+        return None
+    if kind == "memory":
+        return TTLCache("entity", int(os.getenv("ENTITY_CACHE_SIZE", "10000")), ttl)
+    if kind == "redis":
+        import redis  # Optional dependency, only needed for this backend
+
+        client = redis.Redis.from_url(os.getenv("ENTITY_CACHE_URL", "redis://localhost:6379/0"))
+        return RedisCache("entity", client, ttl, prefix="comparathor:entity:")
+    raise ValueError(f"Unknown ENTITY_CACHE backend: {kind!r}")
+
+
+def configure(backend=None):
+    """
+    Replace the cache backend, e.g. with a shared one built elsewhere or a fake.
+
+    Parameters
+    ----------
+    backend : TTLCache or RedisCache, optional
+        The new backend. None disables the cache.
+    """
+    global _backend, _engine, _configured
+    with _lock:
+        _backend, _engine, _configured = backend, database.engine, True
+
+
+def reset():
+    """
+    Forget the current backend; the next lookup builds one from the environment.
+    """
+    global _backend, _configured
+    with _lock:
+        _backend, _configured = None, False
+
+
+def get_backend():
+    """
+    Return the cache backend, or None if the cache is disabled.
+
+    The backend is built from the environment on first use. An in-process backend
+    is dropped when the database engine changes, so entries read from one database
+    are never served from another.
+    """
+    global _backend, _engine, _configured
+    with _lock:
+        if not _configured or (
+            isinstance(_backend, TTLCache) and _engine is not database.engine
+        ):
+            _backend, _engine, _configured = _build_backend(), database.engine, True
+        return _backend
+
+
+def _key(kind: str, entity_id: int) -> str:
+    return f"{kind}:{entity_id}"
+
+
+def generation() -> Optional[int]:
+    """
+    Return a token to pass to `store`, taken before reading the entity.
+
+    With the Redis backend it is read from the server, so invalidations made by
+    other worker processes count too; it is None if the server is unavailable.
+    """
+    backend = get_backend()
+    if isinstance(backend, RedisCache):
+        return backend.generation()
+    return _generation
+
+
+def cached_response(kind: str, entity_id: int) -> Optional[Response]:
+    """
+    Return the cached JSON response of an entity, or None on a miss.
+
+    Parameters
+    ----------
+    kind : str
+        `PRODUCT` or `COMPARISON`.
+    entity_id : int
+        The ID of the entity.
+
+    Returns
+    -------
+    Response or None
+        The response, if the entity is cached.
+    """
+    backend = get_backend()
+    body = backend.get(_key(kind, entity_id)) if backend is not None else None
+    return Response(body, media_type=JSON_MEDIA_TYPE) if body is not None else None
+
+
+def store(kind: str, entity_id: int, dto: BaseModel, token: int) -> Response:
+    """
+    Serialize a DTO, cache it and return it as a JSON response.
+
+    Parameters
+    ----------
+    kind : str
+        `PRODUCT` or `COMPARISON`.
+    entity_id : int
+        The ID of the entity.
+    dto : BaseModel
+        The DTO to serve.
+    token : int or None
+        Value of `generation` taken before the entity was read. Nothing is cached
+        if an invalidation happened since, in any process with the Redis backend.
+
+    Returns
+    -------
+    Response
+        The serialized DTO.
+    """
+    body = dump_json(type(dto), dto)
+    backend = get_backend()
+    if isinstance(backend, RedisCache):
+        if token is not None:
+            backend.set_if_generation(_key(kind, entity_id), body, token)
+    elif backend is not None and token == _generation:
+        backend.set(_key(kind, entity_id), body)
+    return Response(body, media_type=JSON_MEDIA_TYPE)
+
+
+def invalidate(kind: str, *entity_ids: int):
+    """
+    Drop cached entities. Call it once the change to them is committed.
+
+    Parameters
+    ----------
+    kind : str
+        `PRODUCT` or `COMPARISON`.
+    *entity_ids : int
+        The IDs of the changed entities.
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+    backend = get_backend()
+    if backend is not None and entity_ids:
+        backend.invalidate(*(_key(kind, entity_id) for entity_id in entity_ids))
+
+
+def comparisons_of(db: Session, *product_ids: int) -> list:
+    """
+    Return the IDs of the comparisons embedding some products, whose cached
+    responses must be dropped along with the products'.
+
+    Parameters
+    ----------
+    db : Session
+        The database session.
+    *product_ids : int
+        The IDs of the products.
+
+    Returns
+    -------
+    list of int
+        The comparison IDs.
+    """
+    if not product_ids:
+        return []
+    return list(
+        db.scalars(
+            select(ComparisonProduct.comparison_id)
+            .where(ComparisonProduct.product_id.in_(product_ids))
+            .distinct()
+        )
+    )
@@ -1,3 +1,4 @@
+from app.catalog import refresh_catalog
 from app.initializer import initialize_all
 from app.utils import get_logger
 
@@ -21,5 +22,7 @@ def on_start():
     None
 """
     initialize_all()
+    # Build the product-type catalog before the first request needs it
+    refresh_catalog()
     # Log a success message if initialization is successful
     logger.info("Application initialized successfully.")
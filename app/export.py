@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from app import database
+from app.models.product import Product, ProductMetadata, product_image_url
+
+# Columns of the CSV export: one row per metadata entry, with the product repeated
+CSV_COLUMNS = (
+    "id", "name", "brand", "price", "score", "product_type_id", "image_url",
+    "attribute", "value", "metadata_score",
+)
+# Rows fetched from the database cursor at a time
+BATCH_SIZE = 1000
+# Bytes buffered before a chunk is sent
+CHUNK_SIZE = 64 * 1024
+
+
+def _iter_products(product_type_id: Optional[int]) -> Iterator[dict]:
+    """
+    Yield every product with its metadata, in ID order, one at a time.
+
+    Products and metadata are read with one LEFT JOIN ordered by product, streamed
+    from the database in batches of ``BATCH_SIZE`` rows, so memory does not grow
+    with the catalog. The whole export reads a single transaction, hence one
+    consistent snapshot.
+    """
+    query = (
+        select(
+            Product.id,
+            Product.name,
+            Product.brand,
+            Product.price,
+            Product.score,
+            Product.product_type_id,
+            Product.image_hash,
+            ProductMetadata.attribute,
+            ProductMetadata.value,
+            ProductMetadata.score,
+        )
+        .outerjoin(ProductMetadata, ProductMetadata.product_id == Product.id)
+        .order_by(Product.id, ProductMetadata.id)
+        .execution_options(stream_results=True, yield_per=BATCH_SIZE)
+    )
+    if product_type_id:
+        query = query.where(Product.product_type_id == product_type_id)
+
+    # Opened here rather than taken from the request, whose session may be closed
+    # before a streamed response is complete
+    session = database.SessionLocal()
+    try:
+        product = None
+        for row in session.execute(query):
+            if product is None or product["id"] != row[0]:
+                if product is not None:
+                    yield product
+                product = {
+                    "id": row[0],
+                    "name": row[1],
+                    "brand": row[2],
+                    "price": row[3],
+                    "score": row[4],
+                    "product_type_id": row[5],
+                    "image_url": product_image_url(row[0], row[6]),
+                    "product_metadata": [],
+                }
+            if row[7] is not None:
+                product["product_metadata"].append(
+                    {"attribute": row[7], "value": row[8], "score": row[9]}
+                )
+        if product is not None:
+            yield product
+    finally:
+        session.close()
+
+
+def _ndjson_lines(products: Iterator[dict]) -> Iterator[str]:
+    for product in products:
+        yield json.dumps(product, separators=(",", ":")) + "\n"
+
+
+def _csv_lines(products: Iterator[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS)
+    for product in products:
+        head = [product[column] for column in CSV_COLUMNS[:7]]
+        for meta in product["product_metadata"] or [{}]:
+            writer.writerow(head + [meta.get("attribute"), meta.get("value"), meta.get("score")])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_products(
+    export_format: str = "ndjson", product_type_id: Optional[int] = None, compress: bool = False
+) -> Iterator[bytes]:
+    """
+    Stream every product with its metadata as NDJSON or CSV.
+
+    NDJSON has one JSON object per product, with its metadata nested. CSV has one
+    row per metadata entry (see ``CSV_COLUMNS``), or a single row without
+    attribute for a product without metadata.
+
+    Parameters
+    ----------
+    export_format : str, optional
+        ``"ndjson"`` (default) or ``"csv"``.
+    product_type_id : int, optional
+        Export only the products of this type.
+    compress : bool, optional
+        Gzip the stream (default is False).
+
+    Yields
+    ------
+    bytes
+        Chunks of about ``CHUNK_SIZE`` bytes of the export.
+    """
+    products = _iter_products(product_type_id)
+    lines = _csv_lines(products) if export_format == "csv" else _ndjson_lines(products)
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+
+    pending = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size < CHUNK_SIZE:
+            continue
+        chunk = "".join(pending).encode()
+        pending, size = [], 0
+        chunk = compressor.compress(chunk) if compressor else chunk
+        if chunk:
+            yield chunk
+    chunk = "".join(pending).encode()
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,178 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+# bcrypt costs ~2^rounds work. Changing BCRYPT_ROUNDS rehashes each user's password
+# with the new cost on their next successful login (see `verify_and_update`).
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """
+    Return the passlib context, importing passlib on first use to keep startup fast.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def _max_workers() -> int:
+    return int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _queue_limit() -> int:
+    return int(os.getenv("HASH_QUEUE_LIMIT", str(4 * max(_max_workers(), 1))))
+
+
+def _hash(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return get_pwd_context().verify_and_update(password, hashed_password)
+
+
+def _exit_with_parent(parent_pid: int):
+    """
+    Worker initializer: exit once the server process is gone, even if it was killed
+    without shutting the pool down.
+    """
+
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(0)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawn rather than fork: the server process runs threads
+            _executor = ProcessPoolExecutor(
+                max_workers=_max_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_exit_with_parent,
+                initargs=(os.getpid(),),
+            )
+        return _executor
+
+
+def _release(_future: Future):
+    global _pending
+    with _executor_lock:
+        _pending -= 1
+
+
+def _submit(fn, *args) -> Future:
+    """
+    Run `fn` on the password executor, or inline when ``HASH_WORKERS`` is 0.
+
+    At most ``HASH_QUEUE_LIMIT`` jobs may be queued or running at once. Beyond that
+    the request is rejected at once with 503 rather than left waiting, so a burst of
+    logins cannot occupy every worker thread of the server.
+
+    Raises
+    ------
+    HTTPException
+        503 with a ``Retry-After`` header if the queue is full.
+    """
+    global _pending
+    if _max_workers() <= 0:
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    executor = _get_executor()
+    with _executor_lock:
+        if _pending >= _queue_limit():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a plaintext password on the password executor.
+
+    Parameters
+    ----------
+    password : str
+        The plaintext password to hash.
+
+    Returns
+    -------
+    str
+        The hashed password.
+
+    Raises
+    ------
+    HTTPException
+        503 if too many password operations are already queued.
+    """
+    return _submit(_hash, password).result()
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the password executor, rehashing it if its cost is outdated.
+
+    Parameters
+    ----------
+    password : str
+        The plaintext password to verify.
+    hashed_password : str
+        The stored hash to compare against.
+
+    Returns
+    -------
+    tuple of (bool, str or None)
+        Whether the password matches, and a new hash to store if the stored one was
+        made with a different ``BCRYPT_ROUNDS``.
+
+    Raises
+    ------
+    HTTPException
+        503 if too many password operations are already queued.
+    """
+    return _submit(_verify_and_update, password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Async counterpart of `hash_password`; waits without holding a thread.
+    """
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_and_update_async(
+    password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Async counterpart of `verify_and_update`; waits without holding a thread.
+    """
+    return await asyncio.wrap_future(_submit(_verify_and_update, password, hashed_password))
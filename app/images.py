@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only
+
+from app import entity_cache
+from app.blobstore import decode_base64_image, get_blob_store
+from app.models.product import Product
+from app.thumbnails import generate_thumbnails
+from app.utils import get_logger
+
+logger = get_logger(__name__)
+
+# The image types accepted and served, told apart by their leading bytes. Anything
+# else, notably SVG or HTML, could run scripts on the API's origin.
+_MAGIC_NUMBERS = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+IMAGE_CONTENT_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """
+    Return the content type of an image from its magic bytes.
+
+    Parameters
+    ----------
+    data : bytes
+        The image.
+
+    Returns
+    -------
+    str or None
+        One of ``IMAGE_CONTENT_TYPES``, or None if the bytes are none of them.
+    """
+    for magic, content_type in _MAGIC_NUMBERS:
+        if data.startswith(magic):
+            return content_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def store_image(image_base64: str) -> Tuple[str, str]:
+    """
+    Decode a Base64 image and store it in the blob store.
+
+    The content type is told from the image bytes; the one a data URI declares is
+    ignored.
+
+    Parameters
+    ----------
+    image_base64 : str
+        The image as a ``data:`` URI or bare Base64.
+
+    Returns
+    -------
+    tuple[str, str]
+        The content hash of the stored image and its content type.
+
+    Raises
+    ------
+    ValueError
+        If the payload is not valid Base64, or not a PNG, JPEG, GIF or WebP image.
+    """
+    data = decode_base64_image(image_base64)
+    content_type = sniff_image_type(data)
+    if content_type is None:
+        raise ValueError("Unsupported image type: use a PNG, JPEG, GIF or WebP image")
+    return get_blob_store().put(data), content_type
+
+
+def set_product_image(product: Product, image_base64: Optional[str]):
+    """
+    Replace the image of a product with a new Base64-encoded image.
+
+    The bytes go to the blob store; the product only keeps the content hash and type.
+    An empty value removes the image.
+
+    Parameters
+    ----------
+    product : Product
+        The product to update.
+    image_base64 : str, optional
+        The image as a ``data:`` URI or bare Base64.
+
+    Raises
+    ------
+    ValueError
+        If the payload is not valid Base64, or not a supported image type.
+    """
+    if image_base64:
+        product.image_hash, product.image_content_type = store_image(image_base64)
+    else:
+        product.image_hash = product.image_content_type = None
+    product.image_base64 = None
+
+
+def migrate_inline_images(session: Session, batch_size: int = 500) -> int:
+    """
+    Move images still stored inline in ``products.image_base64`` to the blob store.
+
+    Rows are processed in primary-key order and committed per batch, so the migration
+    can be interrupted and resumed. Rows whose payload cannot be decoded are logged and
+    left untouched.
+
+    Parameters
+    ----------
+    session : Session
+        The database session.
+    batch_size : int, optional
+        Number of products migrated per transaction (default is 500).
+
+    Returns
+    -------
+    int
+        The number of migrated products.
+    """
+    migrated = 0
+    last_id = 0
+    while True:
+        products = (
+            session.query(Product)
+            .options(load_only(Product.id, Product.image_base64, Product.image_hash))
+            .filter(
+                Product.id > last_id,
+                Product.image_base64.isnot(None),
+                Product.image_hash.is_(None),
+            )
+            .order_by(Product.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not products:
+            return migrated
+        for product in products:
+            try:
+                set_product_image(product, product.image_base64)
+                migrated += 1
+            except ValueError as e:
+                logger.warning(f"Skipping image of product {product.id}: {e}")
+        comparison_ids = entity_cache.comparisons_of(session, *(p.id for p in products))
+        session.commit()
+        entity_cache.invalidate(entity_cache.PRODUCT, *(p.id for p in products))
+        entity_cache.invalidate(entity_cache.COMPARISON, *comparison_ids)
+        last_id = products[-1].id
+        logger.info(f"Migrated {migrated} product images so far...")
+
+
+def backfill_thumbnails(session: Session, batch_size: int = 500, workers: int = 1) -> int:
+    """
+    Generate the missing thumbnails of every product image in the blob store.
+
+    Distinct image hashes are read in order one batch at a time, and existing
+    thumbnails are skipped, so the backfill can be interrupted and run again.
+
+    Parameters
+    ----------
+    session : Session
+        The database session.
+    batch_size : int, optional
+        Number of images read per query (default is 500).
+    workers : int, optional
+        Number of images processed in parallel (default is 1).
+
+    Returns
+    -------
+    int
+        The number of thumbnails generated.
+    """
+    generated = 0
+    last_hash = ""
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        while True:
+            hashes = session.scalars(
+                select(Product.image_hash)
+                .where(Product.image_hash > last_hash)
+                .distinct()
+                .order_by(Product.image_hash)
+                .limit(batch_size)
+            ).all()
+            if not hashes:
+                return generated
+            generated += sum(pool.map(generate_thumbnails, hashes))
+            last_hash = hashes[-1]
+            logger.info(f"Generated {generated} thumbnails so far...")
@@ -1,29 +1,93 @@
+from app import database, search
 from app.initializers import users, product_types, products, product_metadata, comparisons, comparison_products
+from app.initializers.seeder import Seeder
+from app.search import SEARCH_KEY, SEARCH_VERSION
+from app.summaries import SUMMARY_KEY, SUMMARY_VERSION, refresh_summaries
+from app.utils import get_logger
 
-def initialize_all():
+logger = get_logger("INITIALIZER")
+
+# Initializers in foreign key order, with the resource file each one reads
+INITIALIZERS = (
+    (users, "users.yml"),
+    (product_types, "products.yml"),
+    (products, "products.yml"),
+    (product_metadata, "products.yml"),
+    (comparisons, "comparisons.yml"),
+    (comparison_products, "comparisons.yml"),
+)
+# Resource files the comparison summaries are computed from
+SUMMARY_INPUTS = ("products.yml", "comparisons.yml")
+
+
+def initialize_all(resources_dir=None, force: bool = False):
     """
     Initialize all database tables with predefined data from YAML files.
 
-    This function sequentially calls the `load` functions of all the initializers
-    to populate the database with data for testing or seeding purposes.
+    The initializers share one `Seeder`, so each YAML file is parsed once and
+    everything is inserted in a single transaction, in foreign key order.
+
+    The content hash of each resource file is recorded in the ``bookkeeping`` table,
+    and only the initializers whose file changed since the last run are run again.
+    The comparison summaries and the product search index are rebuilt when their
+    inputs change, and whenever their recorded version is outdated.
+    On a plain restart nothing is read from the database beyond the bookkeeping row
+    `init_db` already read.
 
     Steps performed:
         - Load users data from `users.yml`.
-        - Load product types data from `product_types.yml`.
+        - Load product types data from `products.yml`.
         - Load products data from `products.yml`.
-        - Load product metadata data from `product_metadata.yml`.
+        - Load product metadata data from `products.yml`.
         - Load comparisons data from `comparisons.yml`.
-        - Load comparison products data from `comparison_products.yml`.
+        - Load comparison products data from `comparisons.yml`.
+        - Backfill the typed projections of metadata values stored without them.
+        - Rebuild the comparison summaries.
+        - Rebuild the product search index.
+
+    Parameters
+    ----------
+    resources_dir : str or Path, optional
+        Directory holding the YAML resource files (default is ``app/resources``).
+    force : bool, optional
+        Run every initializer even if its file is unchanged (default is False).
 
     Returns
     -------
     None
         This function does not return a value.
     """
-    users.load()
-    product_types.load()
-    products.load()
-    product_metadata.load()
-    comparisons.load()
-    comparison_products.load()
+    with Seeder.open(resources_dir) as seeder:
+        digests = {f"seed:{name}": seeder.digest(name) for _, name in INITIALIZERS}
+        changed = {
+            key for key, digest in digests.items()
+            if force or database.bookkeeping.get(key) != digest
+        }
+        stale_summaries = database.bookkeeping.get(SUMMARY_KEY) != SUMMARY_VERSION
+        stale_projections = (
+            database.bookkeeping.get(product_metadata.PROJECTIONS_KEY)
+            != product_metadata.PROJECTIONS_VERSION
+        )
+        indexed = search.is_supported(seeder.session)
+        stale_search = indexed and not search.is_ready()
+        if not (changed or stale_summaries or stale_projections or stale_search):
+            logger.info("Seed resources unchanged, skipping initialization.")
+            return
 
+        for initializer, name in INITIALIZERS:
+            if f"seed:{name}" in changed:
+                initializer.load(seeder)
+        values = {key: digests[key] for key in changed}
+        if stale_projections:
+            product_metadata.backfill_projections(seeder.session)
+            values[product_metadata.PROJECTIONS_KEY] = product_metadata.PROJECTIONS_VERSION
+        # Seeded rows are inserted without going through the routes that keep the
+        # comparison summaries and the search index current, so rebuild them
+        if stale_summaries or any(f"seed:{name}" in changed for name in SUMMARY_INPUTS):
+            refresh_summaries(seeder.session)
+            values[SUMMARY_KEY] = SUMMARY_VERSION
+        if stale_search or (indexed and "seed:products.yml" in changed):
+            search.rebuild_index(seeder.session)
+            values[SEARCH_KEY] = SEARCH_VERSION
+        database.write_bookkeeping(seeder.session, values)
+    database.bookkeeping.update(values)
@@ -1,14 +1,13 @@
 from typing import List
-import yaml
-from pkg_resources import resource_filename
-from app.database import get_db
+
+from app.initializers.seeder import Seeder
 from app.models.comparison import Comparison
 from app.utils import get_logger
 
 logger = get_logger("COMPARISONS-INITIALIZER")
 
 
-def _init_comparisons(comparisons: List[dict]):
+def _init_comparisons(comparisons: List[dict], seeder: Seeder):
     """
     Initialize comparisons in the database.
 
@@ -16,6 +15,8 @@ def _init_comparisons(comparisons: List[dict]):
     ----------
     comparisons : List[dict]
         A list of comparison data to initialize in the database.
+    seeder : Seeder
+        The seeding engine.
 
     Returns
     -------
@@ -24,40 +25,36 @@ def _init_comparisons(comparisons: List[dict]):
     """
     logger.info("Initializing comparisons...")
 
-    # Use get_db to get a session
-    session = next(get_db())
     init_comparisons = [
-        Comparison(
-            id=comparison["id"],
-            user_id=comparison["user_id"],
-            title=comparison["title"],
-            description=comparison["description"],
-            date_created=comparison["date_created"],
-            product_type_id=comparison["product_type_id"],
-        )
+        {
+            "id": comparison["id"],
+            "user_id": comparison["user_id"],
+            "title": comparison["title"],
+            "description": comparison["description"],
+            "date_created": comparison["date_created"],
+            "product_type_id": comparison["product_type_id"],
+        }
         for comparison in comparisons
     ]
+    added = seeder.seed(Comparison, init_comparisons)
+    logger.info(f"Comparisons initialized ({added} added)")
 
-    for comparison in init_comparisons:
-        if session.query(Comparison).filter(Comparison.id == comparison.id).first():
-            logger.debug(f"Skipping comparison {comparison.id} as it already exists")
-            continue
-        session.add(comparison)
-
-    session.commit()
-    logger.info("Comparisons initialized")
 
-
-def load():
+def load(seeder: Seeder = None):
     """
     Load comparisons from a YAML file.
 
+    Parameters
+    ----------
+    seeder : Seeder, optional
+        The seeding engine. A new one is opened and committed if omitted.
+
     Returns
     -------
     None
         This function does not return a value.
     """
-    with open(resource_filename("app", "resources/comparisons.yml")) as f:
-        data = yaml.safe_load(f)
-
-    _init_comparisons(data["comparisons"])
+    if seeder is None:
+        with Seeder.open() as seeder:
+            return load(seeder)
+    _init_comparisons(seeder.resource("comparisons.yml")["comparisons"], seeder)
@@ -1,37 +1,81 @@
-import yaml
-from pkg_resources import resource_filename
-from app.database import get_db
-from app.models.product import ProductMetadata
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.initializers.seeder import Seeder
+from app.models.product import ProductMetadata, project_value
 from app.utils import get_logger
 
 logger = get_logger("PRODUCT-METADATA-INITIALIZER")
 
+# Bump when `project_value` changes, so `initialize_all` backfills the projections
+PROJECTIONS_VERSION = "1"
+PROJECTIONS_KEY = "metadata_projections"
+
 
-def _init_product_metadata(metadata: list):
+def _init_product_metadata(metadata: list, seeder: Seeder):
     logger.info("Initializing product metadata...")
 
-    # Use get_db to get a session
-    session = next(get_db())
+    def with_projections(meta: dict) -> dict:
+        # Bulk inserts bypass the model's validator that maintains the projections
+        meta["value_num"], meta["value_text"] = project_value(meta["value"])
+        return meta
+
     init_metadata = [
-        ProductMetadata(
-            id=meta["id"],
-            product_id=meta["product_id"],
-            attribute=meta["attribute"],
-            value=meta["value"],
-            score=meta["score"],
-        )
+        {
+            "id": meta["id"],
+            "product_id": meta["product_id"],
+            "attribute": meta["attribute"],
+            "value": meta["value"],
+            "score": meta["score"],
+        }
         for meta in metadata
     ]
-    for meta in init_metadata:
-        if session.query(ProductMetadata).filter(ProductMetadata.id == meta.id).first():
-            logger.debug(f"Skipping metadata {meta.id}, already exists.")
-            continue
-        session.add(meta)
-    session.commit()
-    logger.info("Product metadata initialized.")
-
-
-def load():
-    with open(resource_filename("app", "resources/products.yml")) as f:
-        data = yaml.safe_load(f)
-    _init_product_metadata(data["product_metadata"])
+    added = seeder.seed(ProductMetadata, init_metadata, prepare=with_projections)
+    logger.info(f"Product metadata initialized ({added} added).")
+
+
+def load(seeder: Seeder = None):
+    if seeder is None:
+        with Seeder.open() as seeder:
+            return load(seeder)
+    _init_product_metadata(seeder.resource("products.yml")["product_metadata"], seeder)
+
+
+def backfill_projections(session: Session, batch_size: int = 5000) -> int:
+    """
+    Compute the typed projections of metadata rows stored before they existed.
+
+    Parameters
+    ----------
+    session : Session
+        The session to update with. Committing is up to the caller.
+    batch_size : int, optional
+        Number of rows read and updated per statement (default is 5000).
+
+    Returns
+    -------
+    int
+        Number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(ProductMetadata.id, ProductMetadata.value)
+            .where(
+                ProductMetadata.id > last_id,
+                ProductMetadata.value.isnot(None),
+                ProductMetadata.value_text.is_(None),
+            )
+            .order_by(ProductMetadata.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        changes = []
+        for row_id, value in rows:
+            value_num, value_text = project_value(value)
+            changes.append({"id": row_id, "value_num": value_num, "value_text": value_text})
+        session.execute(update(ProductMetadata), changes)
+        updated += len(changes)
+        last_id = rows[-1].id
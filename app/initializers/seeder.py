@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from importlib.resources import files
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app import database
+
+RESOURCES_DIR = Path(str(files("app") / "resources"))
+
+
+def _write_parsed(path: Path, document):
+    """
+    Store a parsed resource as JSON, if JSON represents it exactly, and remove the
+    entries cached for earlier versions of the same file.
+    """
+    try:
+        encoded = json.dumps(document)
+        if json.loads(encoded) != document:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "w") as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+        resource_name = path.name.rsplit(".", 2)[0]
+        for stale in path.parent.glob(f"{resource_name}.*.json"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    except (TypeError, ValueError, OSError):
+        pass  # The cache is an optimisation only
+
+
+class Seeder:
+    """
+    Shared engine behind the initializers: reads each resource file once and inserts
+    only the rows that are missing from the database.
+
+    Parsing YAML is by far the slowest part of seeding a large catalog, so parsed
+    files can also be cached as JSON in ``SEED_CACHE_DIR``, keyed by the file name and
+    the SHA-256 of its content. Only the latest version of each file is kept. The
+    cache is disabled unless ``SEED_CACHE_DIR`` is set.
+
+    Parameters
+    ----------
+    session : Session
+        The session the rows are inserted with. Committing is up to the caller.
+    resources_dir : str or Path, optional
+        Directory holding the YAML resource files (default is ``app/resources``).
+    """
+
+    def __init__(self, session: Session, resources_dir=None):
+        self.session = session
+        self.resources_dir = Path(resources_dir or RESOURCES_DIR)
+        self._resources = {}
+        self._digests = {}
+        cache_dir = os.getenv("SEED_CACHE_DIR", "")
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    @classmethod
+    @contextmanager
+    def open(cls, resources_dir=None):
+        """
+        Create a seeder on a new session, committed when the block exits cleanly.
+
+        Parameters
+        ----------
+        resources_dir : str or Path, optional
+            Directory holding the YAML resource files (default is ``app/resources``).
+
+        Yields
+        ------
+        Seeder
+            The seeder.
+        """
+        session = database.SessionLocal()
+        try:
+            yield cls(session, resources_dir)
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def digest(self, name: str) -> str:
+        """
+        Return the SHA-256 hex digest of a resource file's content.
+
+        Parameters
+        ----------
+        name : str
+            File name, e.g. ``"products.yml"``.
+
+        Returns
+        -------
+        str
+            The digest.
+        """
+        if name not in self._digests:
+            content = (self.resources_dir / name).read_bytes()
+            self._digests[name] = hashlib.sha256(content).hexdigest()
+        return self._digests[name]
+
+    def resource(self, name: str) -> dict:
+        """
+        Return the parsed content of a resource file, parsing it on first use only.
+
+        Parameters
+        ----------
+        name : str
+            File name, e.g. ``"products.yml"``.
+
+        Returns
+        -------
+        dict
+            The parsed YAML document.
+        """
+        if name not in self._resources:
+            cached = None
+            if self.cache_dir is not None:
+                cached = self.cache_dir / f"{Path(name).stem}.{self.digest(name)}.json"
+            if cached is not None and cached.exists():
+                document = json.loads(cached.read_bytes())
+            else:
+                import yaml  # Deferred: restarts with unchanged resources never parse
+
+                # libyaml's loader parses large files an order of magnitude faster
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                with open(self.resources_dir / name, "rb") as f:
+                    document = yaml.load(f, Loader=loader)
+                if cached is not None:
+                    _write_parsed(cached, document)
+            self._resources[name] = document
+        return self._resources[name]
+
+    def seed(
+        self,
+        model,
+        rows: Iterable[dict],
+        key: str = "id",
+        prepare: Optional[Callable[[dict], dict]] = None,
+    ) -> int:
+        """
+        Insert the rows whose key is not yet in the table.
+
+        Existing keys are read with a single query, and the missing rows are written
+        with one executemany INSERT.
+
+        Parameters
+        ----------
+        model : type
+            The mapped class of the table.
+        rows : iterable of dict
+            Column values of each row, by attribute name.
+        key : str, optional
+            Attribute identifying a row (default is ``"id"``).
+        prepare : callable, optional
+            Applied to each missing row before it is inserted, so expensive work such
+            as password hashing is only done for new rows.
+
+        Returns
+        -------
+        int
+            Number of rows inserted.
+        """
+        column = getattr(model, key)
+        existing = set(self.session.scalars(select(column)))
+        missing = [row for row in rows if row[key] not in existing]
+        if prepare is not None:
+            missing = [prepare(row) for row in missing]
+        if missing:
+            # render_nulls keeps rows with None values in the same batch, as the ORM
+            # otherwise splits the INSERT by which columns are None
+            self.session.execute(insert(model).execution_options(render_nulls=True), missing)
+        return len(missing)
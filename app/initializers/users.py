@@ -1,14 +1,17 @@
 from typing import List
-import yaml
-from pkg_resources import resource_filename
-from app.database import get_db
+
+from app.initializers.seeder import Seeder
 from app.models.user import User
 from app.utils import get_logger, hash_password
 
 logger = get_logger("USERS-INITIALIZER")
 
 
-def _init_users(users: List[dict]):
+def _hash_user_password(user: dict) -> dict:
+    return dict(user, password=hash_password(user["password"]))
+
+
+def _init_users(users: List[dict], seeder: Seeder):
     """
     Initialize users in the database.
 
@@ -16,6 +19,8 @@ def _init_users(users: List[dict]):
     ----------
     users : List[dict]
         A list of user data to initialize in the database.
+    seeder : Seeder
+        The seeding engine.
 
     Returns
     -------
@@ -24,43 +29,36 @@ def _init_users(users: List[dict]):
     """
     logger.info("Initializing users...")
 
-    # Use get_db to get a session
-    session = next(get_db())
-    # Convert to database models
     init_users = [
-        User(
-            user_id=user["user_id"],
-            email=user["email"],
-            password=hash_password(user["password"]),  # Hash the password before storing
-            role=user.get("role", "user"),  # Default role is "user"
-        )
+        {
+            "user_id": user["user_id"],
+            "email": user["email"],
+            "password": user["password"],
+            "role": user.get("role", "user"),  # Default role is "user"
+        }
         for user in users
     ]
 
-    # Add to database
-    for user in init_users:
-        if session.query(User).filter(User.email == user.email).first():
-            logger.debug(f"Skipping user {user.email} as it already exists")
-            continue
-        session.add(user)
-
-    # Commit
-    session.commit()
-    logger.info("Users initialized")
+    # Passwords are hashed only for the users that are actually inserted
+    added = seeder.seed(User, init_users, key="email", prepare=_hash_user_password)
+    logger.info(f"Users initialized ({added} added)")
 
 
-def load():
+def load(seeder: Seeder = None):
     """
     Load users from a YAML file.
 
+    Parameters
+    ----------
+    seeder : Seeder, optional
+        The seeding engine. A new one is opened and committed if omitted.
+
     Returns
     -------
     None
         This function does not return a value.
     """
-    # Open and read the users YAML file
-    with open(resource_filename("app", "resources/users.yml")) as f:
-        data = yaml.safe_load(f)
-
-    # Convert the loaded data to initialize users
-    _init_users(data["users"])
+    if seeder is None:
+        with Seeder.open() as seeder:
+            return load(seeder)
+    _init_users(seeder.resource("users.yml")["users"], seeder)
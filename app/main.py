@@ -1,9 +1,8 @@
 import os
-import fire
-import uvicorn
+
 from dotenv import load_dotenv
 
-from app.database import init_db
+from app.database import init_async_db, init_db
 from app.events import on_start
 from app.utils import get_logger
 
@@ -27,11 +26,17 @@ def run_app():
     """
     db_url = os.getenv("DB_URL", "sqlite:///./test.db")
     init_db(db_url)
-    logger.info("Initializing data, this may take a few seconds...")
+    if os.getenv("DB_MODE", "sync") == "async":
+        init_async_db(db_url)
+    logger.info("Initializing data...")
     on_start()
     logger.info("Initialization complete, starting server...")
 
 
 if __name__ == "__main__":
+    # Imported here so that importing this module stays cheap (see benchmarks/startup.py)
+    import fire
+    import uvicorn
+
     fire.Fire(run_app)
     uvicorn.run("app.api:app", host="0.0.0.0", port=8000)
@@ -0,0 +1,56 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Exported by the Instrumentator's /metrics endpoint, which serves the default
+# Prometheus registry.
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    ["engine"],
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Database connections open beyond the pool size",
+    ["engine"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent acquiring a database connection from the pool",
+    ["engine"],
+    buckets=WAIT_BUCKETS,
+)
+DB_SESSION_WAIT = Histogram(
+    "db_session_wait_seconds",
+    "Time requests waited for a database session while the pool was at capacity",
+    buckets=WAIT_BUCKETS,
+)
+CACHE_HITS = Counter("cache_hits", "Lookups served from a cache", ["cache"])
+CACHE_MISSES = Counter("cache_misses", "Lookups a cache could not serve", ["cache"])
+CACHE_EVICTIONS = Counter(
+    "cache_evictions",
+    "Entries an in-process cache dropped because it was full or they expired",
+    ["cache", "reason"],
+)
+
+
+def observe_pool(pool, engine: str):
+    """
+    Report the status of a connection pool through the pool gauges.
+
+    The gauges read the pool when Prometheus scrapes them, so they are current even
+    when no request is being served.
+
+    Parameters
+    ----------
+    pool : Pool
+        The SQLAlchemy connection pool.
+    engine : str
+        Value of the ``engine`` label, e.g. ``"sync"`` or ``"async"``.
+    """
+    DB_POOL_CHECKED_OUT.labels(engine).set_function(
+        lambda: getattr(pool, "checkedout", lambda: 0)()
+    )
+    DB_POOL_OVERFLOW.labels(engine).set_function(
+        lambda: max(getattr(pool, "overflow", lambda: 0)(), 0)
+    )
@@ -0,0 +1,304 @@
+import gzip
+import hashlib
+import importlib.util
+import os
+import zlib
+from functools import partial
+from typing import Optional
+
+import anyio
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import TTLCache
+
+# Responses smaller than this are sent as is: compressing them saves less than it costs
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Levels of each encoding; the defaults favour speed over the last few percent
+GZIP_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+# Compressed bodies of GET responses kept, keyed by encoding and body digest
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+COMPRESSION_CACHE_TTL = float(os.getenv("COMPRESSION_CACHE_TTL", "3600"))
+# Larger bodies are compressed on every request rather than cached
+CACHE_MAX_BODY = 1024 * 1024
+# Bodies and chunks from this size on are compressed in a worker thread, not on the
+# event loop; below it the thread hand-off costs more than the compression
+THREAD_MIN_SIZE = 64 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _gzip_stream():
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+
+
+def _brotli(body: bytes) -> bytes:
+    import brotli
+
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+class _BrotliStream:
+    def __init__(self):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _zstd(body: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+
+def _zstd_stream():
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+
+# Encoding: (module it needs, whole-body compressor, streaming compressor factory).
+# Listed by preference among the encodings a client accepts equally.
+ENCODINGS = {
+    "zstd": ("zstandard", _zstd, _zstd_stream),
+    "br": ("brotli", _brotli, _BrotliStream),
+    "gzip": (None, lambda body: gzip.compress(body, GZIP_LEVEL, mtime=0), _gzip_stream),
+}
+
+
+def available_encodings() -> tuple:
+    """
+    Return the encodings whose optional module is installed, by preference.
+    """
+    return tuple(
+        name
+        for name, (module, _, _) in ENCODINGS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    )
+
+
+def negotiate(accept_encoding: str, encodings: tuple) -> Optional[str]:
+    """
+    Pick the encoding of a response from an ``Accept-Encoding`` header.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        The header, e.g. ``"gzip, br;q=0.9"``.
+    encodings : tuple of str
+        The encodings the server offers, by preference.
+
+    Returns
+    -------
+    str or None
+        The accepted encoding with the highest weight, ties going to the server's
+        preference, or None to send the body as is.
+    """
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name:
+            weights[name.strip()] = weight
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+async def _run(fn, data: bytes, *args) -> bytes:
+    """
+    Run a compression function, in a worker thread when `data` is large.
+    """
+    if len(data) >= THREAD_MIN_SIZE:
+        return await anyio.to_thread.run_sync(partial(fn, data, *args))
+    return fn(data, *args)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best encoding the client accepts.
+
+    zstd and brotli are offered when their optional modules (``zstandard``,
+    ``brotli``) are installed, gzip always. Only compressible media types of at
+    least ``COMPRESSION_MIN_SIZE`` bytes are compressed; streamed responses,
+    without ``Content-Length``, are compressed chunk by chunk. The compressed body
+    of a GET response is cached under its encoding and a digest of the
+    uncompressed body, so hot payloads that come back byte-identical, e.g. the
+    product types or cached products, are compressed once. The digest is the key,
+    so a cached body is only ever sent for identical content.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        The application to wrap.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.encodings = available_encodings()
+        self.cache = TTLCache("compressed_responses", COMPRESSION_CACHE_SIZE, COMPRESSION_CACHE_TTL)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, encoding, cacheable=scope["method"] == "GET", send=send)
+        await self.app(scope, receive, responder)
+
+    def compress(self, encoding: str, body: bytes, cacheable: bool) -> bytes:
+        """
+        Compress a whole body, through the cache when `cacheable`.
+        """
+        if not cacheable or len(body) > CACHE_MAX_BODY:
+            return ENCODINGS[encoding][1](body)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = ENCODINGS[encoding][1](body)
+            self.cache.set(key, compressed)
+        return compressed
+
+
+class _Responder:
+    """
+    The ``send`` of one response: holds the start message until the first body
+    message shows whether and how to compress.
+
+    A response with a ``Content-Length`` of at most ``CACHE_MAX_BODY`` is buffered
+    and compressed whole, even if it arrives in several messages as through
+    ``BaseHTTPMiddleware``. Larger ones, e.g. a big SVG file, and those without
+    a length are compressed chunk by chunk as they stream. A response going on
+    with anything but a body message, e.g. ``http.response.pathsend``, is sent
+    unchanged.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, cacheable: bool, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.send = send
+        self.start = None
+        self.headers = None
+        self.buffer = None  # Body parts of a response compressed whole
+        self.stream = None  # Compressor of a streamed response
+        self.passthrough = False
+
+    async def __call__(self, message: Message):
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.headers = MutableHeaders(raw=message["headers"])
+            if message["status"] != 200 or not _is_compressible(self.headers):
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body":
+            # E.g. ``http.response.pathsend``: the body is not ours to compress
+            if self.stream is None and self.buffer is None:
+                self.passthrough = True
+                await self.send(self.start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is not None:
+            chunk = await _run(self.stream.compress, body)
+            if not more_body:
+                chunk += self.stream.flush()
+            if chunk or not more_body:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+        if self.buffer is not None:
+            self.buffer.append(body)
+            if not more_body:
+                await self._send_whole(b"".join(self.buffer))
+            return
+
+        self.headers.add_vary_header("Accept-Encoding")
+        length = self.headers.get("content-length")
+        if length is not None and int(length) < COMPRESSION_MIN_SIZE:
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+        elif length is None or int(length) > CACHE_MAX_BODY:
+            self._set_encoding()
+            if length is not None:
+                del self.headers["Content-Length"]
+            self.stream = ENCODINGS[self.encoding][2]()
+            await self.send(self.start)
+            await self(message)
+        elif more_body:
+            self.buffer = [body]
+        else:
+            await self._send_whole(body)
+
+    def _set_encoding(self):
+        self.headers["Content-Encoding"] = self.encoding
+        etag = self.headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The compressed bytes differ from the ones the strong ETag names
+            self.headers["ETag"] = f"W/{etag}"
+
+    async def _send_whole(self, body: bytes):
+        self._set_encoding()
+        body = await _run(
+            partial(self.middleware.compress, self.encoding), body, self.cacheable
+        )
+        self.headers["Content-Length"] = str(len(body))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": body})
+
+
+def add_compression(app: FastAPI):
+    """
+    Compress the responses of the application, see `CompressionMiddleware`.
+
+    Parameters
+    ----------
+    app : FastAPI
+        The FastAPI application.
+
+    Returns
+    -------
+    None
+    """
+    app.add_middleware(CompressionMiddleware)
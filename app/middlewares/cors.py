@@ -3,6 +3,9 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.middlewares.query_count import QUERY_COUNT_HEADER
+from app.pagination import NEXT_CURSOR_HEADER
+
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "#{CORS_ORIGINS}#")
 
 origins = CORS_ORIGINS.split(",")
@@ -27,4 +30,5 @@ def add_cors(app: FastAPI):
         allow_credentials=False,
         allow_methods=["GET", "POST", "PUT", "DELETE"],
         allow_headers=["*"],
+        expose_headers=[QUERY_COUNT_HEADER, NEXT_CURSOR_HEADER],
     )
@@ -0,0 +1,47 @@
+import contextvars
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+# Mutable per-request counter; sync routes run in the threadpool with a copy of
+# the request context, so they share the same list object.
+_query_counter = contextvars.ContextVar("query_counter", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def add_query_counter(app: FastAPI):
+    """
+    Count the SQL statements executed while serving each request.
+
+    The total is returned in the ``X-Query-Count`` response header so tests can
+    assert an upper bound on the round trips a route makes.
+
+    Parameters
+    ----------
+    app : FastAPI
+        The FastAPI application.
+
+    Returns
+    -------
+    None
+    """
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        counter = [0]
+        token = _query_counter.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            _query_counter.reset(token)
+        response.headers[QUERY_COUNT_HEADER] = str(counter[0])
+        return response
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+# Bookkeeping key holding the version of the last applied migration
+MIGRATION_KEY = "migration"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One upgrade step of an existing database.
+
+    Attributes
+    ----------
+    version : int
+        Position of the step; steps run in increasing order, each one once.
+    description : str
+        What the step does, for the logs.
+    apply : callable
+        Called with a Connection inside the transaction that records the step.
+        It must tolerate a database where the change already exists, as steps
+        written before this module was the only path changing existing tables.
+    """
+
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _add_columns(table_name: str, *names: str) -> Callable[[Connection], None]:
+    """
+    Return a step adding the named columns of a model's table, if missing.
+
+    The columns are added as declared on the model, nullable and empty.
+    """
+
+    def apply(connection: Connection):
+        from app.database import Base
+
+        table = Base.metadata.tables[table_name]
+        inspector = inspect(connection)
+        if not inspector.has_table(table_name):
+            return
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        preparer = connection.dialect.identifier_preparer
+        for name in names:
+            if name in existing:
+                continue
+            column = table.c[name]
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(
+                text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                )
+            )
+
+    return apply
+
+
+def _steps(*steps: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    """
+    Return a step applying several steps in order.
+    """
+
+    def apply(connection: Connection):
+        for step in steps:
+            step(connection)
+
+    return apply
+
+
+def _create_indexes(*names: str) -> Callable[[Connection], None]:
+    """
+    Return a step creating the named indexes declared on the models, if missing.
+    """
+
+    def apply(connection: Connection):
+        from app.database import Base
+
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in names and index.name not in existing:
+                    index.create(connection)
+
+    return apply
+
+
+MIGRATIONS = (
+    Migration(
+        1,
+        "Index the foreign keys used by filters and relationship loads",
+        _create_indexes(
+            "ix_products_product_type_id",
+            "ix_products_user_id",
+            "ix_comparisons_user_id",
+            "ix_comparison_products_comparison_id",
+            "ix_comparison_products_product_id",
+        ),
+    ),
+    Migration(
+        2,
+        "Reference product images in the blob store by content hash",
+        _add_columns("products", "image_hash", "image_content_type"),
+    ),
+    Migration(
+        3,
+        "Add and index the typed projections of metadata values",
+        # The projections of existing rows are filled in by `initialize_all`
+        _steps(
+            _add_columns("product_metadata", "value_num", "value_text"),
+            _create_indexes(
+                "ix_product_metadata_attribute_num",
+                "ix_product_metadata_attribute_text",
+                "ix_product_metadata_product_attribute",
+            ),
+        ),
+    ),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def pending(applied: int) -> list:
+    """
+    Return the migrations newer than version `applied`, oldest first.
+
+    Parameters
+    ----------
+    applied : int
+        Version of the last applied migration, 0 if none.
+
+    Returns
+    -------
+    list of Migration
+        The migrations to apply.
+    """
+    return [migration for migration in MIGRATIONS if migration.version > applied]
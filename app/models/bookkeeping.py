@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String
+
+from app.database import Base
+
+
+class Bookkeeping(Base):
+    """
+    Key/value facts the application records about its own database, such as the
+    fingerprint of the schema (see `app.database.init_db`) and of each seed resource
+    file (see `app.initializer.initialize_all`).
+    """
+    __tablename__ = "bookkeeping"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(String(255))
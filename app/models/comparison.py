@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import JSON, Column, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship, Mapped
 from app.database import Base
 
@@ -7,7 +7,7 @@ class Comparison(Base):
     __tablename__ = "comparisons"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String(36), ForeignKey("users.user_id"))
+    user_id = Column(String(36), ForeignKey("users.user_id"), index=True)
     title = Column(String(256))
     description = Column(String(500))
     date_created = Column(String(50))
@@ -21,14 +21,36 @@ class Comparison(Base):
         back_populates="comparison",
         cascade="all, delete-orphan"
     )
+    summary = relationship(
+        "ComparisonSummary",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
 
 
 class ComparisonProduct(Base):
     __tablename__ = "comparison_products"
 
     id = Column(Integer, primary_key=True, index=True)
-    comparison_id = Column(Integer, ForeignKey("comparisons.id"))
-    product_id = Column(Integer, ForeignKey("products.id"))
+    comparison_id = Column(Integer, ForeignKey("comparisons.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
 
     comparison = relationship("Comparison", back_populates="products")
     product = relationship("Product")
+
+
+class ComparisonSummary(Base):
+    """
+    Figures derived from a comparison's products, kept up to date by
+    `app.summaries.refresh_summaries` whenever one of its inputs changes.
+    """
+    __tablename__ = "comparison_summaries"
+
+    comparison_id = Column(Integer, ForeignKey("comparisons.id"), primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0)
+    min_price = Column(Float)
+    max_price = Column(Float)
+    best_product_id = Column(Integer)
+    best_score = Column(Float)
+    # {attribute: {"product_id": ..., "score": ...}} of the best score per attribute
+    attribute_leaders = Column(JSON)
@@ -1,7 +1,63 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, JSON
-from sqlalchemy.orm import relationship, Mapped
+import math
+from typing import Optional, Tuple
+
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, Float, JSON
+from sqlalchemy.orm import relationship, Mapped, deferred, validates
 from app.database import Base
 
+PRODUCT_IMAGE_URL = "/api/products/{product_id}/image"
+# Fixed thumbnail sizes of product images: name -> longest side in pixels. Changing a
+# size requires deleting its variants from the blob store and backfilling again.
+THUMBNAIL_SIZES = {"small": 64, "medium": 160}
+# Size referenced by Product.thumbnail_url, i.e. by list and comparison views
+LIST_THUMBNAIL_SIZE = "small"
+# Length of the indexed text projection of metadata values
+VALUE_TEXT_LENGTH = 255
+
+
+def product_image_url(
+    product_id: int, image_hash: Optional[str], size: Optional[str] = None
+) -> Optional[str]:
+    """
+    Return the versioned image URL of a product, or None if it has no image.
+
+    `size` names a thumbnail size (see `THUMBNAIL_SIZES`); the full
+    image is referenced by default.
+    """
+    if not image_hash:
+        return None
+    url = PRODUCT_IMAGE_URL.format(product_id=product_id)
+    if size:
+        return f"{url}?size={size}&v={image_hash[:16]}"
+    return f"{url}?v={image_hash[:16]}"
+
+
+def project_value(value: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Return the typed projections of a metadata value, used to filter on it.
+
+    Parameters
+    ----------
+    value : str or None
+        The raw metadata value.
+
+    Returns
+    -------
+    tuple of (float or None, str or None)
+        The value as a number, or None if it is not one, and the value stripped,
+        lower-cased and cut to ``VALUE_TEXT_LENGTH`` characters.
+    """
+    if value is None:
+        return None, None
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        number = None
+    if number is not None and not math.isfinite(number):
+        number = None
+    return number, text.lower()[:VALUE_TEXT_LENGTH]
+
 
 class ProductType(Base):
     __tablename__ = "product_types"
@@ -15,10 +71,13 @@ class ProductType(Base):
 class Product(Base):
     __tablename__ = "products"
     id = Column(Integer, primary_key=True, index=True)
-    product_type_id = Column(Integer, ForeignKey("product_types.id"))
-    user_id = Column(String(36), ForeignKey("users.user_id"))
+    product_type_id = Column(Integer, ForeignKey("product_types.id"), index=True)
+    user_id = Column(String(36), ForeignKey("users.user_id"), index=True)
     name = Column(String(200))
-    image_base64 = Column(String(5000))
+    # Legacy inline image, superseded by the blob store (see app.images).
+    image_base64 = deferred(Column(String(5000)))
+    image_hash = Column(String(64))
+    image_content_type = Column(String(100))
     brand = Column(String(100))
     price = Column(Float)
     score = Column(Float)
@@ -32,13 +91,44 @@ class Product(Base):
         cascade="all, delete-orphan"
     )
 
+    @property
+    def image_url(self):
+        """
+        URL of the product image, versioned by its content hash so clients can cache
+        it indefinitely. ``None`` when the product has no stored image.
+        """
+        return product_image_url(self.id, self.image_hash)
+
+    @property
+    def thumbnail_url(self):
+        """
+        URL of the small thumbnail of the product image, for list views. Until the
+        thumbnail is generated it serves the full image. ``None`` without an image.
+        """
+        return product_image_url(self.id, self.image_hash, LIST_THUMBNAIL_SIZE)
+
 
 class ProductMetadata(Base):
     __tablename__ = "product_metadata"
+    __table_args__ = (
+        # Attribute filters look up matching products through these two, without
+        # reading the table itself (see app.routes.products)
+        Index("ix_product_metadata_attribute_num", "attribute", "value_num", "product_id"),
+        Index("ix_product_metadata_attribute_text", "attribute", "value_text", "product_id"),
+        Index("ix_product_metadata_product_attribute", "product_id", "attribute"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"))
     attribute = Column(String(100))
     value = Column(String(500))
     score = Column(Float)
+    # Typed projections of `value`, maintained from it (see `project_value`)
+    value_num = Column(Float)
+    value_text = Column(String(VALUE_TEXT_LENGTH))
 
     product = relationship("Product", back_populates="product_metadata")
+
+    @validates("value")
+    def _project_value(self, key, value):
+        self.value_num, self.value_text = project_value(value)
+        return value
@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**keys) -> str:
+    """
+    Encode the sort keys of the last row of a page into an opaque cursor.
+
+    Parameters
+    ----------
+    **keys
+        The column values the listing is ordered by, e.g. ``id=42``.
+
+    Returns
+    -------
+    str
+        A URL-safe cursor string.
+    """
+    raw = json.dumps(keys, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *required: str) -> dict:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Parameters
+    ----------
+    cursor : str
+        The cursor received from the client.
+    *required : str
+        Names of the keys the cursor must contain.
+
+    Returns
+    -------
+    dict
+        The sort keys stored in the cursor.
+
+    Raises
+    ------
+    HTTPException
+        If the cursor is malformed or lacks one of the required keys.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        keys = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(keys, dict) or any(
+        not isinstance(keys.get(name), int) for name in required
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return keys
@@ -0,0 +1,369 @@
+import csv
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+from sqlalchemy import insert
+
+from app import database, search
+from app.catalog import get_schema
+from app.models.product import Product, ProductMetadata, project_value
+from app.utils import get_logger
+
+logger = get_logger("PRODUCT-IMPORT")
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+FILE_FORMATS = ("csv", "xlsx")
+
+# Columns of every row; each other column is a metadata attribute of the product
+# type, optionally with its score in an ``<attribute>_score`` column. A schema
+# attribute named after one of them, e.g. ``brand``, is read as the column only.
+PRODUCT_COLUMNS = ("name", "brand", "price", "score")
+SCORE_SUFFIX = "_score"
+# Rows with errors listed in a job status; the others are only counted
+MAX_REPORTED_ERRORS = 1000
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 100
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_executor = None
+
+
+def default_batch_size() -> int:
+    return int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+
+@dataclass
+class ImportJob:
+    """
+    State of a bulk product import, updated by its worker after each batch.
+
+    Attributes
+    ----------
+    id : str
+        The job ID.
+    product_type_id : int
+        The type of every imported product.
+    user_id : str
+        The owner of the imported products, the admin who started the import.
+    format : str
+        ``csv`` or ``xlsx``.
+    batch_size : int
+        Rows inserted per transaction.
+    path : str
+        The uploaded file, removed once the job is finished.
+    status : str
+        ``queued``, ``running``, ``completed`` or ``failed``.
+    total_rows : int, optional
+        Data rows in the file, known once the job has started.
+    processed_rows : int
+        Rows validated so far, imported or not.
+    imported_rows : int
+        Rows committed as products.
+    failed_rows : int
+        Rows rejected by validation.
+    errors : list of dict
+        ``{"row": <line in the file>, "errors": [...]}`` for the first
+        ``MAX_REPORTED_ERRORS`` rejected rows.
+    error : str, optional
+        Why the job failed. Batches committed before that stay imported.
+    """
+
+    id: str
+    product_type_id: int
+    user_id: str
+    format: str
+    batch_size: int
+    path: str
+    status: str = QUEUED
+    total_rows: Optional[int] = None
+    processed_rows: int = 0
+    imported_rows: int = 0
+    failed_rows: int = 0
+    errors: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        """Share of the rows processed, from 0 to 1."""
+        if self.status == COMPLETED:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return self.processed_rows / self.total_rows
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows processed per second since the job started."""
+        if self.started_at is None:
+            return 0.0
+        elapsed = ((self.finished_at or datetime.now(timezone.utc)) - self.started_at).total_seconds()
+        return self.processed_rows / elapsed if elapsed > 0 else 0.0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            # One import at a time: concurrent ones would only contend for writes
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="product-import")
+        return _executor
+
+
+def start_import(
+    path: str, file_format: str, product_type_id: int, user_id: str, batch_size: Optional[int] = None
+) -> ImportJob:
+    """
+    Queue the import of an uploaded CSV or XLSX file of products.
+
+    The file has a header row. ``name``, ``brand``, ``price`` and ``score`` are
+    required; every other column must be an attribute of the product type's
+    metadata schema, or ``<attribute>_score`` for the score of that metadata
+    (0 if absent). Empty cells leave an attribute out. Rows that do not fit the
+    schema are reported in the job and skipped; the others are inserted in
+    transactions of `batch_size` rows.
+
+    Parameters
+    ----------
+    path : str
+        The uploaded file. The job takes it over and removes it once finished.
+    file_format : str
+        ``csv`` or ``xlsx``.
+    product_type_id : int
+        The type of the products.
+    user_id : str
+        The owner of the products.
+    batch_size : int, optional
+        Rows per transaction (default is ``IMPORT_BATCH_SIZE``, 1000).
+
+    Returns
+    -------
+    ImportJob
+        The queued job.
+    """
+    job = ImportJob(
+        id=uuid.uuid4().hex,
+        product_type_id=product_type_id,
+        user_id=user_id,
+        format=file_format,
+        batch_size=batch_size or default_batch_size(),
+        path=path,
+    )
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = [key for key, other in _jobs.items() if other.status in (COMPLETED, FAILED)]
+        for key in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del _jobs[key]
+    _get_executor().submit(_run, job)
+    return job
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    """
+    Return an import job of this worker by ID, or None if unknown or forgotten.
+    """
+    return _jobs.get(job_id)
+
+
+def _count_rows(job: ImportJob, frame=None) -> int:
+    if frame is not None:
+        return len(frame)
+    with open(job.path, newline="", encoding="utf-8-sig") as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def _read_batches(job: ImportJob) -> Iterator[list]:
+    """
+    Yield the rows of the file as lists of ``{column: str}``, `batch_size` at a time.
+    """
+    import pandas as pd  # Imported on first use to keep startup fast
+
+    options = {"dtype": str, "keep_default_na": False}
+    if job.format == "xlsx":
+        frame = pd.read_excel(job.path, engine="openpyxl", **options)
+        job.total_rows = _count_rows(job, frame)
+        chunks = (
+            frame.iloc[start : start + job.batch_size]
+            for start in range(0, len(frame), job.batch_size)
+        )
+    else:
+        job.total_rows = _count_rows(job)
+        chunks = pd.read_csv(job.path, encoding="utf-8-sig", chunksize=job.batch_size, **options)
+    for chunk in chunks:
+        columns = [str(column).strip() for column in chunk.columns]
+        yield [dict(zip(columns, values)) for values in chunk.itertuples(index=False, name=None)]
+
+
+def _check_columns(columns: list, schema: dict):
+    missing = [column for column in PRODUCT_COLUMNS if column not in columns]
+    unknown = [
+        column
+        for column in columns
+        if column not in PRODUCT_COLUMNS
+        and column not in schema
+        and not (
+            column.endswith(SCORE_SUFFIX)
+            and column[: -len(SCORE_SUFFIX)] in schema
+            and column[: -len(SCORE_SUFFIX)] not in PRODUCT_COLUMNS
+        )
+    ]
+    problems = []
+    if missing:
+        problems.append(f"Missing columns: {', '.join(missing)}.")
+    if unknown:
+        problems.append(f"Columns not in the metadata schema: {', '.join(unknown)}.")
+    if problems:
+        raise ValueError(" ".join(problems))
+
+
+def _number(text: str) -> Optional[float]:
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _validate(row: dict, schema: dict, job: ImportJob) -> tuple:
+    """
+    Convert a row into product and metadata values, or a list of errors.
+    """
+    row = {column: str(value).strip() for column, value in row.items()}
+    errors = []
+    product = {"product_type_id": job.product_type_id, "user_id": job.user_id}
+    for column in ("name", "brand"):
+        if not row[column]:
+            errors.append(f"{column} is required")
+        product[column] = row[column]
+    for column in ("price", "score"):
+        product[column] = _number(row[column])
+        if product[column] is None:
+            errors.append(f"{column} must be a number")
+
+    metadata = []
+    for attribute, attribute_type in schema.items():
+        value = row.get(attribute, "")
+        if not value or attribute in PRODUCT_COLUMNS:
+            continue
+        if attribute_type in ("integer", "float"):
+            number = _number(value)
+            if number is None or (attribute_type == "integer" and not number.is_integer()):
+                errors.append(f"{attribute} must be of type {attribute_type}")
+                continue
+            if attribute_type == "integer":
+                value = str(int(number))  # Spreadsheets turn 12 into 12.0
+        score = row.get(attribute + SCORE_SUFFIX) or "0"
+        if _number(score) is None:
+            errors.append(f"{attribute}{SCORE_SUFFIX} must be a number")
+            continue
+        value_num, value_text = project_value(value)
+        metadata.append(
+            {
+                "attribute": attribute,
+                "value": value,
+                "score": _number(score),
+                "value_num": value_num,
+                "value_text": value_text,
+            }
+        )
+    return product, metadata, errors
+
+
+def _insert_products(session, products: list) -> List[int]:
+    """
+    Insert product rows and return their IDs, in the order of `products`.
+
+    One executemany with ``RETURNING`` where the dialect supports it with ordered
+    results (SQLite, PostgreSQL, MariaDB); otherwise, as on MySQL, one insert per row
+    reading the generated key.
+    """
+    table = Product.__table__
+    dialect = session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        return session.scalars(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), products
+        ).all()
+    statement = insert(table)
+    return [session.execute(statement, product).inserted_primary_key[0] for product in products]
+
+
+def _insert_batch(products: list, metadata: list) -> List[int]:
+    """
+    Insert products and their metadata in one transaction and return the product IDs.
+
+    Core inserts of the tables, as ORM bulk inserts spend more time building the
+    parameters than the database spends inserting.
+    """
+    session = database.SessionLocal()
+    try:
+        product_ids = _insert_products(session, products)
+        rows = [
+            dict(meta, product_id=product_id)
+            for product_id, product_metadata in zip(product_ids, metadata)
+            for meta in product_metadata
+        ]
+        if rows:
+            session.execute(insert(ProductMetadata.__table__), rows)
+        search.index_products(session, product_ids)
+        session.commit()
+        return product_ids
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _run(job: ImportJob):
+    job.status = RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    try:
+        schema = get_schema(job.product_type_id)
+        if schema is None:
+            raise ValueError(f"Unknown product type {job.product_type_id}")
+        line = 1  # The header
+        for batch_number, rows in enumerate(_read_batches(job)):
+            if batch_number == 0 and rows:
+                _check_columns(list(rows[0]), schema)
+            products, metadata = [], []
+            for row in rows:
+                line += 1
+                product, product_metadata, errors = _validate(row, schema, job)
+                if errors:
+                    job.failed_rows += 1
+                    if len(job.errors) < MAX_REPORTED_ERRORS:
+                        job.errors.append({"row": line, "errors": errors})
+                    continue
+                products.append(product)
+                metadata.append(product_metadata)
+            if products:
+                _insert_batch(products, metadata)
+            job.imported_rows += len(products)
+            job.processed_rows += len(rows)
+        job.status = COMPLETED
+    except Exception as e:
+        logger.exception(f"Import {job.id} failed")
+        job.error = str(e) or type(e).__name__
+        job.status = FAILED
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        try:
+            os.remove(job.path)
+        except OSError:
+            pass
+    logger.info(
+        f"Import {job.id} {job.status}: {job.imported_rows} imported, {job.failed_rows} rejected "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
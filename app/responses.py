@@ -0,0 +1,107 @@
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+JSON_MEDIA_TYPE = "application/json"
+
+# For responses that never change at their URL, such as images versioned by their
+# content hash (see Product.image_url)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# For responses that may change: clients must revalidate them, e.g. via ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# For user-uploaded files such as product images: browsers must neither guess
+# another type nor run scripts should one still be opened as a document
+UPLOAD_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Security-Policy": "sandbox",
+}
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def dump_json(model: Type[BaseModel], obj) -> bytes:
+    """
+    Validate one object against a DTO and serialize it straight to JSON bytes.
+
+    Parameters
+    ----------
+    model : type of BaseModel
+        The DTO, which must read attributes (``from_attributes``) to take ORM
+        objects.
+    obj : object
+        An ORM object, a dict, or an instance of `model` (not validated again).
+
+    Returns
+    -------
+    bytes
+        The JSON document.
+    """
+    if not isinstance(obj, model):
+        obj = model.model_validate(obj)
+    return obj.__pydantic_serializer__.to_json(obj)
+
+
+def dump_json_list(model: Type[BaseModel], objs: Iterable) -> bytes:
+    """
+    Validate objects against a DTO and serialize them straight to a JSON list.
+
+    The list is validated in one call into pydantic-core and serialized in
+    another, without an intermediate list of dicts. Reading ORM attributes and
+    building the DTOs remains most of the cost.
+
+    Parameters
+    ----------
+    model : type of BaseModel
+        The DTO of each item, see `dump_json`.
+    objs : iterable
+        The items.
+
+    Returns
+    -------
+    bytes
+        The JSON list.
+    """
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(objs), from_attributes=True))
+
+
+def model_response(
+    model: Type[BaseModel],
+    obj,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Return one object as a pre-encoded JSON response, see `dump_json`.
+
+    FastAPI sends a returned Response as is, so the route's ``response_model`` is
+    then only used for the API documentation and the object is validated once.
+    """
+    return Response(
+        dump_json(model, obj), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE
+    )
+
+
+def list_response(
+    model: Type[BaseModel], objs: Iterable, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Return a list of objects as a pre-encoded JSON response, see `dump_json_list`.
+    """
+    return Response(dump_json_list(model, objs), headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def json_response(content, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    Return data already shaped for the client as a JSON response.
+
+    Encodes with pydantic-core, about three times faster than the stdlib encoder
+    behind ``JSONResponse``. `content` may hold DTO instances.
+    """
+    return Response(to_json(content), headers=headers, media_type=JSON_MEDIA_TYPE)
@@ -1,18 +1,30 @@
-from typing import List
+import os
+import tempfile
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, select, update
 from sqlalchemy.orm import Session
 from starlette import status
 
+from app import database, export, product_import
+from app.catalog import get_schema, refresh_catalog
 from app.database import get_db
 from app.models.product import ProductType, Product
 from app.models.user import User
-from app.schemas.product import ProductTypeCreateDTO, ProductTypeDTO
+from app.schemas.product import ImportJobDTO, ProductTypeCreateDTO, ProductTypeDTO
 from app.schemas.user import UserDTO, UserRoleUpdate
-from app.utils import get_current_admin_user
+from app.summaries import SUMMARY_KEY, SUMMARY_VERSION, refresh_summaries
+from app.utils import get_current_admin_user, invalidate_principal
 
 router = APIRouter()
 
+USER_ROLES = ("user", "admin")
+
+# Largest file accepted by the bulk import
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(100 * 1024 * 1024)))
+
 @router.post("/product-types", response_model=ProductTypeDTO, status_code=status.HTTP_201_CREATED)
 def create_product_type(
     product_type_data: ProductTypeCreateDTO,
@@ -42,6 +54,7 @@ def create_product_type(
     db.add(new_product_type)
     db.commit()
     db.refresh(new_product_type)
+    refresh_catalog(db)
     return ProductTypeDTO.model_validate(new_product_type)
 
 
@@ -83,6 +96,7 @@ def delete_product_type(
     # Delete the product type
     db.delete(product_type)
     db.commit()
+    refresh_catalog(db)
     return {"message": "Product type deleted successfully"}
 
 
@@ -112,25 +126,44 @@ def update_users_roles(
     Raises
     ------
     HTTPException
-        If any user is not found or a role is invalid.
+        If any user is not found or a role is invalid, listing every offending user.
+        No role is changed in that case.
     """
-    updated_users = []
-    for user_data in user_roles_update:
-        user = db.query(User).filter(User.user_id == user_data.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail=f"User {user_data.user_id} not found.")
-
-        if user_data.role not in ["user", "admin"]:
-            raise HTTPException(status_code=400, detail=f"Invalid role for {user_data.user_id}.")
+    # The last entry wins when a user appears more than once
+    roles = {user_data.user_id: user_data.role for user_data in user_roles_update}
+    if not roles:
+        return []
 
-        user.role = user_data.role
-        updated_users.append(user)
+    emails = dict(
+        db.execute(select(User.user_id, User.email).where(User.user_id.in_(roles))).all()
+    )
+    missing = [user_id for user_id in roles if user_id not in emails]
+    invalid = [user_id for user_id, role in roles.items() if role not in USER_ROLES]
+    if missing or invalid:
+        problems = []
+        if missing:
+            problems.append(f"Users not found: {', '.join(missing)}.")
+        if invalid:
+            problems.append(f"Invalid role for: {', '.join(invalid)}.")
+        raise HTTPException(status_code=404 if missing else 400, detail=" ".join(problems))
 
+    result = db.execute(
+        update(User)
+        .where(User.user_id.in_(roles))
+        .values(role=case(roles, value=User.user_id))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(roles):
+        # A user was deleted since the lookup; apply nothing
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Users changed during the update, please retry.")
     db.commit()
-    for user in updated_users:
-        db.refresh(user)
+    # Role changes, revoked admin rights in particular, apply from the next request
+    invalidate_principal(*emails.values())
 
-    return [UserDTO.model_validate(user) for user in updated_users]
+    return [
+        UserDTO(user_id=user_id, email=emails[user_id], role=role) for user_id, role in roles.items()
+    ]
 
 
 @router.get("/users", response_model=List[UserDTO])
@@ -153,4 +186,166 @@ def get_all_users(db: Session = Depends(get_db), admin_user: User = Depends(get_
     users = db.query(User).all()
     if not users:
         raise HTTPException(status_code=404, detail="No users found.")
-    return users
\ No newline at end of file
+    return users
+
+@router.post("/comparison-summaries/rebuild", status_code=200)
+def rebuild_comparison_summaries(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Recompute every comparison summary from the comparisons and their products.
+
+    The summaries are kept up to date as comparisons and products change; this is
+    for repairing them after the tables were modified outside the API.
+
+    Parameters
+    ----------
+    db : Session
+        The database session dependency.
+
+    admin_user : User
+        The current authenticated admin user.
+
+    Returns
+    -------
+    dict
+        A success message with the number of summaries written.
+    """
+    count = refresh_summaries(db)
+    database.write_bookkeeping(db, {SUMMARY_KEY: SUMMARY_VERSION})
+    db.commit()
+    database.bookkeeping[SUMMARY_KEY] = SUMMARY_VERSION
+    return {"message": f"Rebuilt {count} comparison summaries"}
+
+
+@router.get("/export/products", response_class=StreamingResponse)
+def export_products(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    product_type_id: Optional[int] = None,
+    gzip: bool = False,
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Stream a dump of every product with its metadata, for analytics.
+
+    The export is generated while it is sent, from one database cursor read in
+    batches, so the memory used stays the same whatever the catalog size, and the
+    dump reflects a single consistent snapshot. See `app.export.export_products`.
+
+    Parameters
+    ----------
+    export_format : str, optional
+        ``ndjson`` (default), one product per line, or ``csv``, one metadata entry
+        per row. Passed as ``format``.
+    product_type_id : int, optional
+        Export only the products of this type.
+    gzip : bool, optional
+        Gzip the file (default is False).
+    admin_user : User
+        The current authenticated admin user.
+
+    Returns
+    -------
+    StreamingResponse
+        The export, as an attachment.
+    """
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv"
+    filename = f"products.{export_format}"
+    if gzip:
+        media_type, filename = "application/gzip", f"{filename}.gz"
+    return StreamingResponse(
+        export.export_products(export_format, product_type_id, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/imports/products", response_model=ImportJobDTO, status_code=status.HTTP_202_ACCEPTED)
+async def import_products(
+    request: Request,
+    product_type_id: int,
+    file_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    batch_size: Optional[int] = Query(None, ge=1, le=50000),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Start importing products from a CSV or XLSX file sent as the request body.
+
+    The file is stored and the import runs in the background, in transactions of
+    `batch_size` rows; follow it with ``GET /api/admin/imports/{job_id}``. See
+    `app.product_import.start_import` for the expected columns.
+
+    Parameters
+    ----------
+    request : Request
+        The request, whose body is the file.
+    product_type_id : int
+        The type of the imported products; rows are validated against its
+        metadata schema.
+    file_format : str, optional
+        ``csv`` (default) or ``xlsx``. Passed as ``format``.
+    batch_size : int, optional
+        Rows per transaction (default is ``IMPORT_BATCH_SIZE``, 1000).
+    admin_user : User
+        The current authenticated admin user, owner of the imported products.
+
+    Returns
+    -------
+    ImportJobDTO
+        The queued job.
+
+    Raises
+    ------
+    HTTPException
+        400 if the product type is unknown or the body is empty, 413 if the file
+        exceeds ``IMPORT_MAX_BYTES``.
+    """
+    if get_schema(product_type_id) is None:
+        raise HTTPException(status_code=400, detail="Unknown product type")
+
+    upload = tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False)
+    size = 0
+    try:
+        with upload:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > IMPORT_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="File too large")
+                upload.write(chunk)
+        if not size:
+            raise HTTPException(status_code=400, detail="The file is empty")
+    except BaseException:
+        os.remove(upload.name)
+        raise
+
+    job = product_import.start_import(
+        upload.name, file_format, product_type_id, admin_user.user_id, batch_size
+    )
+    return ImportJobDTO.model_validate(job)
+
+
+@router.get("/imports/{job_id}", response_model=ImportJobDTO)
+def get_import(job_id: str, admin_user: User = Depends(get_current_admin_user)):
+    """
+    Report the progress of a product import.
+
+    Jobs live in the memory of the worker that runs them, which keeps the last
+    finished ones only.
+
+    Parameters
+    ----------
+    job_id : str
+        The ID returned when the import was started.
+    admin_user : User
+        The current authenticated admin user.
+
+    Returns
+    -------
+    ImportJobDTO
+        The status, progress, throughput and rejected rows of the import.
+    """
+    job = product_import.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return ImportJobDTO.model_validate(job)
@@ -0,0 +1,150 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.hashing import hash_password_async, verify_and_update_async
+from app.models.user import User
+from app.schemas.user import UserBase, UserDTO, UserRegister, UserUpdate
+from app.utils import create_access_token, get_current_user_async, invalidate_principal
+
+# Async variants of the routes in `app.routes.auth`. Password hashing is CPU-bound,
+# so it runs on the password executor rather than on the event loop.
+router = APIRouter()
+
+
+async def _get_user_by(db: AsyncSession, *criteria):
+    result = await db.execute(select(User).where(*criteria))
+    return result.scalars().first()
+
+
+@router.post("/register", response_model=UserDTO)
+async def register(user: UserRegister, db: AsyncSession = Depends(get_async_db)) -> UserDTO:
+    """
+    Register a new user.
+
+    Parameters
+    ----------
+    user : UserRegister
+        The user details including email and password.
+    db : AsyncSession
+        The async database session dependency.
+
+    Returns
+    -------
+    UserDTO
+        The newly created user.
+
+    Raises
+    ------
+    HTTPException
+        If the user ID or the email is already registered.
+    """
+    if await _get_user_by(db, User.user_id == user.user_id):
+        raise HTTPException(status_code=400, detail="User ID already exists. Please choose another.")
+
+    if await _get_user_by(db, User.email == user.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    new_user = User(
+        user_id=user.user_id,
+        email=user.email,
+        password=await hash_password_async(user.password),
+        role=user.role
+    )
+
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+
+    return UserDTO.model_validate(new_user)
+
+
+@router.post("/login")
+async def login(user_data: UserBase, db: AsyncSession = Depends(get_async_db)) -> dict:
+    """
+    Authenticate a user and generate a JWT token.
+
+    Parameters
+    ----------
+    user_data: UserBase
+    db : AsyncSession
+        The async database session dependency.
+
+    Returns
+    -------
+    dict
+        A dictionary containing the JWT access token and token type.
+
+    Raises
+    ------
+    HTTPException
+        If the credentials are invalid, or 503 if password checks are saturated.
+    """
+    user = await _get_user_by(db, User.email == user_data.email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_async(user_data.password, user.password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+        await db.refresh(user)
+        invalidate_principal(user.email)
+    token = create_access_token({"sub": user.email, "user_id": user.user_id, "role": user.role})
+    return {"access_token": token, "token_type": "bearer", "user_id": user.user_id, "password": user.password, "role": user.role}
+
+
+@router.get("/me", response_model=UserDTO)
+async def get_current_user_route(user: User = Depends(get_current_user_async)):
+    """
+    Retrieve the currently authenticated user's details.
+    """
+    return user
+
+
+@router.put("/update", response_model=UserDTO)
+async def update_user_settings(
+        user_update: UserUpdate,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user_async)
+):
+    """
+    Update the authenticated user's settings (email, username, password).
+
+    Parameters
+    ----------
+    user_update : UserUpdate
+        The new user data provided by the client.
+    db : AsyncSession
+        Async database session.
+    current_user : User
+        The currently authenticated user.
+
+    Returns
+    -------
+    UserDTO
+        The updated user data.
+
+    Raises
+    ------
+    HTTPException
+        If the email is already in use or another validation fails.
+    """
+    previous_email = current_user.email
+    if user_update.email and user_update.email != current_user.email:
+        if await _get_user_by(db, User.email == user_update.email):
+            raise HTTPException(status_code=400, detail="Email already in use.")
+
+    if user_update.email:
+        current_user.email = user_update.email
+    if user_update.username:
+        current_user.username = user_update.username
+    if user_update.password:
+        current_user.password = await hash_password_async(user_update.password)
+
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_principal(previous_email, current_user.email)
+    return UserDTO.model_validate(current_user)
@@ -0,0 +1,121 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db, run_in_session
+from app.models.user import User
+from app.routes import comparisons
+from app.schemas.comparison import (
+    ComparisonBase,
+    ComparisonDTO,
+    ComparisonMatrixDTO,
+    ComparisonSummaryDTO,
+    ComparisonUpdate,
+)
+from app.utils import get_current_user_async
+
+# Async variants of the routes in `app.routes.comparisons`. Each one runs the sync
+# handler on an AsyncSession, so both modes share the same behaviour.
+router = APIRouter()
+
+
+@router.get("/", response_model=List[ComparisonDTO])
+async def get_comparisons(
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> List[ComparisonDTO]:
+    """
+    Retrieve a list of comparisons.
+
+    See `app.routes.comparisons.get_comparisons`.
+    """
+    return await run_in_session(
+        db, comparisons.get_comparisons, skip, limit, cursor
+    )
+
+
+@router.get("/summaries", response_model=List[ComparisonSummaryDTO])
+async def get_comparison_summaries(
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> List[ComparisonSummaryDTO]:
+    """
+    Retrieve a list of comparisons with their summary instead of their products.
+
+    See `app.routes.comparisons.get_comparison_summaries`.
+    """
+    return await run_in_session(
+        db, comparisons.get_comparison_summaries, skip, limit, cursor
+    )
+
+
+@router.post("/", response_model=ComparisonDTO)
+async def create_comparison(
+    comparison: ComparisonBase,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> ComparisonDTO:
+    """
+    Create a new comparison record.
+    """
+    return await run_in_session(
+        db, comparisons.create_comparison, comparison, current_user=current_user
+    )
+
+
+@router.get("/{comparison_id}", response_model=ComparisonDTO)
+async def get_comparison(
+    comparison_id: int, db: AsyncSession = Depends(get_async_db)
+) -> ComparisonDTO:
+    """
+    Retrieve a specific comparison by ID.
+    """
+    return await run_in_session(db, comparisons.get_comparison, comparison_id)
+
+
+@router.get("/{comparison_id}/matrix", response_model=ComparisonMatrixDTO)
+async def get_comparison_matrix(
+    comparison_id: int, db: AsyncSession = Depends(get_async_db)
+) -> ComparisonMatrixDTO:
+    """
+    Score the products of a comparison against each other, attribute by attribute.
+    """
+    return await run_in_session(db, comparisons.get_comparison_matrix, comparison_id)
+
+
+@router.delete("/{comparison_id}", response_model=dict)
+async def delete_comparison(
+    comparison_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> dict:
+    """
+    Delete a comparison by ID. Only the owner or an admin can delete it.
+    """
+    return await run_in_session(
+        db, comparisons.delete_comparison, comparison_id, current_user=current_user
+    )
+
+
+@router.put("/{comparison_id}", response_model=dict)
+async def update_comparison(
+    comparison_id: int,
+    updated_data: ComparisonUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Update an existing comparison record, ensuring only the owner or an admin can modify it.
+    """
+    return await run_in_session(
+        db,
+        comparisons.update_comparison,
+        comparison_id,
+        updated_data,
+        current_user=current_user,
+    )
@@ -0,0 +1,144 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db, run_in_session
+from app.models.user import User
+from app.routes import products
+from app.schemas.product import (
+    ProductBatchDTO,
+    ProductBatchRequest,
+    ProductCreate,
+    ProductDTO,
+    ProductUpdate,
+)
+from app.utils import get_current_user_async
+
+# Async variants of the routes in `app.routes.products`. Each one runs the sync
+# handler on an AsyncSession, so both modes share the same behaviour.
+router = APIRouter()
+
+
+@router.get("/", response_model=list[ProductDTO])
+async def get_products(
+    skip: int = 0,
+    limit: int = 10,
+    product_type_id: int = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: Optional[List[str]] = Query(None, alias="filter"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[ProductDTO]:
+    """
+    Retrieve a list of products, optionally filtered by product type.
+
+    See `app.routes.products.get_products`.
+    """
+    return await run_in_session(
+        db,
+        products.get_products,
+        skip,
+        limit,
+        product_type_id,
+        cursor,
+        fields,
+        filters,
+    )
+
+
+@router.get("/search", response_model=list[ProductDTO])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[ProductDTO]:
+    """
+    Search products by name, brand and metadata values, most relevant first.
+
+    See `app.routes.products.search_products`.
+    """
+    return await run_in_session(db, products.search_products, q, skip, limit)
+
+
+@router.post("/batch", response_model=ProductBatchDTO)
+async def get_products_batch(
+    batch: ProductBatchRequest, db: AsyncSession = Depends(get_async_db)
+) -> ProductBatchDTO:
+    """
+    Retrieve many products by ID at once.
+
+    See `app.routes.products.get_products_batch`.
+    """
+    return await run_in_session(db, products.get_products_batch, batch)
+
+
+@router.get("/{product_id}", response_model=ProductDTO)
+async def get_product(
+    product_id: int,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> ProductDTO:
+    """
+    Retrieve a single product by its ID, including the URL of its image.
+    """
+    return await run_in_session(db, products.get_product, product_id, fields)
+
+
+@router.get("/{product_id}/image", response_class=FileResponse)
+async def get_product_image(
+    product_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    size: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Serve the raw image of a product, or one of its thumbnails, from the blob store.
+    """
+    return await run_in_session(db, products.get_product_image, product_id, request, v, size)
+
+
+@router.post("/", response_model=ProductDTO)
+async def create_product(
+    product: ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> ProductDTO:
+    """
+    Create a new product record with an image in Base64 format.
+    """
+    return await run_in_session(
+        db, products.create_product, product, current_user=current_user
+    )
+
+
+@router.put("/{product_id}", response_model=ProductDTO)
+async def update_product(
+    product_id: int,
+    product: ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> ProductDTO:
+    """
+    Update an existing product record, ensuring only the owner or an admin can modify it.
+    """
+    return await run_in_session(
+        db, products.update_product, product_id, product, current_user=current_user
+    )
+
+
+@router.delete("/{product_id}")
+async def delete_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> dict:
+    """
+    Delete a product record, ensuring only the owner or an admin can delete it.
+    """
+    return await run_in_session(
+        db, products.delete_product, product_id, current_user=current_user
+    )
@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from app.schemas.user import UserBase, UserDTO, UserRegister, UserUpdate
 from app.models.user import User
 from app.database import get_db
-from app.utils import hash_password, verify_password, create_access_token, get_current_user
+from app.hashing import verify_and_update
+from app.utils import hash_password, create_access_token, get_current_user, invalidate_principal
 
 router = APIRouter()
 
@@ -72,11 +73,19 @@ def login(user_data: UserBase, db: Session = Depends(get_db)) -> dict:
     Raises
     ------
     HTTPException
-        If the credentials are invalid.
+        If the credentials are invalid, or 503 if password checks are saturated.
     """
     user = db.query(User).filter(User.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.password):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = verify_and_update(user_data.password, user.password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # The hash predates the current BCRYPT_ROUNDS
+        user.password = new_hash
+        db.commit()
+        invalidate_principal(user.email)
     token = create_access_token({"sub": user.email, "user_id": user.user_id, "role": user.role})
     return {"access_token": token, "token_type": "bearer", "user_id": user.user_id, "password": user.password, "role": user.role}
 
@@ -117,6 +126,8 @@ def update_user_settings(
     HTTPException
         If the email is already in use or another validation fails.
     """
+    previous_email = current_user.email
+
     # Check if the new email is already taken (if changed)
     if user_update.email and user_update.email != current_user.email:
         existing_user = db.query(User).filter(User.email == user_update.email).first()
@@ -133,4 +144,5 @@ def update_user_settings(
 
     db.commit()
     db.refresh(current_user)
+    invalidate_principal(previous_email, current_user.email)
     return UserDTO.model_validate(current_user)
\ No newline at end of file
@@ -1,19 +1,42 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from app import entity_cache
 from app.models.comparison import Comparison, ComparisonProduct
+from app.models.product import Product, ProductMetadata
 from app.models.user import User
-from app.schemas.comparison import ComparisonDTO, ComparisonBase, ComparisonProductDTO, ComparisonUpdate
-from app.database import get_db
+from app.schemas.comparison import (
+    ComparisonBase,
+    ComparisonDTO,
+    ComparisonMatrixDTO,
+    ComparisonProductDTO,
+    ComparisonSummaryDTO,
+    ComparisonUpdate,
+)
+from app.database import get_db, offload
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.responses import list_response, model_response
+from app.scoring import score_matrix
+from app.summaries import refresh_summaries
 from app.schemas.product import ProductDTO
 from app.utils import get_current_user
 
 router = APIRouter()
 
+# Loads Comparison -> ComparisonProduct -> Product -> ProductMetadata with one
+# SELECT ... IN per hop, so a page costs four queries whatever its size.
+COMPARISON_GRAPH = (
+    selectinload(Comparison.products)
+    .selectinload(ComparisonProduct.product)
+    .selectinload(Product.product_metadata)
+)
+
+
 @router.get("/", response_model=List[ComparisonDTO])
 def get_comparisons(
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ) -> List[ComparisonDTO]:
     """
@@ -22,21 +45,102 @@ def get_comparisons(
     Parameters
     ----------
     skip : int, optional
-        The number of records to skip (default is 0).
+        The number of records to skip (default is 0). Ignored when `cursor` is set.
     limit : int, optional
         The maximum number of records to return (default is 10).
+    cursor : str, optional
+        An opaque cursor from a previous page's ``X-Next-Cursor`` header. The page
+        then starts right after the last comparison of that page.
     db : Session
         The database session dependency.
 
     Returns
     -------
     list[ComparisonDTO]
-        A list of comparison records.
+        A list of comparison records ordered by ID.
     """
-    query = db.query(Comparison)
+    query = db.query(Comparison).options(COMPARISON_GRAPH).order_by(Comparison.id)
+    if cursor:
+        query = query.filter(Comparison.id > decode_cursor(cursor, "id")["id"])
+    else:
+        query = query.offset(skip)
+
+    comparisons = query.limit(limit).all()
+    headers = {}
+    if comparisons and len(comparisons) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(id=comparisons[-1].id)
+    return list_response(ComparisonDTO, comparisons, headers=headers)
+
 
-    comparisons = query.offset(skip).limit(limit).all()
-    return [ComparisonDTO.model_validate(comparison) for comparison in comparisons]
+@router.get("/summaries", response_model=List[ComparisonSummaryDTO])
+def get_comparison_summaries(
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> List[ComparisonSummaryDTO]:
+    """
+    Retrieve a list of comparisons with their summary instead of their products.
+
+    Each comparison is read as one row joined with its ``comparison_summaries``
+    row, so a page costs one query without walking the product graph.
+
+    Parameters
+    ----------
+    skip : int, optional
+        The number of records to skip (default is 0). Ignored when `cursor` is set.
+    limit : int, optional
+        The maximum number of records to return (default is 10).
+    cursor : str, optional
+        An opaque cursor from a previous page's ``X-Next-Cursor`` header.
+    db : Session
+        The database session dependency.
+
+    Returns
+    -------
+    list[ComparisonSummaryDTO]
+        A list of comparison summaries ordered by ID.
+    """
+    query = (
+        db.query(Comparison)
+        .outerjoin(Comparison.summary)
+        .options(contains_eager(Comparison.summary))
+        .order_by(Comparison.id)
+    )
+    if cursor:
+        query = query.filter(Comparison.id > decode_cursor(cursor, "id")["id"])
+    else:
+        query = query.offset(skip)
+
+    comparisons = query.limit(limit).all()
+    headers = {}
+    if comparisons and len(comparisons) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(id=comparisons[-1].id)
+    return list_response(
+        ComparisonSummaryDTO, [_summary_dto(comparison) for comparison in comparisons], headers
+    )
+
+
+def _summary_dto(comparison: Comparison) -> ComparisonSummaryDTO:
+    summary = comparison.summary
+    figures = {}
+    if summary is not None:
+        figures = {
+            "product_count": summary.product_count,
+            "min_price": summary.min_price,
+            "max_price": summary.max_price,
+            "best_product_id": summary.best_product_id,
+            "best_score": summary.best_score,
+            "attribute_leaders": summary.attribute_leaders or {},
+        }
+    return ComparisonSummaryDTO(
+        id=comparison.id,
+        title=comparison.title,
+        description=comparison.description,
+        date_created=comparison.date_created,
+        product_type_id=comparison.product_type_id,
+        **figures,
+    )
 
 
 @router.post("/", response_model=ComparisonDTO)
@@ -85,9 +189,15 @@ def create_comparison(
         for product_id in comparison.products
     ]
     db.add_all(comparison_products)
+    refresh_summaries(db, [new_comparison.id])
 
     db.commit()
-    db.refresh(new_comparison)
+    new_comparison = (
+        db.query(Comparison)
+        .options(COMPARISON_GRAPH)
+        .filter(Comparison.id == new_comparison.id)
+        .one()
+    )
 
     return ComparisonDTO.model_validate(new_comparison)
 
@@ -111,11 +221,66 @@ def get_comparison(
     ComparisonDTO
         The comparison record.
     """
-    comparison = db.query(Comparison).filter(Comparison.id == comparison_id).first()
+    cached = entity_cache.cached_response(entity_cache.COMPARISON, comparison_id)
+    if cached is not None:
+        return cached
+    token = entity_cache.generation()
+    comparison = (
+        db.query(Comparison)
+        .options(COMPARISON_GRAPH)
+        .filter(Comparison.id == comparison_id)
+        .first()
+    )
     if not comparison:
         raise HTTPException(status_code=404, detail="Comparison not found")
-    return ComparisonDTO.model_validate(comparison)
+    return entity_cache.store(
+        entity_cache.COMPARISON, comparison_id, ComparisonDTO.model_validate(comparison), token
+    )
+
+
+
+@router.get("/{comparison_id}/matrix", response_model=ComparisonMatrixDTO)
+def get_comparison_matrix(
+    comparison_id: int, db: Session = Depends(get_db)
+) -> ComparisonMatrixDTO:
+    """
+    Score the products of a comparison against each other, attribute by attribute.
+
+    The metadata scores are pivoted into a products × attributes matrix, normalized
+    per attribute, and used to pick a winner per attribute and rank the products
+    overall (see `app.scoring.score_matrix`).
+
+    Parameters
+    ----------
+    comparison_id : int
+        The ID of the comparison.
+    db : Session
+        The database session dependency.
+
+    Returns
+    -------
+    ComparisonMatrixDTO
+        The score matrix, winners and ranking.
+    """
+    product_ids = [
+        product_id
+        for (product_id,) in db.query(ComparisonProduct.product_id)
+        .filter(
+            ComparisonProduct.comparison_id == comparison_id,
+            ComparisonProduct.product_id.isnot(None),
+        )
+        .order_by(ComparisonProduct.id)
+    ]
+    if not product_ids and db.get(Comparison, comparison_id) is None:
+        raise HTTPException(status_code=404, detail="Comparison not found")
 
+    rows = db.query(
+        ProductMetadata.product_id, ProductMetadata.attribute, ProductMetadata.score
+    ).filter(ProductMetadata.product_id.in_(product_ids)).all()
+    matrix = offload(score_matrix, list(dict.fromkeys(product_ids)), rows)
+    return model_response(
+        ComparisonMatrixDTO, ComparisonMatrixDTO(comparison_id=comparison_id, **matrix)
+    )
 
 
 @router.delete("/{comparison_id}", response_model=dict)
@@ -152,6 +317,7 @@ def delete_comparison(
 
     db.delete(comparison)
     db.commit()
+    entity_cache.invalidate(entity_cache.COMPARISON, comparison_id)
     return {"message": "Comparison deleted successfully"}
 
 
@@ -180,6 +346,7 @@ def update_comparison(
             setattr(db_comparison, key, value)
 
     db.commit()
+    entity_cache.invalidate(entity_cache.COMPARISON, comparison_id)
     db.refresh(db_comparison)
 
     return {"message": "Comparison updated successfully"}
@@ -1,42 +1,449 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.models.product import Product, ProductMetadata
+import operator
+import os
+import re
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only, raiseload, selectinload
+from app import entity_cache, search, thumbnails
+from app.blobstore import decode_base64_image, get_blob_store
+from app.images import IMAGE_CONTENT_TYPES, set_product_image, sniff_image_type
+from app.catalog import get_schema
+from app.models.product import THUMBNAIL_SIZES, Product, ProductMetadata, project_value
 from app.models.user import User
-from app.schemas.product import ProductCreate, ProductDTO, ProductUpdate
-from app.database import get_db
+from app.summaries import refresh_summaries
+from app.schemas.product import (
+    ProductBatchDTO,
+    ProductBatchRequest,
+    ProductCreate,
+    ProductDTO,
+    ProductMetadataDTO,
+    ProductUpdate,
+)
+from app.database import get_db, offload
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.responses import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    UPLOAD_SECURITY_HEADERS,
+    json_response,
+    list_response,
+    model_response,
+)
 from app.utils import get_current_user
 
 router = APIRouter()
 
+# Columns read from `products` for each ProductDTO field.
+PRODUCT_FIELD_COLUMNS = {
+    "id": (Product.id,),
+    "name": (Product.name,),
+    "brand": (Product.brand,),
+    "score": (Product.score,),
+    "price": (Product.price,),
+    "product_type_id": (Product.product_type_id,),
+    "image_hash": (Product.image_hash,),
+    "image_url": (Product.image_hash,),
+    "thumbnail_url": (Product.image_hash,),
+    "product_metadata": (),  # Loaded from `product_metadata`
+}
+
+# Named field sets accepted by the `fields` parameter.
+PRODUCT_PROJECTIONS = {
+    "summary": ("id", "name", "price", "score", "thumbnail_url"),
+    "full": tuple(PRODUCT_FIELD_COLUMNS),
+}
+
+
+# Most IDs resolved by one POST /api/products/batch request.
+PRODUCT_BATCH_LIMIT = int(os.getenv("PRODUCT_BATCH_LIMIT", "100"))
+
+
+# Attribute filters: ``<attribute><operator><value>``, e.g. ``battery_life>=10``.
+ATTRIBUTE_FILTER = re.compile(r"^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(.*?)\s*$")
+FILTER_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+# Metadata schema types compared on `ProductMetadata.value_num`; others are text.
+NUMERIC_ATTRIBUTE_TYPES = ("integer", "float")
+
+
+def _attribute_filters(filters: Optional[List[str]], product_type_id: Optional[int]) -> list:
+    """
+    Compile ``filter`` parameters into predicates on products.
+
+    Each filter becomes ``products.id IN (SELECT product_id FROM product_metadata
+    WHERE attribute = ? AND value_num >= ?)``, or the same on ``value_text``, which
+    the ``(attribute, value_*, product_id)`` indexes answer without reading the
+    table. The attribute's type comes from the product type's metadata schema;
+    text attributes support ``=`` and ``!=`` only, compared case-insensitively.
+
+    Raises
+    ------
+    HTTPException
+        400 if a filter is malformed, its attribute or value does not fit the
+        schema, or `product_type_id` is missing.
+    """
+    if not filters:
+        return []
+    if not product_type_id:
+        raise HTTPException(status_code=400, detail="Attribute filters require product_type_id")
+    schema = get_schema(product_type_id)
+    if schema is None:
+        raise HTTPException(status_code=400, detail="Unknown product type")
+
+    predicates = []
+    for expression in filters:
+        match = ATTRIBUTE_FILTER.match(expression)
+        if not match:
+            raise HTTPException(status_code=400, detail=f"Invalid filter: {expression}")
+        attribute, op, raw_value = match.groups()
+        if attribute not in schema:
+            raise HTTPException(status_code=400, detail=f"Unknown attribute: {attribute}")
+
+        if schema[attribute] in NUMERIC_ATTRIBUTE_TYPES:
+            column = ProductMetadata.value_num
+            value = project_value(raw_value)[0]
+            if value is None:
+                raise HTTPException(
+                    status_code=400, detail=f"Attribute {attribute} takes a number"
+                )
+        elif op in ("=", "!="):
+            column = ProductMetadata.value_text
+            value = project_value(raw_value)[1]
+        else:
+            raise HTTPException(
+                status_code=400, detail=f"Attribute {attribute} supports = and != only"
+            )
+        predicates.append(
+            Product.id.in_(
+                select(ProductMetadata.product_id).where(
+                    ProductMetadata.attribute == attribute,
+                    FILTER_OPERATORS[op](column, value),
+                )
+            )
+        )
+    return predicates
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """
+    Resolve a ``fields`` parameter into ProductDTO field names.
+
+    The parameter is a comma-separated list of field names and/or projection names
+    (``summary``, ``full``). ``id`` is always included. Returns ``None`` when every
+    field is selected, i.e. the full ProductDTO.
+    """
+    if not fields:
+        return None
+    selected = {"id"}
+    for name in fields.split(","):
+        name = name.strip()
+        if name in PRODUCT_PROJECTIONS:
+            selected.update(PRODUCT_PROJECTIONS[name])
+        elif name in PRODUCT_FIELD_COLUMNS:
+            selected.add(name)
+        else:
+            valid = ", ".join([*PRODUCT_PROJECTIONS, *PRODUCT_FIELD_COLUMNS])
+            raise HTTPException(
+                status_code=400, detail=f"Unknown field '{name}'. Valid fields: {valid}"
+            )
+    if selected.issuperset(PRODUCT_FIELD_COLUMNS):
+        return None
+    return tuple(field for field in PRODUCT_FIELD_COLUMNS if field in selected)
+
+
+def _projection_options(fields: Optional[tuple]) -> list:
+    """
+    Loader options that read only the columns backing `fields`.
+
+    Unselected columns are not part of the SELECT and raise if accessed; the metadata
+    relationship is loaded with one extra ``SELECT ... IN`` only when requested.
+    """
+    if fields is None:
+        return [selectinload(Product.product_metadata)]
+    columns = {column for field in fields for column in PRODUCT_FIELD_COLUMNS[field]}
+    metadata_loader = (
+        selectinload(Product.product_metadata)
+        if "product_metadata" in fields
+        else raiseload(Product.product_metadata)
+    )
+    return [load_only(*columns, raiseload=True), metadata_loader]
+
+
+def _project(product: Product, fields: tuple) -> dict:
+    projected = {}
+    for field in fields:
+        if field == "product_metadata":
+            projected[field] = [
+                ProductMetadataDTO.model_validate(meta) for meta in product.product_metadata
+            ]
+        else:
+            projected[field] = getattr(product, field)
+    return projected
+
 
 @router.get("/", response_model=list[ProductDTO])
 def get_products(
     skip: int = 0,
     limit: int = 10,
     product_type_id: int = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: Optional[List[str]] = Query(None, alias="filter"),
     db: Session = Depends(get_db)
 ) -> List[ProductDTO]:
     """
     Retrieve a list of products, optionally filtered by product type.
+
+    Pages are ordered by ``id`` (``(product_type_id, id)`` when filtered). When a
+    page is full, the ``X-Next-Cursor`` header carries an opaque cursor; passing it
+    back as ``cursor`` seeks straight past the last row instead of counting
+    ``skip`` rows, so every page costs the same. ``skip`` is ignored in that mode.
+
+    ``fields`` restricts the response to some ProductDTO fields, e.g.
+    ``fields=summary`` or ``fields=name,price,product_metadata``; only the matching
+    columns are selected from the database.
+
+    ``filter`` narrows the products of a ``product_type_id`` by metadata value and
+    may be repeated, e.g. ``filter=battery_life>=10&filter=screen_size<6.5``. See
+    `_attribute_filters`.
     """
-    query = db.query(Product)
+    selected_fields = _parse_fields(fields)
+    predicates = _attribute_filters(filters, product_type_id)
+    query = db.query(Product).options(*_projection_options(selected_fields))
+    if predicates:
+        query = query.filter(*predicates)
     if product_type_id:
         query = query.filter(Product.product_type_id == product_type_id)  #  Apply filter
+        query = query.order_by(Product.product_type_id, Product.id)
+    else:
+        query = query.order_by(Product.id)
+
+    if cursor:
+        keys = decode_cursor(cursor, "id")
+        if keys.get("product_type_id") != (product_type_id or None):
+            raise HTTPException(status_code=400, detail="Cursor does not match filter")
+        query = query.filter(Product.id > keys["id"])
+    else:
+        query = query.offset(skip)
+
+    products = query.limit(limit).all()
+    headers = {}
+    if products and len(products) == limit:
+        next_keys = {"product_type_id": product_type_id} if product_type_id else {}
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(**next_keys, id=products[-1].id)
+
+    if selected_fields is not None:
+        return json_response(
+            [_project(product, selected_fields) for product in products], headers=headers
+        )
+    return list_response(ProductDTO, products, headers=headers)
+
+
+@router.get("/search", response_model=list[ProductDTO])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> List[ProductDTO]:
+    """
+    Search products by name, brand and metadata values, most relevant first.
+
+    The search runs on a full-text index (FTS5 on SQLite, FULLTEXT on MySQL), so
+    its cost depends on the number of matches rather than on the catalog size.
+    Every word of `q` must match the start of a word of the product.
+
+    Parameters
+    ----------
+    q : str
+        The words to search for.
+    skip : int, optional
+        The number of matches to skip (default is 0).
+    limit : int, optional
+        The maximum number of matches to return (default is 10, at most 100).
+    db : Session
+        The database session dependency.
+
+    Returns
+    -------
+    list[ProductDTO]
+        The matching products, most relevant first.
+    """
+    product_ids = search.search_products(db, q, skip=skip, limit=limit)
+    if not product_ids:
+        return []
+    products = (
+        db.query(Product)
+        .options(selectinload(Product.product_metadata))
+        .filter(Product.id.in_(product_ids))
+    )
+    by_id = {product.id: product for product in products}
+    return list_response(
+        ProductDTO, [by_id[product_id] for product_id in product_ids if product_id in by_id]
+    )
+
+
+@router.post("/batch", response_model=ProductBatchDTO)
+def get_products_batch(batch: ProductBatchRequest, db: Session = Depends(get_db)) -> ProductBatchDTO:
+    """
+    Retrieve many products by ID at once, e.g. the products of a comparison.
 
-    products = query.offset(skip).limit(limit).all()
-    return [ProductDTO.model_validate(product) for product in products]
+    The products and their metadata are read with two ``IN`` queries whatever the
+    number of IDs, instead of one request per product.
+
+    Parameters
+    ----------
+    batch : ProductBatchRequest
+        The product IDs, at most ``PRODUCT_BATCH_LIMIT`` (100 by default).
+        Duplicates are allowed.
+    db : Session
+        The database session dependency.
+
+    Returns
+    -------
+    ProductBatchDTO
+        One entry per requested ID, in request order, null for the IDs listed in
+        ``missing``.
+
+    Raises
+    ------
+    HTTPException
+        400 if more than ``PRODUCT_BATCH_LIMIT`` IDs are requested.
+    """
+    if len(batch.ids) > PRODUCT_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400, detail=f"At most {PRODUCT_BATCH_LIMIT} products per batch"
+        )
+    found = {}
+    if batch.ids:
+        rows = (
+            db.query(Product)
+            .options(selectinload(Product.product_metadata))
+            .filter(Product.id.in_(set(batch.ids)))
+            .all()
+        )
+        found = {product.id: ProductDTO.model_validate(product) for product in rows}
+    batch_dto = ProductBatchDTO(
+        products=[found.get(product_id) for product_id in batch.ids],
+        missing=list(dict.fromkeys(i for i in batch.ids if i not in found)),
+    )
+    return model_response(ProductBatchDTO, batch_dto)
 
 
 @router.get("/{product_id}", response_model=ProductDTO)
-def get_product(product_id: int, db: Session = Depends(get_db)) -> ProductDTO:
+def get_product(
+    product_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)
+) -> ProductDTO:
     """
-    Retrieve a single product by its ID, including the Base64 image.
+    Retrieve a single product by its ID, including the URL of its image.
+
+    ``fields`` restricts the response to some ProductDTO fields, as in
+    `get_products`.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    selected_fields = _parse_fields(fields)
+    if selected_fields is None:
+        cached = entity_cache.cached_response(entity_cache.PRODUCT, product_id)
+        if cached is not None:
+            return cached
+    token = entity_cache.generation()
+    product = (
+        db.query(Product)
+        .options(*_projection_options(selected_fields))
+        .filter(Product.id == product_id)
+        .first()
+    )
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return ProductDTO.model_validate(product)
+    if selected_fields is not None:
+        return json_response(_project(product, selected_fields))
+    return entity_cache.store(
+        entity_cache.PRODUCT, product_id, ProductDTO.model_validate(product), token
+    )
+
+
+@router.get("/{product_id}/image", response_class=FileResponse)
+def get_product_image(
+    product_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    size: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Serve the raw image of a product, or one of its thumbnails, from the blob store.
+
+    The file is streamed with Range support and an ETag derived from the content
+    hash; ``If-None-Match`` revalidation answers ``304 Not Modified``. Products not yet
+    migrated off the inline ``image_base64`` column are decoded on the fly.
+
+    ``size`` selects a thumbnail (see `app.models.product.THUMBNAIL_SIZES`). While it
+    is not generated yet the full image is served, to be revalidated, and generation
+    is scheduled. Images whose thumbnails cannot be generated are served in full.
+    """
+    if size is not None and size not in THUMBNAIL_SIZES:
+        valid = ", ".join(THUMBNAIL_SIZES)
+        raise HTTPException(status_code=400, detail=f"Unknown size '{size}'. Valid sizes: {valid}")
+    row = (
+        db.query(Product.image_hash, Product.image_content_type, Product.image_base64)
+        .filter(Product.id == product_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return offload(_image_response, row, request.headers.get("if-none-match", ""), v, size)
+
+
+def _image_response(row, if_none_match: str, v: Optional[str], size: Optional[str]) -> Response:
+    """
+    Build the response of `get_product_image` for a product row, checking and
+    decoding files, so it is run through `offload`.
+    """
+    if not row.image_hash:
+        if not row.image_base64:
+            raise HTTPException(status_code=404, detail="Image not found")
+        try:
+            data = decode_base64_image(row.image_base64)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Image not found")
+        return Response(
+            content=data,
+            media_type=sniff_image_type(data) or "application/octet-stream",
+            headers={"Cache-Control": REVALIDATE_CACHE_CONTROL, **UPLOAD_SECURITY_HEADERS},
+        )
+
+    # Types stored before uploads were checked are not trusted
+    media_type = row.image_content_type
+    if media_type not in IMAGE_CONTENT_TYPES:
+        media_type = "application/octet-stream"
+    path, etag = get_blob_store().path(row.image_hash), f'"{row.image_hash}"'
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL
+        if v and row.image_hash.startswith(v)
+        else REVALIDATE_CACHE_CONTROL
+    )
+    if size is not None:
+        thumbnail = thumbnails.thumbnail_path(row.image_hash, size)
+        if thumbnail.is_file():
+            path, media_type = thumbnail, thumbnails.THUMBNAIL_CONTENT_TYPE
+            etag = f'"{row.image_hash}-{size}"'
+        elif not thumbnails.thumbnails_failed(row.image_hash):
+            thumbnails.schedule_thumbnails(row.image_hash)
+            cache_control = REVALIDATE_CACHE_CONTROL  # The URL will serve the thumbnail
+    headers = {"ETag": etag, "Cache-Control": cache_control, **UPLOAD_SECURITY_HEADERS}
+    if etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type=media_type, headers=headers)
 
 
 @router.post("/", response_model=ProductDTO)
@@ -47,6 +454,9 @@ def create_product(
 ) -> ProductDTO:
     """
     Create a new product record with an image in Base64 format.
+
+    The image is decoded and stored once in the blob store; the product keeps only
+    its content hash. Its thumbnails are generated in the background.
     """
     new_product = Product(
         name=product.name,
@@ -55,8 +465,11 @@ def create_product(
         price=product.price,
         user_id=current_user.user_id,
         product_type_id=product.product_type_id,
-        image_base64=product.image_base64,
     )
+    try:
+        offload(set_product_image, new_product, product.image_base64)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
     db.add(new_product)
     db.flush()  # Get the new product ID
@@ -70,8 +483,10 @@ def create_product(
             score=meta.score,
         )
         db.add(new_metadata)
+    search.index_products(db, [new_product.id])
 
     db.commit()
+    offload(thumbnails.schedule_thumbnails, new_product.image_hash)
     db.refresh(new_product)
     return ProductDTO.model_validate(new_product)
 
@@ -96,8 +511,13 @@ def update_product(
 
     # Update product details
     for key, value in product.model_dump().items():
-        if key not in ["product_metadata", "user_id", "product_type_id"] and value is not None:
+        if key not in ["product_metadata", "user_id", "product_type_id", "image_base64"] and value is not None:
             setattr(db_product, key, value)
+    if product.image_base64 is not None:
+        try:
+            offload(set_product_image, db_product, product.image_base64)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
 
     # Update or add metadata attributes
     for meta in product.product_metadata or []:
@@ -109,7 +529,14 @@ def update_product(
                 if value is not None:
                     setattr(db_metadata, key, value)
 
+    comparison_ids = entity_cache.comparisons_of(db, product_id)
+    refresh_summaries(db, comparison_ids)
+    search.index_products(db, [product_id])
     db.commit()
+    entity_cache.invalidate(entity_cache.PRODUCT, product_id)
+    entity_cache.invalidate(entity_cache.COMPARISON, *comparison_ids)
+    if product.image_base64 is not None:
+        offload(thumbnails.schedule_thumbnails, db_product.image_hash)
     db.refresh(db_product)
     return ProductDTO.model_validate(db_product)
 
@@ -131,8 +558,13 @@ def delete_product(
     if db_product.user_id != current_user.user_id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to delete this product")
 
+    comparison_ids = entity_cache.comparisons_of(db, product_id)
     db.delete(db_product)
+    refresh_summaries(db, comparison_ids)
+    search.index_products(db, [product_id])
     db.commit()
+    entity_cache.invalidate(entity_cache.PRODUCT, product_id)
+    entity_cache.invalidate(entity_cache.COMPARISON, *comparison_ids)
     return {"detail": "Product deleted successfully"}
 
 
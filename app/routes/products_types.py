@@ -1,30 +1,36 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Request, Response
+from starlette import status
 
-from app.database import get_db
-from app.models.product import ProductType
+from app.catalog import get_catalog
+from app.responses import REVALIDATE_CACHE_CONTROL
 from app.schemas.product import ProductTypeDTO
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ProductTypeDTO])
-def get_product_types(db: Session = Depends(get_db)) -> List[ProductTypeDTO]:
+def get_product_types(request: Request) -> Response:
     """
     Retrieve a list of all product types.
 
+    The list is served from the in-memory catalog snapshot (see `app.catalog`)
+    without touching the database. Its ETag changes with the catalog, and
+    ``If-None-Match`` revalidation answers ``304 Not Modified``.
+
     Parameters
     ----------
-    db : Session
-        The database session dependency.
+    request : Request
+        The incoming request, read for ``If-None-Match``.
 
     Returns
     -------
-    list[ProductTypeDTO]
-        A list of all product types.
+    Response
+        The JSON list of all product types, or an empty 304 response.
     """
-    product_types = db.query(ProductType).all()
-    return [ProductTypeDTO.model_validate(product_type) for product_type in product_types]
-
+    catalog = get_catalog()
+    headers = {"ETag": catalog.etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if catalog.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 from app.schemas.product import ProductDTO
@@ -36,4 +36,38 @@ class ComparisonDTO(ComparisonBase):
     products: List[ComparisonProductDTO]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RankedProductDTO(BaseModel):
+    product_id: int
+    score: float  # Mean normalized score over every attribute of the comparison
+    rank: int
+
+
+class ComparisonMatrixDTO(BaseModel):
+    comparison_id: int
+    product_ids: List[int]  # Matrix rows
+    attributes: List[str]  # Matrix columns
+    scores: List[List[Optional[float]]]  # None where a product lacks an attribute
+    normalized: List[List[Optional[float]]]  # Scores min-max scaled per attribute
+    winners: Dict[str, int]  # Product with the highest score of each attribute
+    ranking: List[RankedProductDTO]
+
+
+class AttributeLeaderDTO(BaseModel):
+    product_id: int
+    score: float
+
+
+class ComparisonSummaryDTO(BaseModel):
+    id: int
+    title: str
+    description: str
+    date_created: str
+    product_type_id: int
+    product_count: int = 0
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    best_product_id: Optional[int] = None  # Product with the highest overall score
+    best_score: Optional[float] = None
+    attribute_leaders: Dict[str, AttributeLeaderDTO] = {}  # Best product per attribute
@@ -1,4 +1,5 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel
 
 class ProductMetadataDTO(BaseModel):
@@ -16,29 +17,40 @@ class ProductBase(BaseModel):
     score: float
     price: float
     product_type_id: int
-    image_base64: str  #  Added field for Base64 encoded image
     product_metadata: List[ProductMetadataDTO]
 
 
 class ProductCreate(ProductBase):
-    pass
+    image_base64: Optional[str] = None  # Data URI or bare Base64, kept in the blob store
 
 
 class ProductUpdate(BaseModel):
     name: str
     brand: str
     score: float
-    image_base64: str
+    image_base64: Optional[str] = None  # Omit to keep the current image
     product_metadata: List[ProductMetadataDTO]
 
 
 class ProductDTO(ProductBase):
     id: int
+    image_hash: Optional[str] = None
+    image_url: Optional[str] = None  # Served by GET /api/products/{id}/image
+    thumbnail_url: Optional[str] = None  # Small variant of image_url, for list views
 
     class Config:
         from_attributes = True
 
 
+class ProductBatchRequest(BaseModel):
+    ids: List[int]
+
+
+class ProductBatchDTO(BaseModel):
+    products: List[Optional[ProductDTO]]  # In the order of the requested IDs, null if not found
+    missing: List[int]  # Requested IDs with no product
+
+
 class ProductTypeDTO(BaseModel):
     id: int
     name: str
@@ -55,3 +67,30 @@ class ProductTypeCreateDTO(BaseModel):
     description: str
     metadata_schema: dict
 
+
+
+class ImportRowErrorDTO(BaseModel):
+    row: int  # Line in the file, the header being line 1
+    errors: List[str]
+
+
+class ImportJobDTO(BaseModel):
+    id: str
+    status: str  # "queued", "running", "completed" or "failed"
+    product_type_id: int
+    format: str
+    batch_size: int
+    total_rows: Optional[int] = None
+    processed_rows: int
+    imported_rows: int
+    failed_rows: int
+    progress: float
+    rows_per_second: float
+    errors: List[ImportRowErrorDTO]  # The first rejected rows, see failed_rows for the count
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
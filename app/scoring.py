@@ -0,0 +1,78 @@
+from typing import Iterable, List, Tuple
+
+
+def score_matrix(product_ids: List[int], rows: Iterable[Tuple[int, str, float]]) -> dict:
+    """
+    Pivot metadata scores into a products × attributes matrix and rank the products.
+
+    Each attribute column is min-max normalized to [0, 1] across the products that
+    have it; when they all share one score, each gets 1. The winner of an attribute
+    is the product with its highest score, the first one listed on a tie. A product's
+    overall score is the mean of its normalized scores over every attribute, a
+    missing attribute counting as 0.
+
+    Everything is computed with vectorized NumPy operations, imported on first use.
+
+    Parameters
+    ----------
+    product_ids : list of int
+        The distinct products, in the order of the matrix rows.
+    rows : iterable of (int, str, float)
+        ``(product_id, attribute, score)`` of each metadata entry of those products.
+        Entries without a score are ignored.
+
+    Returns
+    -------
+    dict
+        ``product_ids`` and ``attributes`` (the sorted column labels), the raw
+        ``scores`` and ``normalized`` matrices as nested lists with None for missing
+        entries, ``winners`` mapping each attribute to a product ID, and
+        ``ranking``, the products by decreasing overall score.
+    """
+    import numpy as np
+
+    entries = [row for row in rows if row[2] is not None]
+    products = np.asarray(product_ids, dtype=np.int64)
+    entry_products = np.fromiter((row[0] for row in entries), np.int64, len(entries))
+    entry_scores = np.fromiter((row[2] for row in entries), np.float64, len(entries))
+    attributes, columns = np.unique(
+        np.array([row[1] for row in entries], dtype=str), return_inverse=True
+    )
+
+    # Matrix row of each entry: the position of its product in `products`
+    order = np.argsort(products)
+    positions = order[np.searchsorted(products, entry_products, sorter=order)]
+
+    matrix = np.full((len(products), len(attributes)), np.nan)
+    matrix[positions, columns.reshape(-1)] = entry_scores
+    present = ~np.isnan(matrix)
+
+    # Every column has at least one score, so its min and max are finite
+    low = np.where(present, matrix, np.inf).min(axis=0, initial=np.inf)
+    high = np.where(present, matrix, -np.inf).max(axis=0, initial=-np.inf)
+    span = high - low
+    normalized = np.divide(
+        matrix - low, span, out=np.ones_like(matrix), where=span > 0
+    )
+    normalized[~present] = np.nan
+
+    winners = np.where(present, matrix, -np.inf).argmax(axis=0) if len(products) else []
+    overall = np.where(present, normalized, 0.0).sum(axis=1) / max(len(attributes), 1)
+    ranking = np.argsort(-overall, kind="stable")
+
+    def to_lists(values) -> list:
+        return np.where(present, values, None).tolist()
+
+    return {
+        "product_ids": products.tolist(),
+        "attributes": attributes.tolist(),
+        "scores": to_lists(matrix),
+        "normalized": to_lists(normalized),
+        "winners": dict(zip(attributes.tolist(), products[winners].tolist())),
+        "ranking": [
+            {"product_id": product_id, "score": score, "rank": rank}
+            for rank, (product_id, score) in enumerate(
+                zip(products[ranking].tolist(), overall[ranking].tolist()), start=1
+            )
+        ],
+    }
@@ -0,0 +1,192 @@
+import re
+import threading
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app import database
+
+# Bump when the index layout or content changes, so it is rebuilt on startup
+SEARCH_VERSION = "1"
+SEARCH_KEY = "search"
+
+_build_lock = threading.Lock()
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# The index is a side table holding the searchable text of each product: its name,
+# its brand and the values of its metadata. SQLite keys the FTS5 rows by product ID
+# through the rowid; MySQL uses an InnoDB table with a FULLTEXT index.
+_DDL = {
+    "sqlite": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5("
+        "name, brand, metadata_values, tokenize = 'unicode61 remove_diacritics 2')"
+    ),
+    "mysql": (
+        "CREATE TABLE IF NOT EXISTS product_search ("
+        "product_id INT NOT NULL PRIMARY KEY, name VARCHAR(255), brand VARCHAR(255), "
+        "metadata_values TEXT, "
+        "FULLTEXT KEY ft_product_search (name, brand, metadata_values)"
+        ") ENGINE=InnoDB"
+    ),
+}
+_ID_COLUMN = {"sqlite": "rowid", "mysql": "product_id"}
+_GROUP_VALUES = {
+    "sqlite": "group_concat(m.value, ' ')",
+    "mysql": "GROUP_CONCAT(m.value SEPARATOR ' ')",
+}
+# Name and brand matches rank above metadata matches
+_SEARCH = {
+    "sqlite": (
+        "SELECT rowid FROM product_search WHERE product_search MATCH :query "
+        "ORDER BY bm25(product_search, 10.0, 5.0, 1.0), rowid LIMIT :limit OFFSET :skip"
+    ),
+    "mysql": (
+        "SELECT product_id FROM product_search "
+        "WHERE MATCH(name, brand, metadata_values) AGAINST(:query IN BOOLEAN MODE) "
+        "ORDER BY MATCH(name, brand, metadata_values) AGAINST(:query IN BOOLEAN MODE) DESC, "
+        "product_id LIMIT :limit OFFSET :skip"
+    ),
+}
+
+
+def is_supported(db: Session) -> bool:
+    """
+    Whether the database of a session can hold the index (SQLite or MySQL).
+    """
+    return db.get_bind().dialect.name in _DDL
+
+
+def _dialect(db: Session) -> str:
+    name = db.get_bind().dialect.name
+    if name not in _DDL:
+        raise HTTPException(status_code=501, detail=f"Search is not supported on {name}")
+    return name
+
+
+def is_ready() -> bool:
+    """
+    Whether the index of the current database is built and current.
+    """
+    return database.bookkeeping.get(SEARCH_KEY) == SEARCH_VERSION
+
+
+def _index(db: Session, product_ids: Optional[List[int]]):
+    dialect = _dialect(db)
+    id_column = _ID_COLUMN[dialect]
+    delete = "DELETE FROM product_search"
+    insert = (
+        f"INSERT INTO product_search ({id_column}, name, brand, metadata_values) "
+        f"SELECT p.id, p.name, p.brand, "
+        f"(SELECT {_GROUP_VALUES[dialect]} FROM product_metadata m WHERE m.product_id = p.id) "
+        f"FROM products p"
+    )
+    if product_ids is None:
+        db.execute(text(delete))
+        db.execute(text(insert))
+        return
+    ids = bindparam("ids", expanding=True)
+    db.execute(text(f"{delete} WHERE {id_column} IN :ids").bindparams(ids), {"ids": product_ids})
+    db.execute(text(f"{insert} WHERE p.id IN :ids").bindparams(ids), {"ids": product_ids})
+
+
+def index_products(db: Session, product_ids: Iterable[int]):
+    """
+    Re-index some products, e.g. after they were created, updated or deleted.
+
+    Call it in the transaction of the change, before committing, so the index
+    never disagrees with the products. Deleted products are removed from the index.
+    Nothing is done while the index is not built; building it covers them.
+
+    Parameters
+    ----------
+    db : Session
+        The database session.
+    product_ids : iterable of int
+        The IDs of the changed products.
+    """
+    product_ids = list(product_ids)
+    if product_ids and is_ready():
+        db.flush()
+        _index(db, product_ids)
+
+
+def rebuild_index(db: Session):
+    """
+    Create the index if needed and fill it with every product.
+
+    Nothing is committed. The caller records ``SEARCH_VERSION`` under
+    ``SEARCH_KEY`` with `database.write_bookkeeping`, and updates the module's
+    bookkeeping snapshot once the transaction commits.
+
+    Parameters
+    ----------
+    db : Session
+        The database session.
+    """
+    db.execute(text(_DDL[_dialect(db)]))
+    _index(db, None)
+
+
+def _ensure_index():
+    """
+    Build the index of a database that was not initialized by `initialize_all`.
+    """
+    with _build_lock:
+        if is_ready():
+            return
+        session = database.SessionLocal()
+        try:
+            rebuild_index(session)
+            database.write_bookkeeping(session, {SEARCH_KEY: SEARCH_VERSION})
+            session.commit()
+        finally:
+            session.close()
+        database.bookkeeping[SEARCH_KEY] = SEARCH_VERSION
+
+
+def search_products(db: Session, query: str, skip: int = 0, limit: int = 10) -> List[int]:
+    """
+    Return the IDs of the products matching a query, most relevant first.
+
+    Every word of the query must appear in the name, brand or a metadata value of
+    a product, as a word or the start of one. Matches in the name weigh most,
+    then the brand, then the metadata. Operators of the index query syntax are not
+    interpreted, so any user input is safe.
+
+    Parameters
+    ----------
+    db : Session
+        The database session.
+    query : str
+        The text to search for.
+    skip : int, optional
+        The number of matches to skip (default is 0).
+    limit : int, optional
+        The maximum number of matches to return (default is 10).
+
+    Returns
+    -------
+    list of int
+        The product IDs, most relevant first.
+
+    Raises
+    ------
+    HTTPException
+        501 if the database is neither SQLite nor MySQL.
+    """
+    dialect = _dialect(db)
+    words = _WORD.findall(query)
+    if not words:
+        return []
+    if not is_ready():
+        _ensure_index()
+    if dialect == "sqlite":
+        match = " ".join('"{}"*'.format(word) for word in words)
+    else:
+        match = " ".join(f"+{word}*" for word in words)
+    rows = db.execute(
+        text(_SEARCH[dialect]), {"query": match, "limit": limit, "skip": skip}
+    )
+    return [product_id for (product_id,) in rows]
@@ -0,0 +1,110 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.comparison import Comparison, ComparisonProduct, ComparisonSummary
+from app.models.product import Product, ProductMetadata
+
+# Bump when the content of the summaries changes, so `initialize_all` rebuilds them
+SUMMARY_VERSION = "1"
+SUMMARY_KEY = "summaries"
+
+
+def _summarize(comparison_ids: list, products: list, metadata: list) -> list:
+    """
+    Build the summary rows from the comparison products and their metadata.
+    """
+    summaries = {
+        comparison_id: {
+            "comparison_id": comparison_id,
+            "product_count": 0,
+            "min_price": None,
+            "max_price": None,
+            "best_product_id": None,
+            "best_score": None,
+            "attribute_leaders": {},
+        }
+        for comparison_id in comparison_ids
+    }
+    seen = set()
+    for comparison_id, product_id, price, score in products:
+        summary = summaries.get(comparison_id)
+        if summary is None or (comparison_id, product_id) in seen:
+            continue
+        seen.add((comparison_id, product_id))
+        summary["product_count"] += 1
+        if price is not None:
+            if summary["min_price"] is None or price < summary["min_price"]:
+                summary["min_price"] = price
+            if summary["max_price"] is None or price > summary["max_price"]:
+                summary["max_price"] = price
+        if score is not None and (summary["best_score"] is None or score > summary["best_score"]):
+            summary["best_product_id"], summary["best_score"] = product_id, score
+
+    for comparison_id, product_id, attribute, score in metadata:
+        if comparison_id not in summaries:
+            continue
+        leaders = summaries[comparison_id]["attribute_leaders"]
+        if attribute not in leaders or score > leaders[attribute]["score"]:
+            leaders[attribute] = {"product_id": product_id, "score": score}
+    return list(summaries.values())
+
+
+def refresh_summaries(db: Session, comparison_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the summaries of some comparisons, or of all of them.
+
+    Only the given comparisons are read and rewritten, with a fixed number of
+    statements whatever their number, so callers refresh just what a change
+    affects. Nothing is committed: call it before committing the change, so both
+    land together.
+
+    Parameters
+    ----------
+    db : Session
+        The database session.
+    comparison_ids : iterable of int, optional
+        The comparisons to refresh. IDs of deleted comparisons are ignored. Every
+        comparison is refreshed if omitted.
+
+    Returns
+    -------
+    int
+        The number of summaries written.
+    """
+    db.flush()
+    comparisons = select(Comparison.id)
+    products = (
+        select(ComparisonProduct.comparison_id, Product.id, Product.price, Product.score)
+        .join(Product, Product.id == ComparisonProduct.product_id)
+        .order_by(ComparisonProduct.id)
+    )
+    metadata = (
+        select(
+            ComparisonProduct.comparison_id,
+            ProductMetadata.product_id,
+            ProductMetadata.attribute,
+            ProductMetadata.score,
+        )
+        .join(ProductMetadata, ProductMetadata.product_id == ComparisonProduct.product_id)
+        .where(ProductMetadata.score.isnot(None))
+        .order_by(ComparisonProduct.id, ProductMetadata.id)
+    )
+    clear = delete(ComparisonSummary)
+    if comparison_ids is not None:
+        comparison_ids = set(comparison_ids)
+        if not comparison_ids:
+            return 0
+        comparisons = comparisons.where(Comparison.id.in_(comparison_ids))
+        products = products.where(ComparisonProduct.comparison_id.in_(comparison_ids))
+        metadata = metadata.where(ComparisonProduct.comparison_id.in_(comparison_ids))
+        clear = clear.where(ComparisonSummary.comparison_id.in_(comparison_ids))
+
+    rows = _summarize(
+        list(db.scalars(comparisons)), db.execute(products).all(), db.execute(metadata).all()
+    )
+    db.execute(clear.execution_options(synchronize_session=False))
+    if rows:
+        db.execute(insert(ComparisonSummary), rows)
+    return len(rows)
@@ -0,0 +1,172 @@
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from app.blobstore import get_blob_store
+from app.models.product import THUMBNAIL_SIZES
+from app.utils import get_logger
+
+logger = get_logger(__name__)
+
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_CONTENT_TYPE = "image/webp"
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+# Empty variant marking an image Pillow cannot decode, e.g. an SVG or a corrupt
+# upload, so its thumbnails are not attempted again on every request
+FAILED_VARIANT = "thumbnail-failed"
+
+_executor = None
+_executor_lock = threading.Lock()
+_scheduled = set()  # Image hashes queued or being processed
+
+
+def _max_workers() -> int:
+    return int(os.getenv("THUMBNAIL_WORKERS", "1"))
+
+
+def variant_name(size: str) -> str:
+    return f"thumbnail-{size}"
+
+
+def thumbnail_path(image_hash: str, size: str):
+    """
+    Return the blob store path of a thumbnail, whether or not it was generated yet.
+    """
+    return get_blob_store().variant_path(image_hash, variant_name(size))
+
+
+def thumbnails_failed(image_hash: str) -> bool:
+    """
+    Return whether the thumbnails of an image could not be generated, for good.
+    """
+    return get_blob_store().variant_path(image_hash, FAILED_VARIANT).is_file()
+
+
+def render_thumbnail(data: bytes, max_side: int) -> bytes:
+    """
+    Scale an image down to fit a square and encode it as a thumbnail.
+
+    The aspect ratio is kept and smaller images are not enlarged. EXIF orientation
+    is applied, since it is not carried over to the thumbnail.
+
+    Parameters
+    ----------
+    data : bytes
+        The source image, in any format Pillow reads.
+    max_side : int
+        The longest side of the thumbnail, in pixels.
+
+    Returns
+    -------
+    bytes
+        The thumbnail, in ``THUMBNAIL_FORMAT``.
+
+    Raises
+    ------
+    Exception
+        If Pillow cannot decode the image, e.g. ``PIL.UnidentifiedImageError``.
+    """
+    # Imported on first use, like the other heavy dependencies, to keep startup fast
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (max_side, max_side))  # JPEG: decode at a reduced scale
+        image = ImageOps.exif_transpose(image)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image.thumbnail((max_side, max_side))
+        output = io.BytesIO()
+        image.save(output, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+    return output.getvalue()
+
+
+def generate_thumbnails(image_hash: str) -> int:
+    """
+    Generate the missing thumbnails of a stored image.
+
+    Thumbnails depend only on the image, so products sharing an image share its
+    thumbnails and nothing is recorded in the database. An image that cannot be
+    decoded is marked (see `thumbnails_failed`) and skipped from then on.
+
+    Parameters
+    ----------
+    image_hash : str
+        The content hash of the image in the blob store.
+
+    Returns
+    -------
+    int
+        The number of thumbnails generated; 0 if all exist, or if the image is
+        missing or cannot be decoded, which is logged.
+    """
+    store = get_blob_store()
+    missing = [size for size in THUMBNAIL_SIZES if not thumbnail_path(image_hash, size).is_file()]
+    if not missing or thumbnails_failed(image_hash):
+        return 0
+    try:
+        data = store.read(image_hash)
+    except OSError as e:
+        logger.warning(f"Cannot read image {image_hash}: {e}")
+        return 0
+    try:
+        rendered = {size: render_thumbnail(data, THUMBNAIL_SIZES[size]) for size in missing}
+    except Exception as e:  # Pillow raises assorted errors on undecodable images
+        logger.warning(f"Cannot generate thumbnails of image {image_hash}: {e}")
+        store.put_variant(image_hash, FAILED_VARIANT, b"")
+        return 0
+    for size, thumbnail in rendered.items():
+        store.put_variant(image_hash, variant_name(size), thumbnail)
+    return len(rendered)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Threads suffice: Pillow releases the GIL while decoding and resizing
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers(), thread_name_prefix="thumbnails"
+            )
+        return _executor
+
+
+def _generate_scheduled(image_hash: str) -> int:
+    try:
+        return generate_thumbnails(image_hash)
+    finally:
+        with _executor_lock:
+            _scheduled.discard(image_hash)
+
+
+def schedule_thumbnails(image_hash: Optional[str]) -> Optional[Future]:
+    """
+    Generate the thumbnails of an image in the background, off the request path.
+
+    Call it once the product referencing the image is committed. Runs inline when
+    ``THUMBNAIL_WORKERS`` is 0.
+
+    Parameters
+    ----------
+    image_hash : str, optional
+        The content hash of the image; nothing is done for None.
+
+    Returns
+    -------
+    Future or None
+        The number of thumbnails generated, or None if there is no image or it is
+        already scheduled.
+    """
+    if not image_hash:
+        return None
+    if _max_workers() <= 0:
+        future = Future()
+        future.set_result(generate_thumbnails(image_hash))
+        return future
+    with _executor_lock:
+        if image_hash in _scheduled:
+            return None
+        _scheduled.add(image_hash)
+    return _get_executor().submit(_generate_scheduled, image_hash)
+
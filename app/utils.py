@@ -1,27 +1,46 @@
 import logging
 import os
+import threading
 from pathlib import Path
+from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.database import get_db
+from app import hashing
+from app.cache import TTLCache
+from app.database import get_async_db, get_db
 from app.models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Authenticated users by token subject (email). Entries are plain column values, so
+# no ORM instance is shared between sessions. Routes that change a user must call
+# `invalidate_principal`; the TTL bounds staleness across worker processes.
+principal_cache = TTLCache(
+    "principal",
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+)
+# Columns kept out of the principal cache: authorization never needs them
+_UNCACHED_USER_COLUMNS = ("password",)
+# Incremented by every invalidation, so a user read before it is never cached after
+_principal_generation = 0
+_principal_lock = threading.Lock()
+
 
 def hash_password(password: str) -> str:
     """
     Hash a plaintext password.
 
+    The work runs on the password executor (see `app.hashing`).
+
     Parameters
     ----------
     password : str
@@ -32,7 +51,7 @@ def hash_password(password: str) -> str:
     str
         The hashed password.
     """
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -51,7 +70,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     bool
         True if the passwords match, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_and_update(plain_password, hashed_password)[0]
 
 
 def create_access_token(data: dict) -> str:
@@ -68,19 +87,98 @@ def create_access_token(data: dict) -> str:
     str
         The encoded JWT token.
     """
+    from jose import jwt  # Deferred: only needed once requests are served
+
     to_encode = data.copy()
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid authentication credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_subject(token: str) -> str:
+    """
+    Decode a JWT token and return its subject, the user's email.
+
+    Raises
+    ------
+    HTTPException
+        If the token is invalid or has no subject.
+    """
+    from jose import JWTError, jwt
+
+    try:
+        # Decode JWT token and extract user email
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_email = payload.get("sub")
+        if user_email is None:
+            raise _credentials_exception()
+    except JWTError:
+        raise _credentials_exception()
+    return user_email
+
+
+def _cache_principal(user: User, token: int):
+    """
+    Cache `user` unless an invalidation happened since `token` was taken, i.e. since
+    before the user was read.
+    """
+    values = {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+        if attr.key not in _UNCACHED_USER_COLUMNS
+    }
+    with _principal_lock:
+        if token == _principal_generation:
+            principal_cache.set(user.email, values)
+
+
+def _cached_principal(user_email: str) -> Optional[User]:
+    """
+    Rebuild the cached user for `user_email` as a detached instance, or return None.
+
+    Uncached columns are left unloaded and read from the database on first access.
+    """
+    values = principal_cache.get(user_email)
+    if values is None:
+        return None
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_principal(*emails: Optional[str]):
+    """
+    Drop the cached principals of the given users.
+
+    Call it whenever a user's email, password or role changes, so that the next
+    request re-reads the user and, for example, a demoted admin loses access at once.
+
+    Parameters
+    ----------
+    *emails : str
+        Emails (token subjects) of the changed users.
+    """
+    global _principal_generation
+    with _principal_lock:
+        _principal_generation += 1
+        principal_cache.invalidate(*emails)
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """
     Retrieve the currently authenticated user from a JWT token.
 
     This function decodes the provided JWT token, verifies its validity,
     extracts the user's email, and retrieves the corresponding user from
-    the database. If authentication fails at any step, an HTTP 401
-    Unauthorized exception is raised.
+    the principal cache or, on a miss, the database. If authentication
+    fails at any step, an HTTP 401 Unauthorized exception is raised.
 
     Parameters
     ----------
@@ -99,26 +197,62 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     HTTPException
         If the authentication credentials are invalid or the user does not exist.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid authentication credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    user_email = _decode_subject(token)
 
-    try:
-        # Decode JWT token and extract user email
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_email = payload.get("sub")
-        if user_email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    cached = _cached_principal(user_email)
+    if cached is not None:
+        # Attach without a SELECT; the route can still modify and commit the user
+        return db.merge(cached, load=False)
 
+    token = _principal_generation
     # Query database for user
     user = db.query(User).filter(User.email == user_email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    _cache_principal(user, token)
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Async counterpart of `get_current_user` for routes using an `AsyncSession`.
+
+    The user is loaded into the request's async session, so routes can modify and
+    commit it through that session.
+
+    Parameters
+    ----------
+    token : str
+        The JWT token provided by the client for authentication.
+    db : AsyncSession
+        Async SQLAlchemy database session dependency.
+
+    Returns
+    -------
+    User
+        The authenticated user object retrieved from the database.
+
+    Raises
+    ------
+    HTTPException
+        If the authentication credentials are invalid or the user does not exist.
+    """
+    user_email = _decode_subject(token)
+
+    cached = _cached_principal(user_email)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    token = _principal_generation
+    result = await db.execute(select(User).where(User.email == user_email))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
 
+    _cache_principal(user, token)
     return user
 
 
@@ -0,0 +1,137 @@
+"""
+Helpers shared by the benchmarks: synthetic data, servers and latency statistics.
+"""
+import math
+import socket
+import time
+
+import httpx
+from sqlalchemy import insert
+
+import app.api  # noqa: F401  Registers every model on Base.metadata
+from app import database
+from app.database import init_db
+from app.models.comparison import Comparison, ComparisonProduct
+from app.models.product import Product, ProductMetadata, ProductType
+from app.models.user import User
+
+ATTRIBUTES = ("warranty", "battery_life", "screen_size", "camera_quality", "processor_speed")
+
+
+def seed_database(db_url: str, products: int = 2000, comparisons: int = 200):
+    """
+    Create the schema and fill it with a synthetic catalog.
+
+    Every product gets one metadata row per attribute in `ATTRIBUTES`, and every
+    comparison links four products.
+
+    Parameters
+    ----------
+    db_url : str
+        The database connection URL.
+    products : int, optional
+        Number of products (default is 2000).
+    comparisons : int, optional
+        Number of comparisons (default is 200).
+    """
+    init_db(db_url)
+    session = database.SessionLocal()
+    session.execute(
+        insert(User), [{"user_id": "bench", "email": "bench@example.com", "password": "-"}]
+    )
+    session.execute(
+        insert(ProductType),
+        [
+            {
+                "id": 1,
+                "name": "Electronics",
+                "description": "",
+                "metadata_schema": {attribute: "float" for attribute in ATTRIBUTES},
+            }
+        ],
+    )
+    session.execute(
+        insert(Product),
+        [
+            {
+                "id": i,
+                "product_type_id": 1,
+                "user_id": "bench",
+                "name": f"Product {i}",
+                "brand": f"Brand {i % 50}",
+                "price": float(100 + i % 900),
+                "score": (i % 50) / 10,
+            }
+            for i in range(1, products + 1)
+        ],
+    )
+    session.execute(
+        insert(ProductMetadata),
+        [
+            {
+                "product_id": i,
+                "attribute": attribute,
+                "value": str((i * (n + 3)) % 97),
+                "score": ((i * (n + 7)) % 50) / 10,
+            }
+            for i in range(1, products + 1)
+            for n, attribute in enumerate(ATTRIBUTES)
+        ],
+    )
+    session.execute(
+        insert(Comparison),
+        [
+            {
+                "id": c,
+                "user_id": "bench",
+                "title": f"Comparison {c}",
+                "description": "",
+                "date_created": "2025-01-01",
+                "product_type_id": 1,
+            }
+            for c in range(1, comparisons + 1)
+        ],
+    )
+    session.execute(
+        insert(ComparisonProduct),
+        [
+            {"comparison_id": c, "product_id": (c * 4 + k) % products + 1}
+            for c in range(1, comparisons + 1)
+            for k in range(4)
+        ],
+    )
+    session.commit()
+    session.close()
+
+
+def free_port() -> int:
+    """
+    Return a TCP port on 127.0.0.1 that no process listens on, for a server to bind.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    """
+    Poll a freshly started server until it answers HTTP requests.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            httpx.get(f"{base_url}/api/product-types/", timeout=1)
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def percentile(samples: list, pct: float) -> float:
+    """
+    Return the `pct`-th percentile of `samples` (nearest-rank method).
+    """
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
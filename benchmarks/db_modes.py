@@ -0,0 +1,117 @@
+"""
+Compare throughput and tail latency of the sync and async database modes.
+
+A seeded SQLite database is served by a fresh uvicorn process per mode
+(``DB_MODE=sync`` and ``DB_MODE=async``), then hammered with concurrent reads of
+the product and comparison endpoints.
+
+Usage::
+
+    python -m benchmarks.db_modes --concurrency=256 --requests=5000
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import fire
+import httpx
+
+from benchmarks.common import percentile, seed_database, wait_until_ready
+
+ENDPOINTS = (
+    "/api/products/?limit=20",
+    "/api/products/1",
+    "/api/comparisons/?limit=10",
+    "/api/comparisons/1",
+)
+
+SERVER = """
+import os, uvicorn
+from app.api import app
+from app.database import init_async_db, init_db
+init_db(os.environ["DB_URL"])
+if os.environ["DB_MODE"] == "async":
+    init_async_db(os.environ["DB_URL"])
+uvicorn.run(app, host="127.0.0.1", port=int(os.environ["PORT"]), log_level="warning")
+"""
+
+
+async def _load(base_url: str, concurrency: int, requests: int) -> tuple:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    # Expire idle connections before uvicorn's 5 s keep-alive timeout closes them
+    limits = httpx.Limits(max_connections=concurrency, keepalive_expiry=2)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def hit(path: str):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                except httpx.TransportError:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(hit(ENDPOINTS[i % len(ENDPOINTS)]) for i in range(requests))
+        )
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, latencies, errors
+
+
+def run(
+    concurrency: int = 256,
+    requests: int = 5000,
+    products: int = 2000,
+    port: int = 8765,
+    modes: tuple = ("sync", "async"),
+):
+    """
+    Benchmark both database modes and print requests per second and latencies.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        Number of requests in flight at any time (default is 256).
+    requests : int, optional
+        Number of requests per mode (default is 5000).
+    products : int, optional
+        Number of products in the seeded catalog (default is 2000).
+    port : int, optional
+        Port the benchmarked server listens on (default is 8765).
+    modes : tuple, optional
+        Database modes to benchmark (default is both).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        seed_database(db_url, products=products)
+
+        print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for mode in modes:
+            env = dict(os.environ, DB_URL=db_url, DB_MODE=mode, PORT=str(port))
+            server = subprocess.Popen([sys.executable, "-c", SERVER], env=env)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                wait_until_ready(base_url)
+                asyncio.run(_load(base_url, concurrency, min(requests, 500)))  # Warm-up
+                rps, latencies, errors = asyncio.run(_load(base_url, concurrency, requests))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:<6} {rps:>9.0f} {percentile(latencies, 50) * 1000:>9.1f} "
+                f"{percentile(latencies, 99) * 1000:>9.1f} {errors:>7}"
+            )
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
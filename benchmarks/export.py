@@ -0,0 +1,151 @@
+"""
+Measure the memory and throughput of the streaming catalog export.
+
+A SQLite catalog of ``--products`` products, each with five metadata rows, is
+generated inside the database with recursive CTEs (so seeding a million products
+needs no memory on the client side either). A fresh uvicorn process then serves
+``GET /api/admin/export/products`` while its resident set size is sampled; the
+peak should stay near the idle size whatever the catalog size. SQLite's memory map
+and page cache count towards the RSS as they fill, up to ``SQLITE_MMAP_SIZE`` and
+``SQLITE_CACHE_SIZE``; set both low to see the memory of the export alone.
+
+Usage::
+
+    python -m benchmarks.export --products=1000000 --formats=ndjson,csv --gzip=True
+    SQLITE_MMAP_SIZE=0 SQLITE_CACHE_SIZE=-2000 python -m benchmarks.export --products=1000000
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import fire
+import httpx
+from sqlalchemy import text
+
+from app import database
+from app.database import init_db
+from app.models.user import User
+from app.utils import create_access_token
+from benchmarks.common import ATTRIBUTES, wait_until_ready
+from benchmarks.db_modes import SERVER
+
+
+def _seed(db_url: str, products: int):
+    init_db(db_url)
+    session = database.SessionLocal()
+    session.add(User(user_id="admin", email="admin@example.com", password="-", role="admin"))
+    session.execute(
+        text(
+            "INSERT INTO product_types (id, name, description, metadata_schema) "
+            "VALUES (1, 'Electronics', '', '{}')"
+        )
+    )
+    session.execute(
+        text(
+            "WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n) "
+            "INSERT INTO products (id, product_type_id, user_id, name, brand, price, score) "
+            "SELECT i, 1, 'admin', 'Product ' || i, 'Brand ' || (i % 50), 100 + i % 900, "
+            "(i % 50) / 10.0 FROM seq"
+        ),
+        {"n": products},
+    )
+    for n, attribute in enumerate(ATTRIBUTES):
+        session.execute(
+            text(
+                "WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n) "
+                "INSERT INTO product_metadata (product_id, attribute, value, score, value_num, "
+                "value_text) SELECT i, :attribute, (i * :a) % 97, (i * :b) % 50 / 10.0, "
+                "(i * :a) % 97, (i * :a) % 97 FROM seq"
+            ),
+            {"n": products, "attribute": attribute, "a": n + 3, "b": n + 7},
+        )
+    session.commit()
+    session.close()
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _export(base_url: str, pid: int, query: str) -> tuple:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+    samples = []
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            samples.append(_rss_mb(pid))
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    size = 0
+    start = time.perf_counter()
+    try:
+        with httpx.stream(
+            "GET", f"{base_url}/api/admin/export/products?{query}", headers=headers, timeout=None
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_raw():
+                size += len(chunk)
+    finally:
+        done.set()
+        sampler.join()
+    return time.perf_counter() - start, size, max(samples)
+
+
+def run(products: int = 200000, formats: str = "ndjson,csv", gzip: bool = False, port: int = 8768):
+    """
+    Export a synthetic catalog and report the server's peak RSS.
+
+    Parameters
+    ----------
+    products : int, optional
+        Number of products in the catalog (default is 200000).
+    formats : str, optional
+        Comma-separated export formats to measure (default is ``ndjson,csv``).
+    gzip : bool, optional
+        Request gzipped exports (default is False).
+    port : int, optional
+        Port the benchmarked server listens on (default is 8768).
+    """
+    if isinstance(formats, str):
+        formats = formats.split(",")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        _seed(db_url, products)
+
+        env = dict(os.environ, DB_URL=db_url, DB_MODE="sync", PORT=str(port))
+        server = subprocess.Popen(
+            [sys.executable, "-c", SERVER],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_ready(base_url)
+            idle = _rss_mb(server.pid)
+            print(f"{products} products, idle server RSS {idle:.1f} MB")
+            print(f"{'format':<8} {'seconds':>8} {'MB sent':>8} {'MB/s':>7} {'peak RSS':>9}")
+            for export_format in formats:
+                query = f"format={export_format}&gzip={str(gzip).lower()}"
+                elapsed, size, peak = _export(base_url, server.pid, query)
+                print(
+                    f"{export_format:<8} {elapsed:>8.2f} {size / 2**20:>8.1f} "
+                    f"{size / 2**20 / elapsed:>7.1f} {peak:>8.1f}M"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,138 @@
+"""
+Measure how a burst of logins affects the latency of other endpoints.
+
+A seeded SQLite database is served by a fresh uvicorn process per hashing mode:
+``inline`` hashes in the request thread (``HASH_WORKERS=0``) and ``pool`` uses the
+password executor. For each mode, product reads are timed alone and then while
+concurrent logins hammer ``/api/auth/login``.
+
+Usage::
+
+    python -m benchmarks.login_storm --logins=400 --login_concurrency=64
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import fire
+import httpx
+from sqlalchemy import insert
+
+from app import database
+from app.hashing import get_pwd_context
+from app.models.user import User
+from benchmarks.common import percentile, seed_database, wait_until_ready
+from benchmarks.db_modes import SERVER
+
+PROBE = "/api/products/1"
+PASSWORD = "benchmark"
+
+
+def _seed_users(db_url: str, users: int):
+    seed_database(db_url, products=200, comparisons=20)
+    hashed = get_pwd_context().hash(PASSWORD)
+    session = database.SessionLocal()
+    session.execute(
+        insert(User),
+        [
+            {"user_id": f"user{i}", "email": f"user{i}@example.com", "password": hashed}
+            for i in range(users)
+        ],
+    )
+    session.commit()
+    session.close()
+
+
+async def _probe(client: httpx.AsyncClient, until: float, interval: float) -> list:
+    latencies = []
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        await client.get(PROBE)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _storm(base_url: str, logins: int, concurrency: int, users: int) -> tuple:
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency + 1, keepalive_expiry=2)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        quiet = await _probe(client, time.perf_counter() + 3, 0.05)
+
+        async def login(i: int):
+            async with semaphore:
+                body = {"email": f"user{i % users}@example.com", "password": PASSWORD}
+                response = await client.post("/api/auth/login", json=body)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def storm() -> float:
+            await asyncio.gather(*(login(i) for i in range(logins)))
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        storm_task = asyncio.ensure_future(storm())
+        busy = await _probe(client, started + 10, 0.05)
+        elapsed = await storm_task
+    return quiet, busy, statuses, elapsed
+
+
+def run(
+    logins: int = 400,
+    login_concurrency: int = 64,
+    users: int = 50,
+    port: int = 8766,
+    modes: tuple = ("inline", "pool"),
+):
+    """
+    Benchmark product read latency with and without a concurrent login storm.
+
+    Parameters
+    ----------
+    logins : int, optional
+        Number of login requests in the storm (default is 400).
+    login_concurrency : int, optional
+        Number of logins in flight at any time (default is 64).
+    users : int, optional
+        Number of distinct users logging in (default is 50).
+    port : int, optional
+        Port the benchmarked server listens on (default is 8766).
+    modes : tuple, optional
+        Hashing modes to benchmark, ``"inline"`` and/or ``"pool"`` (default is both).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        _seed_users(db_url, users)
+
+        print(
+            f"{'mode':<7} {'quiet p50':>10} {'quiet p99':>10} {'storm p50':>10} "
+            f"{'storm p99':>10} {'logins/s':>9}  statuses"
+        )
+        for mode in modes:
+            env = dict(os.environ, DB_URL=db_url, DB_MODE="sync", PORT=str(port))
+            if mode == "inline":
+                env["HASH_WORKERS"] = "0"
+            server = subprocess.Popen([sys.executable, "-c", SERVER], env=env)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                wait_until_ready(base_url)
+                quiet, busy, statuses, elapsed = asyncio.run(
+                    _storm(base_url, logins, login_concurrency, users)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:<7} {percentile(quiet, 50) * 1000:>10.1f} "
+                f"{percentile(quiet, 99) * 1000:>10.1f} {percentile(busy, 50) * 1000:>10.1f} "
+                f"{percentile(busy, 99) * 1000:>10.1f} {statuses.get(200, 0) / elapsed:>9.1f}  "
+                f"{dict(sorted(statuses.items()))}"
+            )
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,120 @@
+"""
+Compare loading the products of a comparison one by one with one batch request.
+
+A seeded SQLite database is served by a fresh uvicorn process. Each round loads
+``--size`` random product IDs three ways: ``GET /api/products/{id}`` one after
+the other, the same requests all in flight at once (as a browser would send
+them), and a single ``POST /api/products/batch``.
+
+The per-ID endpoint is served from the entity cache once warm; pass
+``--entity_cache=off`` to compare database reads only.
+
+Usage::
+
+    python -m benchmarks.product_batch --size=20 --rounds=200 --mode=sync
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import fire
+import httpx
+
+from benchmarks.common import percentile, seed_database, wait_until_ready
+from benchmarks.db_modes import SERVER
+
+
+async def _sequential(client: httpx.AsyncClient, ids: list):
+    for product_id in ids:
+        (await client.get(f"/api/products/{product_id}")).raise_for_status()
+
+
+async def _parallel(client: httpx.AsyncClient, ids: list):
+    responses = await asyncio.gather(*(client.get(f"/api/products/{i}") for i in ids))
+    for response in responses:
+        response.raise_for_status()
+
+
+async def _batch(client: httpx.AsyncClient, ids: list):
+    (await client.post("/api/products/batch", json={"ids": ids})).raise_for_status()
+
+
+STRATEGIES = {"per-id loop": _sequential, "per-id parallel": _parallel, "batch": _batch}
+
+
+async def _measure(base_url: str, products: int, size: int, rounds: int) -> dict:
+    timings = {name: [] for name in STRATEGIES}
+    limits = httpx.Limits(max_connections=size)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        for _ in range(rounds):
+            ids = random.sample(range(1, products + 1), size)
+            for name, strategy in STRATEGIES.items():
+                start = time.perf_counter()
+                await strategy(client, ids)
+                timings[name].append(time.perf_counter() - start)
+    return timings
+
+
+def run(
+    size: int = 20,
+    rounds: int = 200,
+    products: int = 2000,
+    mode: str = "sync",
+    entity_cache: str = "memory",
+    port: int = 8769,
+):
+    """
+    Time the three ways of loading `size` products and print their latencies.
+
+    Parameters
+    ----------
+    size : int, optional
+        Number of products loaded per round (default is 20).
+    rounds : int, optional
+        Number of rounds per strategy (default is 200).
+    products : int, optional
+        Number of products in the seeded catalog (default is 2000).
+    mode : str, optional
+        Database mode of the server, ``sync`` (default) or ``async``.
+    entity_cache : str, optional
+        ``ENTITY_CACHE`` of the server (default is ``memory``).
+    port : int, optional
+        Port the benchmarked server listens on (default is 8769).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        seed_database(db_url, products=products)
+
+        env = dict(
+            os.environ, DB_URL=db_url, DB_MODE=mode, PORT=str(port), ENTITY_CACHE=entity_cache
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-c", SERVER],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_ready(base_url)
+            asyncio.run(_measure(base_url, products, size, min(rounds, 20)))  # Warm-up
+            timings = asyncio.run(_measure(base_url, products, size, rounds))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{size} products per round, {mode} mode, entity cache {entity_cache}")
+    print(f"{'strategy':<16} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, samples in timings.items():
+        print(
+            f"{name:<16} {percentile(samples, 50) * 1000:>9.1f} "
+            f"{percentile(samples, 95) * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,125 @@
+"""
+Time the startup seeding of a large catalog.
+
+Synthetic resource files with `products` products are written to a temporary
+directory and loaded into a fresh SQLite database with `initialize_all`, three times:
+the first run parses the YAML and inserts everything, the second finds every row
+already present, and the third inserts everything again into a new database from the
+cached parse.
+
+Usage::
+
+    python -m benchmarks.seeding --products=100000
+"""
+import os
+import tempfile
+import time
+
+import fire
+import yaml
+
+import app.api  # noqa: F401  Registers every model on Base.metadata
+from app.blobstore import init_blob_store
+from app.database import init_db
+from app.initializer import initialize_all
+from benchmarks.common import ATTRIBUTES
+
+# 1x1 transparent PNG
+IMAGE = (
+    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk"
+    "YPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+def _write_resources(directory: str, products: int, metadata_per_product: int):
+    users = [
+        {"user_id": f"user{i}", "email": f"user{i}@example.com", "password": "password"}
+        for i in range(3)
+    ]
+    catalog = {
+        "product_types": [
+            {
+                "id": 1,
+                "name": "Electronics",
+                "description": "",
+                "metadata_schema": {attribute: "float" for attribute in ATTRIBUTES},
+            }
+        ],
+        "products": [
+            {
+                "id": i,
+                "product_type_id": 1,
+                "user_id": f"user{i % 3}",
+                "name": f"Product {i}",
+                "brand": f"Brand {i % 50}",
+                "price": 100 + i % 900,
+                "score": (i % 50) / 10,
+                "image": IMAGE,
+            }
+            for i in range(1, products + 1)
+        ],
+        "product_metadata": [
+            {
+                "id": i * metadata_per_product + n,
+                "product_id": i,
+                "attribute": ATTRIBUTES[n % len(ATTRIBUTES)],
+                "value": str(i % 97),
+                "score": (i % 50) / 10,
+            }
+            for i in range(1, products + 1)
+            for n in range(metadata_per_product)
+        ],
+    }
+    comparisons = {
+        "comparisons": [
+            {
+                "id": 1,
+                "user_id": "user0",
+                "title": "Comparison",
+                "description": "",
+                "date_created": "2025-01-01",
+                "product_type_id": 1,
+            }
+        ],
+        "comparison_products": [
+            {"id": k, "comparison_id": 1, "product_id": k} for k in range(1, 5)
+        ],
+    }
+    for name, document in (
+        ("users.yml", {"users": users}),
+        ("products.yml", catalog),
+        ("comparisons.yml", comparisons),
+    ):
+        with open(os.path.join(directory, name), "w") as f:
+            yaml.dump(document, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def run(products: int = 100000, metadata_per_product: int = 1):
+    """
+    Seed a synthetic catalog and print how long the first and second runs take.
+
+    Parameters
+    ----------
+    products : int, optional
+        Number of products (default is 100000).
+    metadata_per_product : int, optional
+        Metadata rows per product (default is 1).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write_resources(tmp_dir, products, metadata_per_product)
+        init_blob_store(os.path.join(tmp_dir, "blobs"))
+        os.environ["SEED_CACHE_DIR"] = os.path.join(tmp_dir, "seed-cache")
+
+        for label, database in (
+            ("insert, cold parse", "seed.db"),
+            ("no-op", "seed.db"),
+            ("insert, cached parse", "reseed.db"),
+        ):
+            init_db(f"sqlite:///{os.path.join(tmp_dir, database)}")
+            start = time.perf_counter()
+            initialize_all(tmp_dir)
+            print(f"{label:<21} {time.perf_counter() - start:>8.2f} s")
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
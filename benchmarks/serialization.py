@@ -0,0 +1,135 @@
+"""
+Measure the CPU cost of serializing product lists, before and after the fast path.
+
+Routes of a bare FastAPI app serve the same in-memory ORM products, the way
+``GET /api/products/`` did before and does now:
+
+* full DTOs: ``ProductDTO`` objects returned under ``response_model``, which
+  FastAPI validates again before encoding them, against
+  `app.responses.list_response`, which validates the ORM rows once and encodes
+  them to bytes in pydantic-core;
+* ``fields=name,price,product_metadata``: dicts encoded by the stdlib through
+  ``JSONResponse`` against `app.responses.json_response`.
+
+Each route is called through the ASGI stack with a sync handler, as in the app,
+and the process CPU time per response is reported for lists of 10, 100 and 1000
+products with five metadata entries each.
+
+Usage::
+
+    python -m benchmarks.serialization --sizes=10,100,1000 --seconds=2
+"""
+import time
+from typing import List
+
+import fire
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.testclient import TestClient
+
+import app.api  # noqa: F401  Registers every model on Base.metadata
+from app.models.product import Product, ProductMetadata
+from app.responses import json_response, list_response
+from app.routes.products import _project
+from app.schemas.product import ProductDTO, ProductMetadataDTO
+from benchmarks.common import ATTRIBUTES
+
+
+def _products(count: int) -> list:
+    return [
+        Product(
+            id=i,
+            product_type_id=1,
+            name=f"Product {i}",
+            brand=f"Brand {i % 50}",
+            price=float(100 + i % 900),
+            score=(i % 50) / 10,
+            image_hash=f"{i:064x}",
+            product_metadata=[
+                ProductMetadata(attribute=attribute, value=str(i * (n + 3) % 97), score=1.5)
+                for n, attribute in enumerate(ATTRIBUTES)
+            ],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+FIELDS = ("id", "name", "price", "product_metadata")
+
+
+def _app(products: list) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/full/before/{count}", response_model=List[ProductDTO])
+    def full_before(count: int):
+        return [ProductDTO.model_validate(product) for product in products[:count]]
+
+    @bench.get("/full/after/{count}", response_model=List[ProductDTO])
+    def full_after(count: int):
+        return list_response(ProductDTO, products[:count])
+
+    @bench.get("/fields/before/{count}", response_model=List[ProductDTO])
+    def fields_before(count: int):
+        return JSONResponse(
+            [
+                {
+                    "id": product.id,
+                    "name": product.name,
+                    "price": product.price,
+                    "product_metadata": [
+                        ProductMetadataDTO.model_validate(meta).model_dump()
+                        for meta in product.product_metadata
+                    ],
+                }
+                for product in products[:count]
+            ]
+        )
+
+    @bench.get("/fields/after/{count}", response_model=List[ProductDTO])
+    def fields_after(count: int):
+        return json_response([_project(product, FIELDS) for product in products[:count]])
+
+    return bench
+
+
+def _cpu_per_response(client: TestClient, path: str, seconds: float) -> float:
+    body = client.get(path).content  # Warm-up
+    calls = 0
+    start_cpu, deadline = time.process_time(), time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        assert client.get(path).content == body
+        calls += 1
+    return (time.process_time() - start_cpu) / calls
+
+
+def run(sizes: str = "10,100,1000", seconds: float = 2.0):
+    """
+    Print the CPU time per response of both routes for each list size.
+
+    Parameters
+    ----------
+    sizes : str, optional
+        Comma-separated numbers of products per response (default is
+        ``10,100,1000``).
+    seconds : float, optional
+        Wall time spent calling each route per size (default is 2).
+    """
+    if isinstance(sizes, str):
+        sizes = [int(size) for size in sizes.split(",")]
+    else:
+        sizes = [int(size) for size in sizes]
+    products = _products(max(sizes))
+    with TestClient(_app(products)) as client:
+        print(f"{'response':<8} {'products':>8} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+        for kind in ("full", "fields"):
+            for size in sizes:
+                before = _cpu_per_response(client, f"/{kind}/before/{size}", seconds)
+                after = _cpu_per_response(client, f"/{kind}/after/{size}", seconds)
+                print(
+                    f"{kind:<8} {size:>8} {before * 1000:>10.3f} {after * 1000:>9.3f} "
+                    f"{before / after:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,132 @@
+"""
+Break a worker's time-to-first-request into phases.
+
+Each run starts a fresh interpreter that goes through the steps of `app.main.run_app`
+and then serves `app.api.app` with uvicorn, timing each phase:
+
+- ``imports``: importing `app.main` and everything it pulls in;
+- ``init_db``: creating the engine and checking the schema;
+- ``seeding``: `initialize_all`;
+- ``app``: importing `app.api`, which builds the FastAPI application and its routers;
+- ``first request``: from process start until a request is answered, as seen by
+  the client. It includes interpreter startup and binding the port.
+
+The database is seeded once beforehand, so the runs measure a restart; pass
+``--cold`` to start every run from an empty database instead.
+
+Usage::
+
+    python -m benchmarks.startup --runs=5
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import fire
+
+from benchmarks.common import free_port, wait_until_ready
+
+PHASES = ("imports", "init_db", "seeding", "app")
+
+WORKER = """
+import json, os, sys, time
+marks = [time.perf_counter()]
+import app.main
+marks.append(time.perf_counter())
+from app.database import init_db
+init_db(os.environ["DB_URL"])
+marks.append(time.perf_counter())
+from app.events import on_start
+on_start()
+marks.append(time.perf_counter())
+from app.api import app
+marks.append(time.perf_counter())
+with open(os.environ["PHASES_FILE"], "w") as f:
+    json.dump([end - start for start, end in zip(marks, marks[1:])], f)
+import uvicorn
+uvicorn.run(app, host="127.0.0.1", port=int(os.environ["PORT"]), log_level="warning")
+"""
+
+
+def measure(db_url: str, port: Optional[int] = None) -> dict:
+    """
+    Start one worker against `db_url` and time its phases.
+
+    Parameters
+    ----------
+    db_url : str
+        The database connection URL.
+    port : int, optional
+        Port the worker listens on (default is a free port).
+
+    Returns
+    -------
+    dict
+        Seconds spent in each of `PHASES` and until the ``first request`` succeeded.
+    """
+    port = port or free_port()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        phases_file = os.path.join(tmp_dir, "phases.json")
+        env = dict(
+            os.environ,
+            DB_URL=db_url,
+            PORT=str(port),
+            PHASES_FILE=phases_file,
+            BLOB_STORE_DIR=os.path.join(tmp_dir, "blobs"),
+        )
+        start = time.perf_counter()
+        worker = subprocess.Popen(
+            [sys.executable, "-c", WORKER],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(f"http://127.0.0.1:{port}", timeout=60)
+            first_request = time.perf_counter() - start
+        finally:
+            worker.terminate()
+            worker.wait()
+        with open(phases_file) as f:
+            timings = dict(zip(PHASES, json.load(f)))
+    timings["first request"] = first_request
+    return timings
+
+
+def run(runs: int = 5, cold: bool = False, port: Optional[int] = None):
+    """
+    Measure worker startup several times and print the median of each phase.
+
+    Parameters
+    ----------
+    runs : int, optional
+        Number of workers started (default is 5).
+    cold : bool, optional
+        Start every worker from an empty database (default is False).
+    port : int, optional
+        Port the workers listen on (default is a free port for each).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = []
+        for i in range(runs + (0 if cold else 1)):
+            db_name = f"startup{i}.db" if cold else "startup.db"
+            result = measure(f"sqlite:///{os.path.join(tmp_dir, db_name)}", port)
+            if cold or i > 0:  # The first warm run seeds the database
+                results.append(result)
+
+    print(f"{'phase':<14} {'median ms':>10} {'max ms':>10}")
+    for phase in PHASES + ("first request",):
+        samples = [result[phase] for result in results]
+        print(
+            f"{phase:<14} {statistics.median(samples) * 1000:>10.1f} "
+            f"{max(samples) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,127 @@
+"""
+Helpers shared by the integration tests.
+
+Each test module creates its own SQLite database in a temporary directory from
+``setUpModule``, seeds it with the builders below, and removes the directory from
+``tearDownModule``.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+
+from app import database
+from app.blobstore import init_blob_store
+from app.database import init_db
+from app.models.product import Product, ProductMetadata, ProductType
+from app.models.user import User
+from app.utils import create_access_token
+
+
+def auth_headers(email: str) -> dict:
+    """
+    Return the ``Authorization`` header of a user, identified by their email.
+    """
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+
+def create_test_database(name: str, blobs: bool = False) -> str:
+    """
+    Create an empty database in a new temporary directory and make it current.
+
+    Parameters
+    ----------
+    name : str
+        The database file name, without extension.
+    blobs : bool, optional
+        Whether to also create a blob store in the directory (default is False).
+
+    Returns
+    -------
+    str
+        The temporary directory, to pass to `remove_test_database`.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    init_db(f"sqlite:///{os.path.join(tmp_dir, f'{name}.db')}")
+    if blobs:
+        init_blob_store(os.path.join(tmp_dir, "blobs"))
+    return tmp_dir
+
+
+def remove_test_database(tmp_dir: Optional[str]):
+    """
+    Remove a directory made by `create_test_database`, with everything in it.
+    """
+    if tmp_dir:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@contextmanager
+def seeding():
+    """
+    Open a session on the current database, committed when the block exits cleanly.
+
+    Yields
+    ------
+    Session
+        The session.
+    """
+    session = database.SessionLocal()
+    try:
+        yield session
+        session.commit()
+    finally:
+        session.close()
+
+
+def make_user(user_id: str, role: str = "user", password: str = "x") -> User:
+    """
+    Build a user whose email is ``<user_id>@example.com``.
+    """
+    return User(user_id=user_id, email=f"{user_id}@example.com", password=password, role=role)
+
+
+def make_product_type(
+    type_id: int = 1, name: str = "Phones", metadata_schema: Optional[dict] = None
+) -> ProductType:
+    """
+    Build a product type, by default the "Phones" type with ID 1 and no schema.
+    """
+    return ProductType(
+        id=type_id, name=name, description="", metadata_schema=metadata_schema or {}
+    )
+
+
+def make_product(product_id: int, *attributes: str, **fields) -> Product:
+    """
+    Build a phone of type 1, with a metadata entry per attribute.
+
+    Parameters
+    ----------
+    product_id : int
+        The product ID, also used in its default name ``Phone <product_id>``.
+    *attributes : str
+        Metadata attributes, each with value ``"10"`` and score 1.
+    **fields
+        Column values overriding the defaults, or ``product_metadata``.
+
+    Returns
+    -------
+    Product
+        The product, not yet added to a session.
+    """
+    values = {
+        "id": product_id,
+        "product_type_id": 1,
+        "name": f"Phone {product_id}",
+        "brand": "Brand",
+        "price": 100.0,
+        "score": 4.0,
+        "product_metadata": [
+            ProductMetadata(attribute=attribute, value="10", score=1.0)
+            for attribute in attributes
+        ],
+    }
+    values.update(fields)
+    return Product(**values)
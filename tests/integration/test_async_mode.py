@@ -0,0 +1,130 @@
+import base64
+import threading
+import unittest
+from unittest import mock
+
+from fastapi import APIRouter, FastAPI
+from starlette.testclient import TestClient
+
+from app import database
+from app.database import init_async_db
+from app.models.comparison import Comparison, ComparisonProduct
+from app.models.product import ProductMetadata
+from app.routes import products as sync_products
+from app.routes.aio import auth, comparisons, products
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = None
+tmp_dir = None
+ADMIN = auth_headers("admin@example.com")
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+def _app() -> FastAPI:
+    """The routers served in ``DB_MODE=async``, as mounted by app.api."""
+    api_router = APIRouter(prefix="/api")
+    api_router.include_router(auth.router, prefix="/auth")
+    api_router.include_router(products.router, prefix="/products")
+    api_router.include_router(comparisons.router, prefix="/comparisons")
+    app = FastAPI()
+    app.include_router(api_router)
+    return app
+
+
+def setUpModule():
+    """Create a temporary database served through aiosqlite, with one comparison."""
+    global client, tmp_dir
+    tmp_dir = create_test_database("async", blobs=True)
+    init_async_db(str(database.engine.url))
+    with seeding() as session:
+        session.add(make_user("admin", role="admin"))
+        session.add(make_product_type())
+        session.add_all(
+            make_product(
+                i,
+                price=100.0 * i,
+                product_metadata=[ProductMetadata(attribute="battery_life", value="10", score=i)],
+            )
+            for i in (1, 2)
+        )
+        session.add(
+            Comparison(
+                id=1,
+                title="Phones",
+                description="",
+                date_created="2024-01-01",
+                product_type_id=1,
+                user_id="admin",
+                products=[ComparisonProduct(product_id=1), ComparisonProduct(product_id=2)],
+            )
+        )
+
+    # One event loop for the whole module, which the pooled aiosqlite connections need
+    client = TestClient(_app())
+    client.__enter__()
+
+
+def tearDownModule():
+    client.__exit__(None, None, None)
+    remove_test_database(tmp_dir)
+
+
+class TestAsyncMode(unittest.TestCase):
+    def test_read_routes(self):
+        self.assertEqual(client.get("/api/auth/me", headers=ADMIN).json()["role"], "admin")
+        self.assertEqual(
+            [p["name"] for p in client.get("/api/products/?limit=2").json()],
+            ["Phone 1", "Phone 2"],
+        )
+        comparison = client.get("/api/comparisons/1").json()
+        self.assertEqual(len(comparison["products"]), 2)
+        matrix = client.get("/api/comparisons/1/matrix").json()
+        self.assertEqual(matrix["winners"], {"battery_life": 2})
+
+    def test_file_work_runs_off_the_event_loop(self):
+        """The image is stored and served from worker threads, not the loop's."""
+        loop_thread = client.portal.call(threading.get_ident)
+        threads = []
+
+        def record(fn):
+            def wrapper(*args, **kwargs):
+                threads.append(threading.get_ident())
+                return fn(*args, **kwargs)
+
+            return wrapper
+
+        payload = {
+            "name": "Tablet",
+            "brand": "Y",
+            "price": 2.0,
+            "score": 2.0,
+            "product_type_id": 1,
+            "image_base64": base64.b64encode(PNG).decode(),
+            "product_metadata": [],
+        }
+        with mock.patch.object(
+            sync_products, "set_product_image", record(sync_products.set_product_image)
+        ), mock.patch.object(
+            sync_products, "_image_response", record(sync_products._image_response)
+        ):
+            created = client.post("/api/products/", json=payload, headers=ADMIN)
+            self.assertEqual(created.status_code, 200, created.text)
+            image = client.get(created.json()["image_url"])
+
+        self.assertEqual(image.content, PNG)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+from unittest import mock
+
+from passlib.context import CryptContext
+from starlette.testclient import TestClient
+
+from app import database, hashing, utils
+from app.api import app
+from app.middlewares.query_count import QUERY_COUNT_HEADER
+from app.models.user import User
+from app.utils import create_access_token, hash_password, principal_cache
+from tests.integration import create_test_database, make_user, remove_test_database, seeding
+
+client = TestClient(app)
+tmp_dir = None
+
+
+def setUpModule():
+    """Create a temporary database with two administrators."""
+    global tmp_dir
+    tmp_dir = create_test_database("auth")
+    with seeding() as session:
+        session.add_all(
+            make_user(user_id, role="admin", password=hash_password("secret"))
+            for user_id in ("root", "deputy")
+        )
+
+
+def tearDownModule():
+    remove_test_database(tmp_dir)
+
+
+def _auth(user_id: str) -> dict:
+    token = create_access_token({"sub": f"{user_id}@example.com", "user_id": user_id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestPrincipalCache(unittest.TestCase):
+    def setUp(self):
+        principal_cache.clear()
+
+    def test_cached_principal_skips_user_query(self):
+        first = client.get("/api/auth/me", headers=_auth("root"))
+        second = client.get("/api/auth/me", headers=_auth("root"))
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(first.headers[QUERY_COUNT_HEADER], "1")
+        self.assertEqual(second.headers[QUERY_COUNT_HEADER], "0")
+
+    def test_demoted_admin_loses_access_immediately(self):
+        self.assertEqual(client.get("/api/admin/users", headers=_auth("deputy")).status_code, 200)
+
+        response = client.put(
+            "/api/admin/roles", json=[{"user_id": "deputy", "role": "user"}], headers=_auth("root")
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get("/api/admin/users", headers=_auth("deputy")).status_code, 403)
+
+        client.put(
+            "/api/admin/roles", json=[{"user_id": "deputy", "role": "admin"}], headers=_auth("root")
+        )
+
+    def test_user_read_before_invalidation_is_not_cached(self):
+        """A request that read the user before a role change cannot cache it after."""
+        session = database.SessionLocal()
+        user = session.query(User).filter(User.user_id == "deputy").one()
+        token = utils._principal_generation  # Taken before the read, as by a request
+        utils.invalidate_principal(user.email)  # Committed role change
+        utils._cache_principal(user, token)
+        session.close()
+        self.assertIsNone(principal_cache.get("deputy@example.com"))
+
+    def test_password_hash_is_not_cached(self):
+        client.get("/api/auth/me", headers=_auth("deputy"))
+        cached = principal_cache.get("deputy@example.com")
+        self.assertEqual(cached["role"], "admin")
+        self.assertNotIn("password", cached)
+
+    def test_changed_email_invalidates_old_subject(self):
+        client.get("/api/auth/me", headers=_auth("deputy"))
+        response = client.put(
+            "/api/auth/update", json={"email": "deputy2@example.com"}, headers=_auth("deputy")
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get("/api/auth/me", headers=_auth("deputy")).status_code, 401)
+
+        token = create_access_token({"sub": "deputy2@example.com"})
+        client.put(
+            "/api/auth/update",
+            json={"email": "deputy@example.com"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+
+class TestBulkRoleUpdate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with seeding() as session:
+            session.add_all(make_user(f"member{i}") for i in range(300))
+
+    def _roles(self, user_ids) -> dict:
+        session = database.SessionLocal()
+        rows = session.query(User.user_id, User.role).filter(User.user_id.in_(user_ids)).all()
+        session.close()
+        return dict(rows)
+
+    def test_updates_all_users_in_constant_queries(self):
+        payload = [{"user_id": f"member{i}", "role": "admin"} for i in range(300)]
+        client.get("/api/auth/me", headers=_auth("root"))  # Cache the admin
+
+        response = client.put("/api/admin/roles", json=payload, headers=_auth("root"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 300)
+        self.assertEqual(
+            response.json()[0],
+            {"user_id": "member0", "email": "member0@example.com", "role": "admin"},
+        )
+        self.assertEqual(response.headers[QUERY_COUNT_HEADER], "2")
+        self.assertEqual(set(self._roles([f"member{i}" for i in range(300)]).values()), {"admin"})
+
+        payload = [{"user_id": f"member{i}", "role": "user"} for i in range(300)]
+        client.put("/api/admin/roles", json=payload, headers=_auth("root"))
+
+    def test_reports_every_problem_and_changes_nothing(self):
+        payload = [
+            {"user_id": "member1", "role": "admin"},
+            {"user_id": "ghost1", "role": "admin"},
+            {"user_id": "member2", "role": "owner"},
+            {"user_id": "ghost2", "role": "user"},
+        ]
+
+        response = client.put("/api/admin/roles", json=payload, headers=_auth("root"))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.json()["detail"],
+            "Users not found: ghost1, ghost2. Invalid role for: member2.",
+        )
+        self.assertEqual(self._roles(["member1", "member2"]), {"member1": "user", "member2": "user"})
+
+
+class TestPasswordHashing(unittest.TestCase):
+    def test_login_rehashes_outdated_cost(self):
+        cheap = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+        session = database.SessionLocal()
+        session.add(User(user_id="legacy", email="legacy@example.com", password=cheap.hash("secret")))
+        session.commit()
+
+        response = client.post(
+            "/api/auth/login", json={"email": "legacy@example.com", "password": "secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        session.expire_all()
+        stored = session.get(User, "legacy").password
+        session.close()
+        self.assertTrue(stored.startswith(f"$2b${hashing.BCRYPT_ROUNDS:02d}$"))
+        self.assertTrue(hashing.get_pwd_context().verify("secret", stored))
+
+    def test_saturated_executor_rejects_fast(self):
+        with mock.patch.object(hashing, "_queue_limit", return_value=0):
+            response = client.post(
+                "/api/auth/login", json={"email": "root@example.com", "password": "secret"}
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+
+from starlette.testclient import TestClient
+
+from app.api import app
+from app.models.comparison import Comparison, ComparisonProduct
+from app.scoring import score_matrix
+from app.summaries import refresh_summaries
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+OWNER = auth_headers("owner@example.com")
+
+# Comparison list and detail must load their whole graph in a fixed number of
+# statements: comparisons, comparison products, products, product metadata.
+MAX_GRAPH_QUERIES = 4
+
+
+def setUpModule():
+    """Create a temporary database with 10 comparisons of 4 products each."""
+    global tmp_dir
+    tmp_dir = create_test_database("comparisons")
+    with seeding() as session:
+        session.add(make_user("owner"))
+        session.add(make_product_type())
+        session.add_all(
+            make_product(
+                i, "battery_life", "screen_size", "warranty", user_id="owner", price=100.0 + i
+            )
+            for i in range(1, 41)
+        )
+        for comparison_id in range(1, 11):
+            session.add(
+                Comparison(
+                    id=comparison_id,
+                    user_id="owner",
+                    title=f"Comparison {comparison_id}",
+                    description="",
+                    date_created="2025-01-01",
+                    product_type_id=1,
+                    products=[
+                        ComparisonProduct(product_id=(comparison_id - 1) * 4 + offset)
+                        for offset in range(1, 5)
+                    ],
+                )
+            )
+        session.flush()
+        refresh_summaries(session)
+
+
+def tearDownModule():
+    """Remove the temporary database."""
+    remove_test_database(tmp_dir)
+
+
+class TestComparisonQueryCount(unittest.TestCase):
+    def test_get_comparisons_query_count(self):
+        """Listing comparisons costs the same number of queries for any page size."""
+        for limit in (1, 5, 10):
+            response = client.get(f"/api/comparisons/?limit={limit}")
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(limit, len(response.json()))
+            self.assertLessEqual(
+                int(response.headers["X-Query-Count"]), MAX_GRAPH_QUERIES
+            )
+
+        comparison = response.json()[-1]
+        self.assertEqual(4, len(comparison["products"]))
+        self.assertEqual(3, len(comparison["products"][0]["product"]["product_metadata"]))
+
+    def test_get_comparison_query_count(self):
+        """Retrieving one comparison loads its graph in a bounded number of queries."""
+        response = client.get("/api/comparisons/3")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(4, len(response.json()["products"]))
+        self.assertLessEqual(int(response.headers["X-Query-Count"]), MAX_GRAPH_QUERIES)
+
+
+class TestComparisonMatrix(unittest.TestCase):
+    def test_get_comparison_matrix(self):
+        """The matrix has one row per product and one column per attribute."""
+        response = client.get("/api/comparisons/2/matrix")
+        self.assertEqual(200, response.status_code)
+        matrix = response.json()
+        self.assertEqual([5, 6, 7, 8], matrix["product_ids"])
+        self.assertEqual(["battery_life", "screen_size", "warranty"], matrix["attributes"])
+        self.assertEqual([[1.0] * 3] * 4, matrix["scores"])
+        self.assertEqual([1, 2, 3, 4], [entry["rank"] for entry in matrix["ranking"]])
+        self.assertLessEqual(int(response.headers["X-Query-Count"]), 2)
+
+    def test_missing_comparison(self):
+        """Requesting the matrix of an unknown comparison returns 404."""
+        self.assertEqual(404, client.get("/api/comparisons/999/matrix").status_code)
+
+    def test_score_matrix(self):
+        """Scores are normalized per attribute; missing attributes count as 0."""
+        matrix = score_matrix(
+            [3, 1, 2],
+            [(1, "battery", 4.0), (3, "battery", 2.0), (2, "screen", 5.0), (1, "screen", 5.0)],
+        )
+        self.assertEqual([[0.0, None], [1.0, 1.0], [None, 1.0]], matrix["normalized"])
+        self.assertEqual({"battery": 1, "screen": 1}, matrix["winners"])
+        self.assertEqual(
+            [(1, 1.0), (2, 0.5), (3, 0.0)],
+            [(entry["product_id"], entry["score"]) for entry in matrix["ranking"]],
+        )
+
+
+class TestComparisonSummaries(unittest.TestCase):
+    def test_get_comparison_summaries(self):
+        """Summaries are listed with one query, without the product graph."""
+        response = client.get("/api/comparisons/summaries?limit=10")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, int(response.headers["X-Query-Count"]))
+        summary = response.json()[0]
+        self.assertEqual(4, summary["product_count"])
+        self.assertEqual((101.0, 104.0), (summary["min_price"], summary["max_price"]))
+        self.assertEqual(
+            {"battery_life", "screen_size", "warranty"}, set(summary["attribute_leaders"])
+        )
+
+    def test_product_update_refreshes_summary(self):
+        """Changing a product's score updates the summary of its comparisons."""
+        body = {"name": "Phone 38", "brand": "Brand", "score": 9.0, "product_metadata": []}
+        response = client.put("/api/products/38", json=body, headers=OWNER)
+        self.assertEqual(200, response.status_code)
+
+        summary = client.get("/api/comparisons/summaries?skip=9&limit=1").json()[0]
+        self.assertEqual(10, summary["id"])
+        self.assertEqual((38, 9.0), (summary["best_product_id"], summary["best_score"]))
+
+
+class TestComparisonCursorPagination(unittest.TestCase):
+    def test_cursor_walks_every_comparison_once(self):
+        """Following X-Next-Cursor visits each comparison exactly once, in order."""
+        seen = []
+        response = client.get("/api/comparisons/?limit=3")
+        while True:
+            self.assertEqual(200, response.status_code)
+            seen.extend(comparison["id"] for comparison in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = client.get(f"/api/comparisons/?limit=3&cursor={cursor}")
+        self.assertEqual(list(range(1, 11)), seen)
+
+    def test_invalid_cursor(self):
+        """A malformed cursor is rejected."""
+        response = client.get("/api/comparisons/?cursor=not-a-cursor")
+        self.assertEqual(400, response.status_code)
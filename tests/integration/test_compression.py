@@ -0,0 +1,135 @@
+import importlib.util
+import unittest
+from unittest import mock
+
+import anyio
+from starlette.testclient import TestClient
+
+from app.api import app
+from app.metrics import CACHE_HITS
+from app.middlewares import compression
+from app.middlewares.compression import negotiate
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+ADMIN = auth_headers("admin@example.com")
+OFFERED = ("zstd", "br", "gzip")
+
+
+def setUpModule():
+    """Create a temporary database with 30 products carrying metadata."""
+    global tmp_dir
+    tmp_dir = create_test_database("compression")
+    with seeding() as session:
+        session.add(make_user("admin", role="admin"))
+        session.add(make_product_type())
+        session.add_all(make_product(i, "battery_life") for i in range(1, 31))
+
+
+def tearDownModule():
+    remove_test_database(tmp_dir)
+
+
+class TestNegotiation(unittest.TestCase):
+    def test_weights_and_preference(self):
+        self.assertEqual("zstd", negotiate("gzip, br, zstd", OFFERED))
+        self.assertEqual("br", negotiate("gzip;q=0.5, br", OFFERED))
+        self.assertEqual("gzip", negotiate("gzip, deflate", OFFERED))
+        self.assertEqual("gzip", negotiate("*;q=0.1, zstd;q=0, br;q=0", OFFERED))
+        self.assertIsNone(negotiate("identity", OFFERED))
+        self.assertIsNone(negotiate("gzip;q=0", OFFERED))
+        self.assertIsNone(negotiate("", OFFERED))
+
+
+class TestCompression(unittest.TestCase):
+    PAGE = "/api/products/?limit=30"
+
+    def test_large_responses_are_compressed(self):
+        plain = client.get(self.PAGE, headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+
+        response = client.get(self.PAGE, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertLess(int(response.headers["content-length"]), len(plain.content))
+        self.assertEqual(plain.json(), response.json())
+        self.assertIn("X-Next-Cursor", response.headers)
+
+    @unittest.skipUnless(importlib.util.find_spec("brotli"), "brotli is not installed")
+    def test_brotli(self):
+        response = client.get(self.PAGE, headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual("br", response.headers["content-encoding"])
+        self.assertEqual(30, len(response.json()))
+
+    def test_small_responses_are_sent_as_is(self):
+        response = client.get("/api/products/1?fields=name", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+
+    def test_identical_bodies_are_compressed_once(self):
+        hits = CACHE_HITS.labels("compressed_responses")
+        client.get(self.PAGE, headers={"Accept-Encoding": "gzip"})
+        before = hits._value.get()
+        response = client.get(self.PAGE, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(before + 1, hits._value.get())
+        self.assertEqual(30, len(response.json()))
+
+    def test_streamed_responses(self):
+        response = client.get(
+            "/api/admin/export/products", headers={**ADMIN, "Accept-Encoding": "gzip"}
+        )
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertNotIn("content-length", response.headers)
+        self.assertEqual(30, len(response.text.splitlines()))
+
+    def test_responses_too_large_to_buffer_are_streamed(self):
+        """A body over ``CACHE_MAX_BODY`` is compressed as it arrives, not held whole."""
+        plain = client.get(self.PAGE, headers={"Accept-Encoding": "identity"})
+        with mock.patch.object(compression, "CACHE_MAX_BODY", len(plain.content) - 1):
+            response = client.get(self.PAGE, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertNotIn("content-length", response.headers)
+        self.assertEqual(plain.json(), response.json())
+
+    def test_pathsend_responses_are_passed_through(self):
+        """A file the server sends itself by path goes out as is, start message first."""
+        sent = []
+
+        async def file_app(scope, receive, send):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", b"image/svg+xml"), (b"content-length", b"4096")],
+                }
+            )
+            await send({"type": "http.response.pathsend", "path": "/tmp/image.svg"})
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "headers": [(b"accept-encoding", b"gzip")],
+            "extensions": {"http.response.pathsend": {}},
+        }
+        anyio.run(compression.CompressionMiddleware(file_app), scope, None, send)
+
+        self.assertEqual(
+            ["http.response.start", "http.response.pathsend"], [m["type"] for m in sent]
+        )
+        self.assertNotIn(b"content-encoding", dict(sent[0]["headers"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
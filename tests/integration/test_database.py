@@ -0,0 +1,75 @@
+import os
+import unittest
+from unittest import mock
+
+import anyio
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app import database
+from tests.integration import create_test_database, remove_test_database
+
+tmp_dir = None
+
+
+def setUpModule():
+    """Create a temporary database whose pool holds a single connection."""
+    global tmp_dir
+    with mock.patch.dict(os.environ, {"DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "0"}):
+        tmp_dir = create_test_database("database")
+
+
+def tearDownModule():
+    database.engine.dispose()
+    remove_test_database(tmp_dir)
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestConnectionProfile(unittest.TestCase):
+    def test_sqlite_pragmas_are_applied_on_connect(self):
+        with database.engine.connect() as connection:
+            pragmas = {
+                name: connection.execute(text(f"PRAGMA {name}")).scalar()
+                for name in ("journal_mode", "busy_timeout", "synchronous")
+            }
+        self.assertEqual(pragmas, {"journal_mode": "wal", "busy_timeout": 5000, "synchronous": 1})
+
+    def test_pool_gauges_and_wait_histogram(self):
+        waits = _sample("db_pool_wait_seconds_count", engine="sync")
+        with database.engine.connect():
+            self.assertEqual(_sample("db_pool_checked_out", engine="sync"), 1)
+        self.assertEqual(_sample("db_pool_checked_out", engine="sync"), 0)
+        self.assertEqual(_sample("db_pool_wait_seconds_count", engine="sync"), waits + 1)
+
+
+class TestSessionSlots(unittest.TestCase):
+    def test_sessions_wait_once_the_pool_is_saturated(self):
+        """A session beyond the pool's capacity waits for a slot instead of a thread."""
+        waits = _sample("db_session_wait_seconds_count")
+        events = []
+
+        async def session(name: str, hold: float):
+            slot = database._session_slot()
+            await slot.__anext__()
+            events.append(f"{name} in")
+            await anyio.sleep(hold)
+            events.append(f"{name} out")
+            await slot.aclose()
+
+        async def main():
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(session, "first", 0.1)
+                await anyio.sleep(0.01)
+                tasks.start_soon(session, "second", 0)
+
+        anyio.run(main)
+
+        self.assertEqual(events, ["first in", "first out", "second in", "second out"])
+        self.assertEqual(_sample("db_session_wait_seconds_count"), waits + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+
+from starlette.testclient import TestClient
+
+from app import entity_cache
+from app.api import app
+from app.cache import RedisCache, TTLCache
+from app.middlewares.query_count import QUERY_COUNT_HEADER
+from app.models.comparison import Comparison, ComparisonProduct
+from app.schemas.product import ProductDTO
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+OWNER = auth_headers("owner@example.com")
+
+
+class FakeRedis:
+    """In-memory stand-in for the few `redis.Redis` methods RedisCache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+    def eval(self, script, numkeys, generation_key, key, token, value, px):
+        """Runs RedisCache's compare-and-set script, the only one it sends."""
+        if (self.data.get(generation_key) or b"0").decode() == token:
+            self.data[key] = value
+
+    def scan_iter(self, match="*"):
+        return [key for key in self.data if key.startswith(match.rstrip("*"))]
+
+
+def setUpModule():
+    """Create a temporary database with one comparison of two products."""
+    global tmp_dir
+    tmp_dir = create_test_database("entity_cache")
+    with seeding() as session:
+        session.add(make_user("owner"))
+        session.add(make_product_type())
+        session.add_all(make_product(i, user_id="owner") for i in (1, 2))
+        session.add(
+            Comparison(
+                id=1, user_id="owner", title="Phones", description="", date_created="2024-01-01",
+                product_type_id=1,
+            )
+        )
+        session.add_all([ComparisonProduct(comparison_id=1, product_id=i) for i in (1, 2)])
+
+
+def tearDownModule():
+    entity_cache.reset()
+    remove_test_database(tmp_dir)
+
+
+class TestEntityCache(unittest.TestCase):
+    def setUp(self):
+        entity_cache.configure(TTLCache("entity", maxsize=100, ttl=300))
+
+    def test_repeated_reads_are_served_without_queries(self):
+        for path in ("/api/products/1", "/api/comparisons/1"):
+            first = client.get(path)
+            second = client.get(path)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.json(), first.json())
+            self.assertEqual(second.headers[QUERY_COUNT_HEADER], "0")
+
+    def test_update_invalidates_product_and_its_comparisons(self):
+        client.get("/api/products/2")
+        client.get("/api/comparisons/1")
+
+        body = {"name": "Renamed", "brand": "Brand", "score": 4.0, "product_metadata": []}
+        response = client.put("/api/products/2", json=body, headers=OWNER)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get("/api/products/2").json()["name"], "Renamed")
+        names = [p["product"]["name"] for p in client.get("/api/comparisons/1").json()["products"]]
+        self.assertIn("Renamed", names)
+
+    def test_comparison_update_invalidates_it(self):
+        client.get("/api/comparisons/1")
+        response = client.put("/api/comparisons/1", json={"title": "Updated"}, headers=OWNER)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get("/api/comparisons/1").json()["title"], "Updated")
+
+    def test_projections_are_not_cached(self):
+        client.get("/api/products/1")
+        response = client.get("/api/products/1?fields=id,name")
+        self.assertEqual(response.json(), {"id": 1, "name": "Phone 1"})
+
+    def test_out_of_process_backend(self):
+        fake = FakeRedis()
+        entity_cache.configure(RedisCache("entity", fake, ttl=300, prefix="test:"))
+
+        client.get("/api/products/1")
+        self.assertIn("test:product:1", fake.data)
+        self.assertEqual(client.get("/api/products/1").headers[QUERY_COUNT_HEADER], "0")
+
+        body = {"name": "Phone 1", "brand": "Other", "score": 4.0, "product_metadata": []}
+        client.put("/api/products/1", json=body, headers=OWNER)
+        self.assertNotIn("test:product:1", fake.data)
+        self.assertEqual(client.get("/api/products/1").json()["brand"], "Other")
+
+    def test_out_of_process_invalidation_blocks_stale_store(self):
+        """A response read before another worker's invalidation is not stored."""
+        fake = FakeRedis()
+        entity_cache.configure(RedisCache("entity", fake, ttl=300, prefix="test:"))
+        dto = ProductDTO(
+            id=2, name="Phone 2", brand="Brand", score=4.0, price=100.0, product_type_id=1,
+            product_metadata=[],
+        )
+        token = entity_cache.generation()
+        # Another worker process commits a change and invalidates through the server
+        RedisCache("entity", fake, ttl=300, prefix="test:").invalidate("product:2")
+
+        entity_cache.store(entity_cache.PRODUCT, 2, dto, token)
+        self.assertNotIn("test:product:2", fake.data)
+        entity_cache.store(entity_cache.PRODUCT, 2, dto, entity_cache.generation())
+        self.assertIn("test:product:2", fake.data)
+
+    def test_disabled_cache_always_reads_the_database(self):
+        entity_cache.configure(None)
+        client.get("/api/products/1")
+        self.assertNotEqual(client.get("/api/products/1").headers[QUERY_COUNT_HEADER], "0")
+
+    def test_lru_eviction(self):
+        cache = TTLCache("test", maxsize=2, ttl=300)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "c")
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
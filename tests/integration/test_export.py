@@ -0,0 +1,101 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+
+from starlette.testclient import TestClient
+
+from app import export
+from app.api import app
+from app.models.product import ProductMetadata
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+ADMIN = auth_headers("admin@example.com")
+USER = auth_headers("user@example.com")
+
+
+def setUpModule():
+    """Create a temporary database with 30 products over two types."""
+    global tmp_dir
+    tmp_dir = create_test_database("export")
+    with seeding() as session:
+        session.add_all([make_user("admin", role="admin"), make_user("user")])
+        session.add_all([make_product_type(), make_product_type(2, "Shirts")])
+        for product_id in range(1, 31):
+            session.add(
+                make_product(
+                    product_id,
+                    product_type_id=1 if product_id <= 20 else 2,
+                    name=f"Product {product_id}",
+                    price=10.0 * product_id,
+                    product_metadata=[
+                        ProductMetadata(attribute=attribute, value=str(product_id), score=1.0)
+                        for attribute in ("warranty", "battery_life")
+                    ]
+                    if product_id != 30
+                    else [],
+                )
+            )
+
+
+def tearDownModule():
+    remove_test_database(tmp_dir)
+
+
+class TestExport(unittest.TestCase):
+    def test_ndjson(self):
+        """Each line is one product with its metadata nested."""
+        response = client.get("/api/admin/export/products", headers=ADMIN)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-ndjson", response.headers["content-type"])
+        products = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(list(range(1, 31)), [product["id"] for product in products])
+        self.assertEqual(
+            ["warranty", "battery_life"],
+            [meta["attribute"] for meta in products[0]["product_metadata"]],
+        )
+        self.assertEqual([], products[-1]["product_metadata"])
+
+    def test_csv_gzip_and_filter(self):
+        """CSV has one row per metadata entry, and the file can be gzipped."""
+        response = client.get(
+            "/api/admin/export/products?format=csv&gzip=true&product_type_id=2", headers=ADMIN
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertIn('filename="products.csv.gz"', response.headers["content-disposition"])
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+        # Products 21 to 29 have two metadata rows each, product 30 a bare row
+        self.assertEqual(19, len(rows))
+        self.assertEqual({str(i) for i in range(21, 31)}, {row["id"] for row in rows})
+        self.assertEqual("", rows[-1]["attribute"])
+
+    def test_chunks_are_bounded(self):
+        """The export is produced in chunks instead of being built whole."""
+        chunk_size = export.CHUNK_SIZE
+        export.CHUNK_SIZE = 256
+        try:
+            chunks = list(export.export_products())
+        finally:
+            export.CHUNK_SIZE = chunk_size
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk) < 1024 for chunk in chunks))
+
+    def test_admin_only(self):
+        """Regular users may not export the catalog."""
+        response = client.get("/api/admin/export/products", headers=USER)
+        self.assertEqual(403, response.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from sqlalchemy import inspect
+
+import app.api  # noqa: F401  Registers every model on Base.metadata
+from app import database, migrations
+from app.database import SCHEMA_KEY, init_db
+
+tmp_dir = None
+
+MIGRATED_COLUMNS = {
+    "products": ("image_hash", "image_content_type"),
+    "product_metadata": ("value_num", "value_text"),
+}
+MIGRATED_INDEXES = (
+    "ix_products_product_type_id",
+    "ix_products_user_id",
+    "ix_comparisons_user_id",
+    "ix_comparison_products_comparison_id",
+    "ix_comparison_products_product_id",
+    "ix_product_metadata_attribute_num",
+    "ix_product_metadata_attribute_text",
+    "ix_product_metadata_product_attribute",
+)
+
+
+def setUpModule():
+    global tmp_dir
+    tmp_dir = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _schema() -> tuple:
+    """The columns and index names of the migrated tables."""
+    inspector = inspect(database.engine)
+    columns = {
+        table: {column["name"] for column in inspector.get_columns(table)}
+        for table in MIGRATED_COLUMNS
+    }
+    indexes = {
+        index["name"]
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+    return columns, indexes
+
+
+class TestMigrations(unittest.TestCase):
+    def _new_database(self, name: str) -> str:
+        path = os.path.join(tmp_dir, name)
+        init_db(f"sqlite:///{path}")
+        return path
+
+    def test_new_database_starts_at_latest_version(self):
+        self._new_database("new.db")
+        self.assertEqual(
+            database.bookkeeping[migrations.MIGRATION_KEY], str(migrations.LATEST_VERSION)
+        )
+
+    def test_upgrade_from_before_the_migrations(self):
+        """A database predating the migrations gets their columns and indexes."""
+        path = self._new_database("old.db")
+        database.engine.dispose()
+        connection = sqlite3.connect(path)
+        for index in MIGRATED_INDEXES:
+            connection.execute(f"DROP INDEX {index}")
+        for table, columns in MIGRATED_COLUMNS.items():
+            for column in columns:
+                connection.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        connection.execute("DELETE FROM bookkeeping")
+        connection.commit()
+        connection.close()
+
+        init_db(f"sqlite:///{path}")
+
+        columns, indexes = _schema()
+        for table, names in MIGRATED_COLUMNS.items():
+            self.assertTrue(set(names) <= columns[table], table)
+        self.assertTrue(set(MIGRATED_INDEXES) <= indexes)
+        self.assertEqual(
+            database.bookkeeping[migrations.MIGRATION_KEY], str(migrations.LATEST_VERSION)
+        )
+
+    def test_schema_changes_only_through_migrations(self):
+        """An index brought by no pending migration is reported, not created."""
+        path = self._new_database("current.db")
+        database.engine.dispose()
+        connection = sqlite3.connect(path)
+        connection.execute("DROP INDEX ix_products_user_id")
+        connection.execute("DELETE FROM bookkeeping WHERE key = ?", (SCHEMA_KEY,))
+        connection.commit()
+        connection.close()
+
+        with self.assertLogs("app.database", "WARNING") as logs:
+            init_db(f"sqlite:///{path}")
+
+        self.assertNotIn("ix_products_user_id", _schema()[1])
+        self.assertIn("ix_products_user_id", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import base64
+import importlib.util
+import io
+import os
+import unittest
+from unittest import mock
+
+from starlette.testclient import TestClient
+
+from app import database, thumbnails
+from app.api import app
+from app.blobstore import get_blob_store
+from app.images import backfill_thumbnails, migrate_inline_images, set_product_image
+from app.models.product import THUMBNAIL_SIZES, Product
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+ADMIN = auth_headers("admin@example.com")
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+CORRUPT_PNG = PNG[:16] + b"\0" * 16
+HTML = b"<script>alert(document.cookie)</script>"
+PNG_DATA_URI = "data:image/png;base64," + base64.b64encode(PNG).decode()
+
+
+def setUpModule():
+    """Create a temporary database and blob store with five products."""
+    global tmp_dir
+    tmp_dir = create_test_database("images", blobs=True)
+    with seeding() as session:
+        session.add(make_user("admin", role="admin"))
+        session.add(make_product_type())
+        for product_id in (1, 2):
+            product = make_product(product_id)
+            set_product_image(product, PNG_DATA_URI)
+            session.add(product)
+        # An image Pillow cannot decode
+        product = make_product(4, name="Corrupt")
+        set_product_image(product, base64.b64encode(CORRUPT_PNG).decode())
+        session.add(product)
+        # Rows written before images moved to the blob store, and before they were checked
+        session.add(make_product(3, name="Legacy", image_base64=PNG_DATA_URI))
+        session.add(
+            make_product(
+                5,
+                name="Legacy HTML",
+                image_base64="data:text/html;base64," + base64.b64encode(HTML).decode(),
+            )
+        )
+
+
+def tearDownModule():
+    """Remove the temporary database and blob store."""
+    remove_test_database(tmp_dir)
+
+
+class TestProductImages(unittest.TestCase):
+    def test_identical_images_are_stored_once(self):
+        """Products sharing an image reference the same blob."""
+        first = client.get("/api/products/1").json()
+        second = client.get("/api/products/2").json()
+        self.assertEqual(first["image_hash"], second["image_hash"])
+        self.assertNotIn("image_base64", first)
+        self.assertTrue(get_blob_store().exists(first["image_hash"]))
+
+    def test_get_image(self):
+        """The image is served raw with a cacheable, content-derived ETag."""
+        image_url = client.get("/api/products/1").json()["image_url"]
+        response = client.get(image_url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(PNG, response.content)
+        self.assertEqual("image/png", response.headers["content-type"])
+        self.assertEqual("nosniff", response.headers["x-content-type-options"])
+        self.assertEqual("sandbox", response.headers["content-security-policy"])
+        self.assertIn("immutable", response.headers["cache-control"])
+
+        response = client.get(image_url, headers={"If-None-Match": response.headers["etag"]})
+        self.assertEqual(304, response.status_code)
+
+    def test_get_image_range(self):
+        """Byte ranges of the image can be requested."""
+        response = client.get("/api/products/1/image", headers={"Range": "bytes=0-7"})
+        self.assertEqual(206, response.status_code)
+        self.assertEqual(PNG[:8], response.content)
+
+    def test_migrate_inline_images(self):
+        """Inline images are served before migration and moved to the blob store by it."""
+        response = client.get("/api/products/3/image")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(PNG, response.content)
+
+        session = database.SessionLocal()
+        self.assertEqual(1, migrate_inline_images(session))
+        product = session.get(Product, 3)
+        self.assertIsNone(product.image_base64)
+        self.assertEqual(session.get(Product, 1).image_hash, product.image_hash)
+        session.close()
+
+    def test_only_raster_images_are_accepted(self):
+        """The declared type is ignored: an HTML payload is refused, not served as HTML."""
+        payload = {
+            "name": "Page",
+            "brand": "Y",
+            "price": 2.0,
+            "score": 2.0,
+            "product_type_id": 1,
+            "image_base64": "data:text/html;base64," + base64.b64encode(HTML).decode(),
+            "product_metadata": [],
+        }
+        response = client.post("/api/products/", json=payload, headers=ADMIN)
+        self.assertEqual(422, response.status_code)
+
+        payload["image_base64"] = "data:text/html;base64," + base64.b64encode(PNG).decode()
+        with mock.patch.object(thumbnails, "schedule_thumbnails"):
+            created = client.post("/api/products/", json=payload, headers=ADMIN).json()
+        response = client.get(created["image_url"])
+        self.assertEqual("image/png", response.headers["content-type"])
+
+    def test_legacy_inline_images_are_not_trusted(self):
+        """An inline payload stored unchecked is served inert, whatever it declares."""
+        response = client.get("/api/products/5/image")
+        self.assertEqual(HTML, response.content)
+        self.assertEqual("application/octet-stream", response.headers["content-type"])
+        self.assertEqual("nosniff", response.headers["x-content-type-options"])
+        self.assertEqual("sandbox", response.headers["content-security-policy"])
+
+
+@unittest.skipUnless(importlib.util.find_spec("PIL"), "Pillow is not installed")
+class TestThumbnails(unittest.TestCase):
+    def test_generated_when_product_is_created(self):
+        """A new product's thumbnails are generated and referenced by its thumbnail URL."""
+        from PIL import Image
+
+        source = io.BytesIO()
+        Image.new("RGB", (200, 120), "red").save(source, "PNG")
+        payload = {
+            "name": "Tablet",
+            "brand": "Y",
+            "price": 2.0,
+            "score": 2.0,
+            "product_type_id": 1,
+            "image_base64": base64.b64encode(source.getvalue()).decode(),
+            "product_metadata": [],
+        }
+        with mock.patch.dict(os.environ, {"THUMBNAIL_WORKERS": "0"}):  # Generate inline
+            created = client.post("/api/products/", json=payload, headers=ADMIN).json()
+
+        response = client.get(created["thumbnail_url"])
+        self.assertEqual("image/webp", response.headers["content-type"])
+        self.assertIn("immutable", response.headers["cache-control"])
+        self.assertEqual((64, 38), Image.open(io.BytesIO(response.content)).size)
+        medium = client.get(f"/api/products/{created['id']}/image?size=medium")
+        self.assertEqual((160, 96), Image.open(io.BytesIO(medium.content)).size)
+
+    def test_fallback_and_backfill(self):
+        """Until generated, a thumbnail URL serves the full image; the backfill fills in."""
+        thumbnail_url = client.get("/api/products/1").json()["thumbnail_url"]
+        with mock.patch.object(thumbnails, "schedule_thumbnails") as schedule:
+            response = client.get(thumbnail_url)
+        self.assertEqual(PNG, response.content)
+        self.assertEqual("no-cache", response.headers["cache-control"])
+        schedule.assert_called_once()
+
+        session = database.SessionLocal()
+        self.assertGreaterEqual(backfill_thumbnails(session), len(THUMBNAIL_SIZES))
+        self.assertEqual(0, backfill_thumbnails(session))
+        session.close()
+        self.assertEqual("image/webp", client.get(thumbnail_url).headers["content-type"])
+
+    def test_undecodable_image_is_not_retried(self):
+        """An image without thumbnails is served in full and not rescheduled forever."""
+        thumbnail_url = client.get("/api/products/4").json()["thumbnail_url"]
+        with mock.patch.dict(os.environ, {"THUMBNAIL_WORKERS": "0"}):  # Fails inline
+            self.assertEqual(CORRUPT_PNG, client.get(thumbnail_url).content)
+        with mock.patch.object(thumbnails, "schedule_thumbnails") as schedule:
+            response = client.get(thumbnail_url)
+        self.assertEqual(CORRUPT_PNG, response.content)
+        self.assertEqual("image/png", response.headers["content-type"])
+        schedule.assert_not_called()
+
+    def test_unknown_size(self):
+        self.assertEqual(400, client.get("/api/products/1/image?size=huge").status_code)
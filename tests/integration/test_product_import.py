@@ -0,0 +1,165 @@
+import time
+import unittest
+from unittest import mock
+
+from starlette.testclient import TestClient
+
+from app import database
+from app.api import app
+from app.catalog import refresh_catalog
+from app.models.product import Product
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+ADMIN = auth_headers("admin@example.com")
+USER = auth_headers("user@example.com")
+SCHEMA = {"battery_life": "integer", "screen_size": "float", "color": "string"}
+# Like the seeded Electronics type, a schema with an attribute named after a column
+LAPTOP_SCHEMA = {"brand": "integer", "weight": "float"}
+
+
+def setUpModule():
+    """Create a temporary database with two product types."""
+    global tmp_dir
+    tmp_dir = create_test_database("import")
+    with seeding() as session:
+        session.add_all([make_user("admin", role="admin"), make_user("user")])
+        session.add(make_product_type(metadata_schema=SCHEMA))
+        session.add(make_product_type(2, "Laptops", LAPTOP_SCHEMA))
+    refresh_catalog()
+
+
+def tearDownModule():
+    remove_test_database(tmp_dir)
+
+
+class TestProductImport(unittest.TestCase):
+    def _import(self, body: str, **params) -> dict:
+        """Start an import and wait for it to finish."""
+        params = {"product_type_id": 1, **params}
+        response = client.post(
+            "/api/admin/imports/products", params=params, content=body.encode(), headers=ADMIN
+        )
+        self.assertEqual(response.status_code, 202, response.text)
+        job_id = response.json()["id"]
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            job = client.get(f"/api/admin/imports/{job_id}", headers=ADMIN).json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Import {job_id} did not finish")
+
+    def test_import_in_batches_and_report_rejected_rows(self):
+        rows = [
+            f"Phone {i},Brand,{100 + i},4.5,{i % 24}.0,6.1,Black,2"
+            for i in range(25)
+        ]
+        rows.insert(3, "Broken,Brand,cheap,4.5,ten,6.1,Red,")
+        rows.insert(10, ",Brand,100,4.5,,,,")
+        body = "\n".join(
+            ["name,brand,price,score,battery_life,screen_size,color,color_score", *rows]
+        )
+
+        job = self._import(body, batch_size=10)
+
+        self.assertEqual(job["status"], "completed", job)
+        self.assertEqual(job["total_rows"], 27)
+        self.assertEqual(
+            (job["processed_rows"], job["imported_rows"], job["failed_rows"]), (27, 25, 2)
+        )
+        self.assertEqual(job["progress"], 1.0)
+        self.assertGreater(job["rows_per_second"], 0)
+        self.assertEqual(
+            job["errors"],
+            [
+                {
+                    "row": 5,
+                    "errors": ["price must be a number", "battery_life must be of type integer"],
+                },
+                {"row": 12, "errors": ["name is required"]},
+            ],
+        )
+
+        session = database.SessionLocal()
+        try:
+            product = session.query(Product).filter(Product.name == "Phone 7").one()
+            self.assertEqual((product.user_id, product.price), ("admin", 107.0))
+            metadata = {meta.attribute: (meta.value, meta.score) for meta in product.product_metadata}
+            self.assertEqual(
+                metadata,
+                {"battery_life": ("7", 0.0), "screen_size": ("6.1", 0.0), "color": ("Black", 2.0)},
+            )
+            self.assertEqual(product.product_metadata[0].value_num, 7.0)
+        finally:
+            session.close()
+
+    def test_import_without_insert_returning(self):
+        """Dialects without executemany RETURNING, such as MySQL, insert row by row."""
+        dialect = database.engine.dialect
+        body = "name,brand,price,score,battery_life\n" + "\n".join(
+            f"Watch {i},Brand,{50 + i},4,{i}" for i in range(5)
+        )
+        with mock.patch.object(
+            dialect, "insert_executemany_returning_sort_by_parameter_order", False
+        ):
+            job = self._import(body, batch_size=2)
+
+        self.assertEqual((job["status"], job["imported_rows"]), ("completed", 5), job)
+        session = database.SessionLocal()
+        try:
+            products = session.query(Product).filter(Product.name.like("Watch %")).all()
+            self.assertEqual(
+                {p.name: p.product_metadata[0].value for p in products},
+                {f"Watch {i}": str(i) for i in range(5)},
+            )
+        finally:
+            session.close()
+
+    def test_schema_attribute_named_after_a_column(self):
+        """``brand`` is read as the product column only, not also as metadata."""
+        body = "name,brand,price,score,weight\nLaptop,Acme,900,4,1.5"
+        job = self._import(body, product_type_id=2)
+
+        self.assertEqual((job["status"], job["imported_rows"]), ("completed", 1), job)
+        session = database.SessionLocal()
+        try:
+            product = session.query(Product).filter(Product.name == "Laptop").one()
+            self.assertEqual(product.brand, "Acme")
+            self.assertEqual([meta.attribute for meta in product.product_metadata], ["weight"])
+        finally:
+            session.close()
+
+        body = "name,brand,price,score,brand_score\nLaptop,Acme,900,4,1"
+        job = self._import(body, product_type_id=2)
+        self.assertEqual(job["error"], "Columns not in the metadata schema: brand_score.")
+
+    def test_unknown_columns_fail_the_job(self):
+        job = self._import("name,brand,price,score,ram\nLaptop,Brand,900,4,16")
+
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Columns not in the metadata schema: ram.")
+        self.assertEqual(job["imported_rows"], 0)
+
+    def test_rejected_requests(self):
+        path = "/api/admin/imports/products"
+        body = b"name,brand,price,score\nPhone,Brand,100,4"
+        response = client.post(path, params={"product_type_id": 1}, content=body, headers=USER)
+        self.assertEqual(response.status_code, 403)
+        response = client.post(path, params={"product_type_id": 9}, content=body, headers=ADMIN)
+        self.assertEqual(response.status_code, 400)
+        response = client.post(path, params={"product_type_id": 1}, content=b"", headers=ADMIN)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(client.get("/api/admin/imports/unknown", headers=ADMIN).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from starlette.testclient import TestClient
+
+from app import catalog, database
+from app.api import app
+from app.catalog import get_schema, refresh_catalog
+from app.middlewares.query_count import QUERY_COUNT_HEADER
+from app.models.product import ProductType
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+ADMIN = auth_headers("admin@example.com")
+
+
+def setUpModule():
+    """Create a temporary database with an administrator and one product type."""
+    global tmp_dir
+    tmp_dir = create_test_database("product_types")
+    with seeding() as session:
+        session.add(make_user("admin", role="admin"))
+        session.add(make_product_type(metadata_schema={"battery": "integer"}))
+
+
+def tearDownModule():
+    remove_test_database(tmp_dir)
+
+
+class TestProductTypeCatalog(unittest.TestCase):
+    def test_list_is_served_from_memory_with_etag(self):
+        client.get("/api/product-types/")  # Builds the snapshot if needed
+        response = client.get("/api/product-types/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers[QUERY_COUNT_HEADER], "0")
+        self.assertEqual(response.json()[0]["metadata_schema"], {"battery": "integer"})
+
+        revalidated = client.get(
+            "/api/product-types/", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b"")
+
+    def test_admin_changes_swap_the_snapshot(self):
+        etag = client.get("/api/product-types/").headers["ETag"]
+
+        created = client.post(
+            "/api/admin/product-types",
+            json={"name": "Laptops", "description": "", "metadata_schema": {"ram": "integer"}},
+            headers=ADMIN,
+        ).json()
+        response = client.get("/api/product-types/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Laptops", [product_type["name"] for product_type in response.json()])
+        self.assertEqual(get_schema(created["id"]), {"ram": "integer"})
+
+        client.delete(f"/api/admin/product-types/{created['id']}", headers=ADMIN)
+        response = client.get("/api/product-types/")
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertIsNone(get_schema(created["id"]))
+
+    def test_rebuild_read_before_a_change_does_not_win(self):
+        """A rebuild that read the types before a deletion cannot swap in after it."""
+        with seeding() as session:
+            session.add(make_product_type(50, "Tablets"))
+        refresh_catalog()
+        session = database.SessionLocal()
+
+        read, release = threading.Event(), threading.Event()
+        validate = catalog.ProductTypeDTO.model_validate
+
+        def slow_validate(row):
+            if threading.current_thread() is stale:
+                read.set()
+                release.wait(5)
+            return validate(row)
+
+        with mock.patch.object(catalog.ProductTypeDTO, "model_validate", slow_validate):
+            stale = threading.Thread(target=refresh_catalog)  # e.g. a TTL rebuild
+            stale.start()
+            read.wait(5)
+            session.delete(session.get(ProductType, 50))
+            session.commit()
+            fresh = threading.Thread(target=refresh_catalog)  # The admin route's
+            fresh.start()
+            time.sleep(0.1)
+            release.set()
+            stale.join()
+            fresh.join()
+        session.close()
+
+        self.assertIsNone(get_schema(50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import unittest
+
+from sqlalchemy import event
+from starlette.testclient import TestClient
+
+from app import database
+from app.api import app
+from app.catalog import refresh_catalog
+from app.models.product import ProductMetadata
+from tests.integration import (
+    auth_headers,
+    create_test_database,
+    make_product,
+    make_product_type,
+    make_user,
+    remove_test_database,
+    seeding,
+)
+
+client = TestClient(app)
+tmp_dir = None
+statements = []
+
+
+def _capture_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def setUpModule():
+    """Create a temporary database with 20 products carrying metadata."""
+    global tmp_dir
+    tmp_dir = create_test_database("products")
+    event.listen(database.engine, "before_cursor_execute", _capture_statement)
+    with seeding() as session:
+        session.add(make_product_type())
+        session.add_all(
+            make_product(i, "battery_life", price=100.0 + i, image_hash="0" * 64)
+            for i in range(1, 21)
+        )
+
+
+def tearDownModule():
+    """Remove the temporary database."""
+    event.remove(database.engine, "before_cursor_execute", _capture_statement)
+    remove_test_database(tmp_dir)
+
+
+class TestProductFields(unittest.TestCase):
+    def setUp(self):
+        statements.clear()
+
+    def test_summary_projection(self):
+        """The summary projection selects only its columns and skips metadata."""
+        response = client.get("/api/products/?fields=summary&limit=5")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {"id", "name", "price", "score", "thumbnail_url"}, set(response.json()[0])
+        )
+        self.assertEqual("1", response.headers["X-Query-Count"])
+        self.assertIn("X-Next-Cursor", response.headers)
+        for column in ("brand", "image_content_type", "image_base64", "product_metadata"):
+            self.assertNotIn(column, statements[0])
+
+    def test_field_list_with_metadata(self):
+        """Requesting product_metadata loads it with a single extra query."""
+        response = client.get("/api/products/?fields=name,product_metadata&limit=5")
+        self.assertEqual(200, response.status_code)
+        product = response.json()[0]
+        self.assertEqual({"id", "name", "product_metadata"}, set(product))
+        self.assertEqual("battery_life", product["product_metadata"][0]["attribute"])
+        self.assertEqual("2", response.headers["X-Query-Count"])
+
+    def test_single_product_fields(self):
+        """Fields can be selected when retrieving a single product."""
+        response = client.get("/api/products/3?fields=image_url")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({"id", "image_url"}, set(response.json()))
+
+    def test_full_by_default(self):
+        """Without fields, products carry every ProductDTO field."""
+        response = client.get("/api/products/?limit=5")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("product_metadata", response.json()[0])
+        self.assertIn("brand", response.json()[0])
+        self.assertEqual("2", response.headers["X-Query-Count"])
+        self.assertIn("X-Next-Cursor", response.headers)
+
+    def test_unknown_field(self):
+        """Unknown field names are rejected."""
+        response = client.get("/api/products/?fields=name,password")
+        self.assertEqual(400, response.status_code)
+
+
+class TestProductBatch(unittest.TestCase):
+    def test_request_order_and_missing_ids(self):
+        """Products come back in request order, with nulls for unknown IDs."""
+        response = client.post("/api/products/batch", json={"ids": [5, 999, 3, 5]})
+        self.assertEqual(200, response.status_code)
+        products = response.json()["products"]
+        self.assertEqual([5, None, 3, 5], [p and p["id"] for p in products])
+        self.assertEqual("battery_life", products[0]["product_metadata"][0]["attribute"])
+        self.assertEqual([999], response.json()["missing"])
+        self.assertEqual("2", response.headers["X-Query-Count"])
+
+    def test_limit(self):
+        """Batches are capped at PRODUCT_BATCH_LIMIT IDs."""
+        response = client.post("/api/products/batch", json={"ids": list(range(1, 102))})
+        self.assertEqual(400, response.status_code)
+        response = client.post("/api/products/batch", json={"ids": []})
+        self.assertEqual({"products": [], "missing": []}, response.json())
+
+
+class TestProductSearch(unittest.TestCase):
+    def test_search_ranks_and_paginates(self):
+        """Matches are relevance-ranked and paged with skip and limit."""
+        response = client.get("/api/products/search?q=phone 7")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([7], [product["id"] for product in response.json()])
+
+        first = client.get("/api/products/search?q=phone&limit=5").json()
+        second = client.get("/api/products/search?q=phone&limit=5&skip=5").json()
+        ids = [product["id"] for product in first + second]
+        self.assertEqual(10, len(set(ids)))
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Index query operators in the input are treated as plain words."""
+        response = client.get('/api/products/search?q="phone" OR (NEAR*')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], response.json())
+
+    def test_index_follows_writes(self):
+        """Created, updated and deleted products are re-indexed in their transaction."""
+        client.get("/api/products/search?q=phone")  # Builds the index
+        with seeding() as session:
+            session.add(make_user("searcher"))
+        headers = auth_headers("searcher@example.com")
+
+        product = {
+            "name": "Walkman", "brand": "Sony", "score": 4.0, "price": 50.0,
+            "product_type_id": 1,
+            "product_metadata": [{"attribute": "color", "value": "Turquoise", "score": 1.0}],
+        }
+        product_id = client.post("/api/products/", json=product, headers=headers).json()["id"]
+        found = client.get("/api/products/search?q=turquoise").json()
+        self.assertEqual([product_id], [product["id"] for product in found])
+
+        update = {"name": "Discman", "brand": "Sony", "score": 4.0, "product_metadata": []}
+        client.put(f"/api/products/{product_id}", json=update, headers=headers)
+        self.assertEqual([], client.get("/api/products/search?q=walkman").json())
+        self.assertEqual(1, len(client.get("/api/products/search?q=discman").json()))
+
+        client.delete(f"/api/products/{product_id}", headers=headers)
+        self.assertEqual([], client.get("/api/products/search?q=sony").json())
+
+
+class TestAttributeFilters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Add tablets with typed metadata to filter on."""
+        schema = {"battery_life": "integer", "screen_size": "float", "color": "string"}
+        with seeding() as session:
+            session.add(make_product_type(2, "Tablets", schema))
+            for product_id, battery_life, screen_size, color in (
+                (101, "8", "6.1", "Black"),
+                (102, "10", "6.7", "White"),
+                (103, "12", "6.4", "black"),
+                (104, "15", "7.9", "Blue"),
+            ):
+                values = {"battery_life": battery_life, "screen_size": screen_size, "color": color}
+                session.add(
+                    make_product(
+                        product_id,
+                        product_type_id=2,
+                        name=f"Tablet {product_id}",
+                        price=300.0,
+                        product_metadata=[
+                            ProductMetadata(attribute=attribute, value=value, score=1.0)
+                            for attribute, value in values.items()
+                        ],
+                    )
+                )
+        refresh_catalog()
+
+    def _ids(self, *filters) -> list:
+        params = "".join(f"&filter={f}" for f in filters)
+        response = client.get(f"/api/products/?product_type_id=2{params}")
+        self.assertEqual(200, response.status_code, response.text)
+        return [product["id"] for product in response.json()]
+
+    def test_numeric_range(self):
+        """Numeric attributes compare as numbers, not strings."""
+        self.assertEqual([102, 103, 104], self._ids("battery_life>=10"))
+        self.assertEqual([102, 103], self._ids("battery_life>=10", "screen_size<7"))
+
+    def test_text_equality(self):
+        """Text attributes compare case-insensitively."""
+        self.assertEqual([101, 103], self._ids("color=BLACK"))
+        self.assertEqual([102, 104], self._ids("color!=black"))
+
+    def test_invalid_filters(self):
+        """Filters that do not fit the schema are rejected."""
+        for query in (
+            "filter=battery_life>=10",  # No product type
+            "product_type_id=2&filter=weight>1",
+            "product_type_id=2&filter=battery_life>=long",
+            "product_type_id=2&filter=color>b",
+            "product_type_id=2&filter=nonsense",
+        ):
+            self.assertEqual(400, client.get(f"/api/products/?{query}").status_code, query)
@@ -0,0 +1,164 @@
+import re
+import unittest
+
+from sqlalchemy import event, insert
+from starlette.testclient import TestClient
+
+from app import database, entity_cache
+from app.api import app
+from app.catalog import refresh_catalog
+from app.models.comparison import Comparison, ComparisonProduct
+from app.models.product import Product, ProductMetadata, ProductType, project_value
+from app.models.user import User
+from app.summaries import refresh_summaries
+from tests.integration import auth_headers, create_test_database, remove_test_database, seeding
+
+client = TestClient(app)
+tmp_dir = None
+statements = []
+
+PRODUCT_TYPES = 5
+PRODUCTS = 5000
+COMPARISONS = 1000
+ATTRIBUTES = {"battery_life": "integer", "screen_size": "float", "color": "string"}
+ADMIN = auth_headers("admin@example.com")
+
+# Tables a route may scan: pages read in primary key order stop after `limit` rows
+PAGED_SCANS = {"products", "comparisons"}
+SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def _capture_statement(conn, cursor, statement, parameters, context, executemany):
+    if not executemany:
+        statements.append((statement, parameters))
+
+
+def _seed(session):
+    """Insert the users, product types, products and comparisons in bulk."""
+    session.execute(
+        insert(User),
+        [{"user_id": "admin", "email": "admin@example.com", "password": "x", "role": "admin"}]
+        + [{"user_id": f"user{i}", "email": f"user{i}@example.com", "password": "x"} for i in range(100)],
+    )
+    session.execute(
+        insert(ProductType),
+        [
+            {"id": i, "name": f"Type {i}", "description": "", "metadata_schema": ATTRIBUTES}
+            for i in range(1, PRODUCT_TYPES + 1)
+        ],
+    )
+    session.execute(
+        insert(Product),
+        [
+            {
+                "id": i, "product_type_id": i % PRODUCT_TYPES + 1, "user_id": f"user{i % 100}",
+                "name": f"Product {i}", "brand": "Brand", "price": float(i % 500), "score": i % 5,
+            }
+            for i in range(1, PRODUCTS + 1)
+        ],
+    )
+    metadata = []
+    for i in range(1, PRODUCTS + 1):
+        for attribute, value in (
+            ("battery_life", str(i % 24)), ("screen_size", str(5 + i % 30 / 10)), ("color", "Black"),
+        ):
+            value_num, value_text = project_value(value)
+            metadata.append(
+                {
+                    "product_id": i, "attribute": attribute, "value": value, "score": 1.0,
+                    "value_num": value_num, "value_text": value_text,
+                }
+            )
+    session.execute(insert(ProductMetadata), metadata)
+    session.execute(
+        insert(Comparison),
+        [
+            {
+                "id": i, "user_id": f"user{i % 100}", "title": f"Comparison {i}",
+                "description": "", "date_created": "2025-01-01", "product_type_id": 1,
+            }
+            for i in range(1, COMPARISONS + 1)
+        ],
+    )
+    session.execute(
+        insert(ComparisonProduct),
+        [
+            {"comparison_id": i, "product_id": (i * 4 + offset) % PRODUCTS + 1}
+            for i in range(1, COMPARISONS + 1)
+            for offset in range(4)
+        ],
+    )
+    refresh_summaries(session)
+
+
+def setUpModule():
+    """Create a temporary database with thousands of products and comparisons."""
+    global tmp_dir
+    tmp_dir = create_test_database("query_plans")
+    with seeding() as session:
+        _seed(session)
+    refresh_catalog()
+
+    entity_cache.configure(None)  # Every request must reach the database
+    event.listen(database.engine, "before_cursor_execute", _capture_statement)
+
+
+def tearDownModule():
+    event.remove(database.engine, "before_cursor_execute", _capture_statement)
+    entity_cache.reset()
+    remove_test_database(tmp_dir)
+
+
+class TestQueryPlans(unittest.TestCase):
+    def _scanned_tables(self, method: str, path: str, **kwargs) -> set:
+        """Run a request and return the tables its statements read in full."""
+        statements.clear()
+        response = client.request(method, path, **kwargs)
+        self.assertLess(response.status_code, 500, response.text)
+
+        scanned = set()
+        connection = database.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            for statement, parameters in statements:
+                if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                    continue
+                for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                    match = SCAN.match(row[-1])
+                    if match:
+                        scanned.add(match.group(1))
+        finally:
+            connection.close()
+        return scanned
+
+    def assertNoFullScan(self, method: str, path: str, allowed=frozenset(), **kwargs):
+        scanned = self._scanned_tables(method, path, **kwargs)
+        self.assertFalse(scanned - set(allowed), f"{method} {path} scans {scanned - set(allowed)}")
+
+    def test_product_reads(self):
+        self.assertNoFullScan("GET", "/api/products/?limit=20", PAGED_SCANS)
+        self.assertNoFullScan("GET", "/api/products/?product_type_id=3&limit=20")
+        self.assertNoFullScan(
+            "GET", "/api/products/?product_type_id=3&filter=battery_life>=20&filter=color=black"
+        )
+        self.assertNoFullScan("GET", "/api/products/42")
+        self.assertNoFullScan("GET", "/api/products/42?fields=summary")
+
+    def test_comparison_reads(self):
+        self.assertNoFullScan("GET", "/api/comparisons/?limit=20", PAGED_SCANS)
+        self.assertNoFullScan("GET", "/api/comparisons/summaries?limit=20", PAGED_SCANS)
+        self.assertNoFullScan("GET", "/api/comparisons/7")
+        self.assertNoFullScan("GET", "/api/comparisons/7/matrix")
+
+    def test_writes(self):
+        body = {"name": "Renamed", "brand": "Brand", "score": 3.0, "product_metadata": []}
+        self.assertNoFullScan("PUT", "/api/products/42", json=body, headers=ADMIN)
+        self.assertNoFullScan(
+            "PUT", "/api/comparisons/7", json={"title": "Renamed"}, headers=ADMIN
+        )
+        # Refused, as the type has products; counting them must use the index
+        self.assertNoFullScan("DELETE", "/api/admin/product-types/2", headers=ADMIN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+
+import app.api  # noqa: F401  Registers every model on Base.metadata
+from app import database
+from app.blobstore import init_blob_store
+from app.database import init_db
+from app.initializer import initialize_all
+from app.initializers import users
+from app.initializers.seeder import RESOURCES_DIR
+from app.models.comparison import ComparisonProduct
+from app.models.product import Product, ProductMetadata
+from app.models.user import User
+
+tmp_dir = None
+
+
+def setUpModule():
+    """Create a temporary blob store and seed cache."""
+    global tmp_dir
+    tmp_dir = tempfile.mkdtemp()
+    init_blob_store(os.path.join(tmp_dir, "blobs"))
+    os.environ["SEED_CACHE_DIR"] = os.path.join(tmp_dir, "seed-cache")
+
+
+def tearDownModule():
+    """Remove the temporary files."""
+    os.environ.pop("SEED_CACHE_DIR", None)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class TestSeeding(unittest.TestCase):
+    def setUp(self):
+        """Start every test from an empty database."""
+        init_db(f"sqlite:///{os.path.join(tmp_dir, self._testMethodName)}.db")
+
+    def _run_counting_statements(self, function=initialize_all, *args) -> list:
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            function(*args)
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        return statements
+
+    def _count(self, model) -> int:
+        session = database.SessionLocal()
+        count = session.scalar(select(func.count()).select_from(model))
+        session.close()
+        return count
+
+    def test_seeding_is_set_based_and_idempotent(self):
+        """One key lookup and at most one INSERT per table, nothing on a re-run."""
+        statements = self._run_counting_statements()
+        inserts = [statement for statement in statements if statement.startswith("INSERT")]
+        # Plus looking for metadata to backfill, rebuilding the comparison summaries
+        # (three reads, a DELETE and an INSERT), creating and filling the search
+        # index (CREATE, DELETE, INSERT) and deleting and inserting the bookkeeping
+        self.assertEqual(len(statements), 23)
+        self.assertEqual(len(inserts), 9)
+        self.assertEqual(self._count(User), 3)
+        self.assertEqual(self._count(Product), 4)
+        self.assertEqual(self._count(ProductMetadata), 20)
+        self.assertEqual(self._count(ComparisonProduct), 4)
+
+        with mock.patch.object(users, "hash_password") as hash_password:
+            statements = self._run_counting_statements()
+
+        self.assertEqual(statements, [])
+        hash_password.assert_not_called()
+        self.assertTrue(os.listdir(os.environ["SEED_CACHE_DIR"]))
+
+        # A restart reads the bookkeeping once and skips DDL and seeding
+        statements = self._run_counting_statements(init_db, str(database.engine.url))
+        statements += self._run_counting_statements()
+        self.assertEqual(len(statements), 1)
+        self.assertIn("bookkeeping", statements[0])
+
+    def test_changed_resource_is_reseeded_alone(self):
+        """Only the initializers reading a changed file run again."""
+        initialize_all()
+        resources_dir = os.path.join(tmp_dir, "resources")
+        shutil.copytree(RESOURCES_DIR, resources_dir, dirs_exist_ok=True)
+        with open(os.path.join(resources_dir, "comparisons.yml"), "a") as f:
+            f.write("\n  - id: 5\n    comparison_id: 1\n    product_id: 2\n")
+
+        statements = self._run_counting_statements(initialize_all, resources_dir)
+
+        self.assertEqual(self._count(ComparisonProduct), 5)
+        untouched = re.compile(r"\b(users|product_types|products|product_metadata)\b")
+        seeding = [statement for statement in statements if "comparison_summaries" not in statement]
+        # The comparison summaries are rebuilt from the products, and only them
+        summary_reads = [s for s in seeding if " JOIN " in s]
+        self.assertEqual(len(summary_reads), 2)
+        self.assertFalse(
+            [s for s in seeding if s not in summary_reads and untouched.search(s)]
+        )
+        # The cache keeps the changed file's new version only
+        cached = os.listdir(os.environ["SEED_CACHE_DIR"])
+        self.assertEqual(len([f for f in cached if f.startswith("comparisons.")]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()